@@ -0,0 +1,75 @@
+"""
+    Deleting and copying a folder of many small files, like node_modules:
+    longest stall of the event loop with the file job queue, against the
+    whole operation on the UI thread as the file manager did it.
+
+    Run from the project root: `python benchmarks/bench_file_jobs.py`
+"""
+# STD
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from file_jobs import FileJob, FileJobQueue  # noqa: E402
+
+FOLDERS = 200
+FILES_PER_FOLDER = 100
+
+
+def make_tree(root: Path):
+    for i in range(FOLDERS):
+        folder = root / f"package{i}" / "lib"
+        folder.mkdir(parents=True)
+        for j in range(FILES_PER_FOLDER):
+            (folder / f"module{j}.js").write_bytes(b"x" * 512)
+
+
+def run_job(queue: FileJobQueue, job: FileJob) -> tuple[float, float]:
+    """ Seconds the job took and the longest gap between two ticks of a 5 ms timer """
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    loop = QEventLoop()
+    queue.finished.connect(loop.quit)
+    began = time.perf_counter()
+    queue.submit(job)
+    loop.exec()
+    queue.finished.disconnect(loop.quit)
+    timer.stop()
+    return time.perf_counter() - began, max(gaps, default=0.0)
+
+
+if __name__ == "__main__":
+    app = QCoreApplication([])
+    queue = FileJobQueue()
+    with tempfile.TemporaryDirectory() as folder:
+        root = Path(folder)
+        make_tree(root / "source")
+        print(f"{FOLDERS * FILES_PER_FOLDER} files")
+
+        began = time.perf_counter()
+        shutil.copytree(root / "source", root / "copy")
+        print(f"copy   on the UI thread {time.perf_counter() - began:6.2f} s, stalled all along")
+        began = time.perf_counter()
+        shutil.rmtree(root / "copy")
+        print(f"delete on the UI thread {time.perf_counter() - began:6.2f} s, stalled all along")
+
+        elapsed, stall = run_job(queue, FileJob(FileJob.COPY, [root / "source"], [root / "copy"]))
+        print(f"copy   job {elapsed:6.2f} s, longest stall {stall * 1000:4.0f} ms")
+        elapsed, stall = run_job(queue, FileJob(FileJob.DELETE, [root / "copy"]))
+        print(f"delete job {elapsed:6.2f} s, longest stall {stall * 1000:4.0f} ms")
@@ -0,0 +1,110 @@
+"""
+    Expanding a folder of many files in the file manager, with the file tree
+    model and with the QFileSystemModel it replaced: time until the folder
+    is filled and longest stall of the event loop meanwhile. Also how many
+    rows the root shows, .git, venv and what .gitignore ignores included.
+
+    Run from the project root: `python benchmarks/bench_file_tree.py`
+"""
+# STD
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtGui import QFileSystemModel
+from PyQt6.QtWidgets import QApplication, QTreeView
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from file_tree_model import FileTreeModel, FolderItem  # noqa: E402
+
+FOLDER_SIZES = [1000, 5000, 20000]
+
+
+def make_tree(root: Path):
+    (root / ".gitignore").write_text("node_modules/\n*.log\n")
+    for ignored in (".git/objects", "venv/lib", "node_modules", "__pycache__"):
+        for i in range(50):
+            folder = root / ignored / f"d{i}"
+            folder.mkdir(parents=True)
+            for j in range(20):
+                (folder / f"f{j}").touch()
+    for i in range(20):
+        (root / f"build{i}.log").touch()
+    for size in FOLDER_SIZES:
+        folder = root / "src" / f"files{size}"
+        folder.mkdir(parents=True)
+        for i in range(size):
+            (folder / f"module{i}.py").touch()
+
+
+def wait(ms: int):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def expand(app: QApplication, view: QTreeView, index, filled) -> tuple[float, float]:
+    """ Seconds until `filled()` and the longest gap between two ticks of a 5 ms timer """
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    began = time.perf_counter()
+    view.expand(index)
+    while not filled():
+        app.processEvents()
+    tick()
+    elapsed = time.perf_counter() - began
+    timer.stop()
+    return elapsed, max(gaps, default=0.0)
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        root = Path(folder)
+        make_tree(root)
+
+        tree_model = FileTreeModel()
+        tree_view = QTreeView()
+        tree_view.setModel(tree_model)
+        tree_view.expanded.connect(tree_model.watch)
+        tree_model.set_root(folder)
+        tree_view.show()
+
+        system_model = QFileSystemModel()
+        system_model.setRootPath(folder)
+        system_view = QTreeView()
+        system_view.setModel(system_model)
+        system_view.setRootIndex(system_model.index(folder))
+        system_view.show()
+        wait(500)
+        tree_view.expand(tree_model.index(0, 0))
+        system_view.expand(system_model.index(str(root / "src")))
+        wait(500)
+        print(f"rows of the root: tree model {tree_model.rowCount()}, "
+              f"QFileSystemModel {system_model.rowCount(system_model.index(folder))}")
+
+        for size in FOLDER_SIZES:
+            path = root / "src" / f"files{size}"
+            index = tree_model.indexFromItem(tree_model.item_at(path))
+            elapsed, stall = expand(app, tree_view, index,
+                                    lambda: tree_model.item(index).state == FolderItem.LISTED)
+            system_index = system_model.index(str(path))
+            system_elapsed, system_stall = expand(app, system_view, system_index,
+                                                  lambda: system_model.rowCount(system_index) == size)
+            print(f"{size:6} files: tree model {elapsed:5.2f} s, longest stall {stall * 1000:4.0f} ms  "
+                  f"QFileSystemModel {system_elapsed:5.2f} s, longest stall {system_stall * 1000:4.0f} ms")
+        print(f"folders watched by the tree model: {len(tree_model.watcher.directories())}")
+        tree_model.stop()
@@ -0,0 +1,58 @@
+"""
+    Large-file mode on a generated log: time to open it, to go to lines
+    far into it, the first time counting newlines up to there, and to find
+    text in the mapped bytes.
+
+    Run from the project root: `python benchmarks/bench_large_file.py [MB]`
+"""
+# STD
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor.large_file_editor import LargeFileEditor  # noqa: E402
+
+LINE = "2024-01-01 12:00:00 INFO worker-3 request handled in 12 ms, status=200 path=/api/items\n"
+
+
+def make_file(size: int) -> tuple[Path, int]:
+    path = Path(tempfile.mkdtemp(), "huge.log")
+    lines = size // (len(LINE) + 9)
+    with open(path, "w") as f:
+        for start in range(0, lines, 10_000):
+            f.write("".join(f"{i + 1:08d} {LINE}" for i in range(start, min(start + 10_000, lines))))
+    return path, lines
+
+
+def timed(action) -> float:
+    began = time.perf_counter()
+    action()
+    return time.perf_counter() - began
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    path, lines = make_file(size * 1_000_000)
+    print(f"{path}: {os.path.getsize(path) / 1e6:.0f} MB, {lines} lines")
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    editor = LargeFileEditor(path=path)
+    print(f"open                  {timed(editor.load):6.3f} s")
+    for line in (lines // 2, lines // 2 + 1000, lines - 1, 10):
+        print(f"go to line {line:<10} {timed(lambda: editor.go_to(line - 1, 0)):6.3f} s")
+    needle = f"{lines - 5:08d} 2024"
+    print(f"find {needle:16} {timed(lambda: editor.find_text(needle)):6.3f} s")
+    print(f"find STATUS=404       {timed(lambda: editor.find_text('STATUS=404')):6.3f} s  (not there)")
+    print(f"buffer {editor.length() / 1e6:.1f} MB, peak resident growth "
+          f"{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / 1024:.0f} MB "
+          f"(mapped pages included)")
+    editor.stop_loading()
+    os.remove(path)
@@ -0,0 +1,56 @@
+"""
+    Restyle cost of a single keystroke as the file grows.
+
+    Run from the project root: `python benchmarks/bench_lexer.py`
+"""
+# STD
+import os
+import sys
+import time
+# Installed
+from PyQt6.QtWidgets import QApplication
+from PyQt6.Qsci import QsciScintilla
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor.custom_lexer import CustomLexer  # noqa: E402
+
+BLOCK = (
+    "class Foo(Bar):\n"
+    "    \"\"\"Docstring\n"
+    "    spanning lines\n"
+    "    \"\"\"\n"
+    "    def method(self, value):  # comment\n"
+    "        return value + len('text') * 2\n"
+    "\n"
+)
+VISIBLE_LINES = 60
+KEYSTROKES = 50
+
+
+def restyle_cost(lines: int) -> float:
+    editor = QsciScintilla()
+    lexer = CustomLexer(editor)
+    editor.setLexer(lexer)
+    editor.setText(BLOCK * (lines // BLOCK.count("\n")))
+    editor.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1)
+
+    line = editor.lines() // 2
+    total = 0.0
+    for _ in range(KEYSTROKES):
+        editor.insertAt("x", line, 8)
+        start = editor.SendScintilla(QsciScintilla.SCI_GETENDSTYLED)
+        # Scintilla asks for the visible screen after an edit
+        end = editor.SendScintilla(
+            QsciScintilla.SCI_POSITIONFROMLINE, line + VISIBLE_LINES)
+        began = time.perf_counter()
+        editor.SendScintilla(QsciScintilla.SCI_COLOURISE, start, end)
+        total += time.perf_counter() - began
+    return total / KEYSTROKES
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    print(f"{'lines':>8} {'restyle/keystroke':>20}")
+    for lines in (1_000, 5_000, 20_000, 80_000):
+        print(f"{lines:>8} {restyle_cost(lines) * 1000:>17.3f} ms")
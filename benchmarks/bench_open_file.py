@@ -0,0 +1,72 @@
+"""
+    Opening a large file in a tab: read and set on the UI thread as tabs
+    were filled before, and loaded in chunks by a FileLoader. Reports when
+    the first screen shows, when the whole file is in and the longest time
+    the event loop was blocked.
+
+    Run from the project root: `python benchmarks/bench_open_file.py [MB]`
+"""
+# STD
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor.editor import Editor  # noqa: E402
+
+LINE = "2024-01-01 12:00:00 INFO worker-3 request handled in 12 ms, status=200 path=/api/items\n"
+
+
+def make_file(size: int) -> Path:
+    path = Path(tempfile.mkdtemp(), "big.log")
+    with open(path, "w") as f:
+        f.write(LINE * (size // len(LINE)))
+    return path
+
+
+def measure(app: QApplication, path: Path, chunked: bool):
+    ticks = []
+    timer = QTimer()
+    timer.setInterval(5)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start()
+    app.processEvents()
+
+    editor = Editor(path=path, is_python_file=False)
+    began = time.perf_counter()
+    first = None
+    if chunked:
+        done = []
+        editor.loaded.connect(done.append)
+        editor.load()
+        while not done:
+            app.processEvents()
+            if first is None and editor.length():
+                first = time.perf_counter()
+    else:
+        editor.setText(path.read_text())
+        first = time.perf_counter()
+    ended = time.perf_counter()
+    app.processEvents()
+    timer.stop()
+    ticks = [began] + [tick for tick in ticks if tick > began] + [ended]
+    stall = max(b - a for a, b in zip(ticks, ticks[1:]))
+    print(f"{'chunked' if chunked else 'before':8} first screen {first - began:6.3f} s  "
+          f"loaded {ended - began:6.3f} s  longest stall {stall * 1000:7.1f} ms  "
+          f"{editor.lines()} lines")
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    path = make_file(size * 1_000_000)
+    print(f"{path}: {os.path.getsize(path) / 1e6:.0f} MB")
+    measure(app, path, False)
+    measure(app, path, True)
+    os.remove(path)
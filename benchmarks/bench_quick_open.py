@@ -0,0 +1,98 @@
+"""
+    Quick open ranking time per keystroke. The paths of the standard library
+    are repeated under numbered folders up to the count asked for, then each
+    query is typed one character at a time. Then the same keystrokes go to
+    the ranking thread, with the longest stall of the event loop meanwhile.
+
+    Run from the project root: `python benchmarks/bench_quick_open.py [COUNT]`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+# Installed
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from path_index import PathIndex  # noqa: E402
+from quick_open import PathSearcher  # noqa: E402
+from walker import walk_files  # noqa: E402
+
+QUERIES = ["asyncio", "ttcase", "tcpserver", "test_os.py", "mainwin",
+           "initpy", "sockserv", "jsondec", "httpcli", "pathlib", "util"]
+
+
+def make_paths(count: int) -> list[str]:
+    root = sysconfig.get_paths()["stdlib"]
+    prefix = len(os.path.join(root, ""))
+    base = [path[prefix:].replace(os.sep, "/") for path in walk_files(root, use_ignore_files=False)]
+    paths = []
+    copy = 0
+    while len(paths) < count:
+        paths.extend(f"copy{copy}/{path}" for path in base)
+        copy += 1
+    return paths[:count]
+
+
+def type_in_background(index: PathIndex) -> tuple[list[float], float]:
+    """ Seconds from each query's last keystroke to its ranking, longest gap between two ticks of a 5 ms timer """
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    searcher = PathSearcher(50)
+    ranked = {}
+    searcher.ranked.connect(lambda generation, paths, done: done and ranked.setdefault(generation, time.perf_counter()))
+    searcher.start()
+    latencies = []
+    generation = 0
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            generation += 1
+            typed = time.perf_counter()
+            searcher.request(generation, index, query[:end])
+            # a keystroke every 50 ms
+            loop = QEventLoop()
+            QTimer.singleShot(50, loop.quit)
+            loop.exec()
+        while generation not in ranked:
+            QCoreApplication.processEvents()
+        latencies.append(ranked[generation] - typed)
+    searcher.stop()
+    timer.stop()
+    return latencies, max(gaps, default=0.0)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    paths = make_paths(count)
+
+    began = time.perf_counter()
+    index = PathIndex("").update(paths)
+    print(f"{count} paths, built in {time.perf_counter() - began:.2f} s")
+
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            began = time.perf_counter()
+            results = index.search(query[:end], 50)
+            timings.append(time.perf_counter() - began)
+        print(f"{query:12} {results[0] if results else '-'}")
+    timings.sort()
+    print(f"per keystroke: median {timings[len(timings) // 2] * 1000:.1f} ms  "
+          f"p90 {timings[len(timings) * 9 // 10] * 1000:.1f} ms  max {timings[-1] * 1000:.1f} ms")
+
+    app = QCoreApplication([])
+    latencies, stall = type_in_background(index)
+    latencies.sort()
+    print(f"in the background, last keystroke to ranking: median {latencies[len(latencies) // 2] * 1000:.1f} ms  "
+          f"max {latencies[-1] * 1000:.1f} ms, longest stall of the UI thread {stall * 1000:.1f} ms")
@@ -0,0 +1,43 @@
+"""
+    Time of each search while a pattern is typed out, with the search cache
+    and with it cleared before every search.
+
+    Run from the project root: `python benchmarks/bench_refine.py [PATH]`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+# Installed
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from fuzzy_finder import SearchWorker  # noqa: E402
+
+TYPED = ["Tim", "Time", "Timeo", "TimeoutE", "TimeoutError", r"TimeoutError\s+as"]
+
+
+def bench(path: str, cached: bool) -> list[tuple[float, int]]:
+    worker = SearchWorker(1)
+    worker.PAGE_ITEMS = sys.maxsize
+    timings = []
+    for pattern in TYPED:
+        if not cached:
+            worker.cache.clear()
+        began = time.perf_counter()
+        worker.update(pattern, path, False)
+        worker.wait()
+        timings.append((time.perf_counter() - began, len(worker.items)))
+    return timings
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    path = sys.argv[1] if len(sys.argv) > 1 else sysconfig.get_paths()["stdlib"]
+    print(path)
+    with_cache = bench(path, True)
+    without = bench(path, False)
+    for pattern, (cached, found), (full, _) in zip(TYPED, with_cache, without):
+        print(f"{pattern:20} cached {cached:6.3f} s  full {full:6.3f} s  {found} matches")
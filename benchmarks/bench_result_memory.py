@@ -0,0 +1,84 @@
+"""
+    Memory taken by 100k search results shown in the sidebar: a
+    QListWidgetItem per hit in a QListWidget as searches did before, and
+    SearchResults shown by SearchResultModel in a QListView. Each runs in a
+    process of its own, memory is the growth of its resident set.
+
+    Run from the project root: `python benchmarks/bench_result_memory.py`
+"""
+# STD
+import os
+import subprocess
+import sys
+import time
+# Installed
+from PyQt6.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from fuzzy_finder import SearchResultModel, SearchResults  # noqa: E402
+
+HITS = 100_000
+HITS_PER_FILE = 20
+
+
+class OldSearchItem(QListWidgetItem):
+    """ The result item searches made before SearchResults """
+
+    def __init__(self, name, full_path, line_no, end, line):
+        self.name = name
+        self.full_path = full_path
+        self.line_no = line_no
+        self.end = end
+        self.line = line
+        self.formatted = f"{self.name}:{self.line_no}:{self.end}-{self.line}..."
+        super().__init__(self.formatted)
+
+
+def make_matches() -> list[tuple]:
+    matches = []
+    for i in range(HITS):
+        # paths come from the walk, each file's hits share its path string
+        if i % HITS_PER_FILE == 0:
+            full_path = f"/home/user/project/package_{i // 1000}/module_{i // HITS_PER_FILE}.py"
+            name = os.path.basename(full_path)
+        line = f"def function_{i}(argument, other_argument): return"[:50]
+        matches.append((name, full_path, i % 500, 12, line))
+    return matches
+
+
+def resident() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(mode: str):
+    app = QApplication([])
+    matches = make_matches()
+    before = resident()
+    began = time.perf_counter()
+    if mode == "before":
+        view = QListWidget()
+        items = [OldSearchItem(*match) for match in matches]
+        for item in items:
+            view.addItem(item)
+    else:
+        results = SearchResults()
+        model = SearchResultModel(results)
+        view = QListView()
+        view.setUniformItemSizes(True)
+        view.setModel(model)
+        results.extend(matches)
+        model.set_count(len(results))
+    elapsed = time.perf_counter() - began
+    print(f"{mode:6} {(resident() - before) / 1e6:7.1f} MB per {HITS // 1000}k results, "
+          f"filled in {elapsed:.2f} s")
+    app.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        measure(sys.argv[1])
+    else:
+        for mode in ("before", "after"):
+            subprocess.run([sys.executable, __file__, mode], check=True)
@@ -0,0 +1,54 @@
+"""
+    Saving a large file: time the UI thread is blocked when the editor
+    writes a snapshot of its text in the background, against the text
+    written on the UI thread as the save action did it.
+
+    Run from the project root: `python benchmarks/bench_save.py`
+"""
+# STD
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QEventLoop
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor.editor import Editor  # noqa: E402
+
+SIZES_MB = [5, 20, 50]
+LINE = "x" * 79 + "\n"
+
+
+def blocking_save(editor: Editor, path: Path) -> float:
+    began = time.perf_counter()
+    path.write_text(editor.text())
+    return time.perf_counter() - began
+
+
+def background_save(editor: Editor, path: Path) -> tuple[float, float]:
+    """ Seconds the save call held the UI thread, seconds until the file was written """
+    loop = QEventLoop()
+    editor.saved.connect(loop.quit)
+    began = time.perf_counter()
+    editor.save(path)
+    blocked = time.perf_counter() - began
+    loop.exec()
+    editor.saved.disconnect(loop.quit)
+    return blocked, time.perf_counter() - began
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        for size in SIZES_MB:
+            path = Path(folder) / f"{size}mb.log"
+            editor = Editor(path=path, is_python_file=False)
+            editor.setText(LINE * (size * 1024 * 1024 // len(LINE)))
+            print(f"{size:3} MB  on the UI thread {blocking_save(editor, path):6.3f} s blocked", end="  ")
+            blocked, total = background_save(editor, path)
+            print(f"| in the background {blocked:6.3f} s blocked, {total:6.3f} s written")
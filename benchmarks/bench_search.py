@@ -0,0 +1,49 @@
+"""
+    Project search throughput over the standard library sources with pools
+    of different sizes, the first search of each size starts its processes.
+
+    Run from the project root: `python benchmarks/bench_search.py [PATH]`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+# Installed
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from fuzzy_finder import SearchWorker  # noqa: E402
+from search_core import iter_files  # noqa: E402
+
+PATTERN = r"except\s+\w+Error\s+as"
+RUNS = 3
+
+
+def bench(path: str, workers: int) -> tuple[float, float, int]:
+    worker = SearchWorker(workers)
+    worker.PAGE_ITEMS = sys.maxsize
+    timings = []
+    for _ in range(RUNS):
+        # every run scans, not the files the cache kept
+        worker.cache.clear()
+        began = time.perf_counter()
+        worker.update(PATTERN, path, True)
+        worker.wait()
+        timings.append(time.perf_counter() - began)
+    first, best = timings[0], min(timings)
+    return first, best, len(worker.items)
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    path = sys.argv[1] if len(sys.argv) > 1 else sysconfig.get_paths()["stdlib"]
+    paths = list(iter_files(path, True))
+    size = sum(os.path.getsize(p) for p in paths)
+    print(f"{path}: {len(paths)} files, {size / 1e6:.1f} MB, {os.cpu_count()} cores")
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        first, best, found = bench(path, workers)
+        print(f"{workers} workers: first {first:6.2f} s  best {best:6.2f} s  "
+              f"{size / best / 1e6:6.1f} MB/s  {found} matches")
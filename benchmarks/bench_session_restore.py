@@ -0,0 +1,74 @@
+"""
+    Restoring a session of N tabs: time until the current tab is readable
+    with the other tabs added as placeholders after it, and until every tab
+    is built and loaded as a naive restore would.
+
+    Run from the project root: `python benchmarks/bench_session_restore.py`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QStandardPaths
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+import main  # noqa: E402
+from session import TabPlaceholder  # noqa: E402
+
+TAB_COUNTS = [1, 10, 40]
+RUNS = 3
+
+
+def restore(app: QApplication, window: main.MainWindow, paths: list[Path], lazy: bool) -> float:
+    for i in range(window.tab_view.count() - 1, -1, -1):
+        widget = window.tab_view.widget(i)
+        window.close_tab(i)
+        widget.deleteLater()
+    # the closed tabs go before the clock starts
+    app.processEvents()
+    window.session.tabs = [{"path": str(path)} for path in paths]
+    window.session.current = 0
+    began = time.perf_counter()
+    window.restore_session()
+    if lazy:
+        # the current tab is readable, the others are still to be added
+        editor = window.tab_view.currentWidget()
+        while editor.is_loading():
+            app.processEvents()
+        elapsed = time.perf_counter() - began
+        while window.restore_queue:
+            window.restore_next()
+        return elapsed
+    while window.restore_queue:
+        window.restore_next()
+    for i in range(window.tab_view.count()):
+        window.tab_view.setCurrentIndex(i)
+    window.tab_view.setCurrentIndex(0)
+    while any(window.tab_view.widget(i).is_loading() for i in range(window.tab_view.count())):
+        app.processEvents()
+    return time.perf_counter() - began
+
+
+if __name__ == "__main__":
+    # the real session of the user is left alone
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+    root = Path(sysconfig.get_paths()["stdlib"])
+    paths = sorted(root.glob("*.py"), key=lambda path: -path.stat().st_size)[:max(TAB_COUNTS)]
+    window = main.MainWindow()
+    # first editor and lexer built before timing
+    restore(app, window, paths[:1], True)
+    for count in TAB_COUNTS:
+        lazy = min(restore(app, window, paths[:count], True) for _ in range(RUNS))
+        built = sum(not isinstance(window.tab_view.widget(i), TabPlaceholder)
+                    for i in range(window.tab_view.count()))
+        eager = min(restore(app, window, paths[:count], False) for _ in range(RUNS))
+        print(f"{count:3} tabs: placeholders {lazy:6.3f} s ({built} editor built)  "
+              f"every tab built {eager:6.3f} s")
+    window.session.tabs = []
+    app.quit()
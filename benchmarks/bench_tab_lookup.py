@@ -0,0 +1,55 @@
+"""
+    Finding the tab of a file among N open tabs, by the registry and by
+    the walk over every tab it replaced.
+
+    Run from the project root: `python benchmarks/bench_tab_lookup.py`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QStandardPaths
+from PyQt6.QtWidgets import QApplication, QTabWidget
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor_registry import EditorRegistry  # noqa: E402
+from session import TabPlaceholder  # noqa: E402
+
+TAB_COUNTS = [10, 100, 1000]
+LOOKUPS = 1000
+
+
+def scan(tab_view: QTabWidget, path: Path) -> TabPlaceholder:
+    full_path = path.absolute()
+    for i in range(tab_view.count()):
+        if tab_view.widget(i).full_path == full_path:
+            return tab_view.widget(i)
+
+
+if __name__ == "__main__":
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+    paths = sorted(Path(sysconfig.get_paths()["stdlib"]).rglob("*.py"))[:max(TAB_COUNTS)]
+    for count in TAB_COUNTS:
+        tab_view = QTabWidget()
+        editors = EditorRegistry()
+        for path in paths[:count]:
+            placeholder = TabPlaceholder(path)
+            tab_view.addTab(placeholder, path.name)
+            editors.add(placeholder)
+        # the last tab, the worst case of the walk
+        wanted = paths[count - 1]
+        began = time.perf_counter()
+        for _ in range(LOOKUPS):
+            assert editors.get(wanted).path == wanted
+        registry = (time.perf_counter() - began) / LOOKUPS
+        began = time.perf_counter()
+        for _ in range(LOOKUPS):
+            assert scan(tab_view, wanted).path == wanted
+        walk = (time.perf_counter() - began) / LOOKUPS
+        print(f"{count:5} tabs: registry {registry * 1e6:8.1f} us  walk {walk * 1e6:8.1f} us")
+    app.quit()
@@ -0,0 +1,60 @@
+"""
+    Tokenizer throughput in MB/s over the standard library sources.
+
+    Run from the project root: `python benchmarks/bench_tokenizer.py`
+"""
+# STD
+import os
+import sys
+import sysconfig
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtWidgets import QApplication
+from PyQt6.Qsci import QsciScintilla
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from editor.custom_lexer import CustomLexer  # noqa: E402
+
+CORPUS_BYTES = 4 * 1024 * 1024
+
+
+def load_corpus() -> bytes:
+    chunks = []
+    size = 0
+    for path in sorted(Path(sysconfig.get_paths()["stdlib"]).glob("*.py")):
+        data = path.read_bytes()
+        chunks.append(data)
+        size += len(data)
+        if size >= CORPUS_BYTES:
+            break
+    return b"".join(chunks)
+
+
+def bench_engine(lexer: CustomLexer, corpus: bytes) -> float:
+    lines = corpus.splitlines(keepends=True)
+    tokenize = lexer.engine.tokenize
+    began = time.perf_counter()
+    state = 0
+    for line in lines:
+        _, state = tokenize(line, state)
+    return len(corpus) / (time.perf_counter() - began) / 1e6
+
+
+def bench_lexer(corpus: bytes) -> float:
+    editor = QsciScintilla()
+    editor.setLexer(CustomLexer(editor))
+    editor.setText(corpus.decode("utf-8", errors="replace"))
+    began = time.perf_counter()
+    editor.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1)
+    return editor.length() / (time.perf_counter() - began) / 1e6
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    corpus = load_corpus()
+    editor = QsciScintilla()
+    print(f"corpus: {len(corpus) / 1e6:.1f} MB")
+    print(f"tokenize only:   {bench_engine(CustomLexer(editor), corpus):6.2f} MB/s")
+    print(f"styleText total: {bench_lexer(corpus):6.2f} MB/s")
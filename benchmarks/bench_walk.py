@@ -0,0 +1,73 @@
+"""
+    Time to list the files of a folder with the os.walk loop searches used
+    before, and with the scandir walker without and with its ignore files.
+    Without a path, walks a generated project whose .gitignore leaves out
+    node_modules, build, dist and .tox, as big as those usually are.
+
+    Run from the project root: `python benchmarks/bench_walk.py [PATH]`
+"""
+# STD
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Custom
+from walker import EXCLUDE_DIRS, walk_files  # noqa: E402
+
+RUNS = 3
+GITIGNORE = "node_modules/\n/build\n/dist\n.tox/\n*.log\n"
+# directory, subdirectories, files in each
+LAYOUT = [("src", 40, 25), ("node_modules", 600, 30), ("build", 100, 30),
+          ("dist", 20, 10), (".tox", 60, 40)]
+
+
+def old_walk(path: str):
+    """ The walk searches did before the walker, hard-coded exclusions only """
+    exclude_dirs = set([".git", ".svn", ".hg", ".bzr", ".idea", "__pycache__", "venv", ".dragon"])
+    exclude_files = set([".svg", ".png", ".exe", ".pyc", ".qm"])
+    for root, dirs, files in os.walk(path, topdown=True):
+        dirs[:] = sorted(d for d in dirs if d not in exclude_dirs)
+        for file_ in sorted(f for f in files if Path(f).suffix not in exclude_files):
+            yield os.path.join(root, file_)
+
+
+def make_project(path: str):
+    with open(os.path.join(path, ".gitignore"), "w") as f:
+        f.write(GITIGNORE)
+    for top, dirs, files in LAYOUT:
+        for i in range(dirs):
+            directory = os.path.join(path, top, f"package_{i}")
+            os.makedirs(directory)
+            for j in range(files):
+                Path(directory, f"module_{j}.js").touch()
+
+
+def bench(walk) -> tuple[float, int]:
+    timings = []
+    for _ in range(RUNS):
+        began = time.perf_counter()
+        count = sum(1 for _ in walk())
+        timings.append(time.perf_counter() - began)
+    return min(timings), count
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp:
+        if len(sys.argv) > 1:
+            path = sys.argv[1]
+        else:
+            path = temp
+            make_project(path)
+        exclude = EXCLUDE_DIRS | {"venv"}
+        walks = [
+            ("os.walk, hard-coded", lambda: old_walk(path)),
+            ("walker, no ignore files", lambda: walk_files(path, exclude, use_ignore_files=False)),
+            ("walker, ignore files", lambda: walk_files(path, exclude)),
+        ]
+        print(path)
+        for name, walk in walks:
+            best, count = bench(walk)
+            print(f"{name:24} {best * 1000:8.1f} ms  {count} files")
@@ -0,0 +1,88 @@
+"""
+    Command line of Dragon, runs without Qt:
+
+        python src/cli.py search PATTERN PATH
+
+    Matches are printed as they are found, in walk order, as
+    path:line:column:text where the column is the end of the match and the
+    text is the line from the match on.
+"""
+# STD
+import argparse
+import os
+import re
+import sys
+import time
+# Custom
+from search_core import Search
+from trigram_index import TrigramIndex
+
+
+def search(args) -> int:
+    """ Exit status as grep's, 0 when anything matched, 1 otherwise, 2 on errors """
+    try:
+        re.compile(args.pattern, re.IGNORECASE)
+    except re.error as e:
+        print(f"dragon: invalid pattern: {e}", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.path):
+        print(f"dragon: not a folder: {args.path}", file=sys.stderr)
+        return 2
+    index = None
+    if args.index:
+        index = TrigramIndex(args.path)
+        if not index.is_ready():
+            print(f"dragon: no index in {args.path}, searching without", file=sys.stderr)
+            index = None
+    began = time.perf_counter()
+    found = 0
+    run = Search(args.pattern, args.path, args.all, args.workers, index=index, line_length=None)
+    root = len(os.path.join(run.root, ""))
+    try:
+        for matches in run:
+            if not matches:
+                continue
+            sys.stdout.write("".join(
+                f"{os.path.join(args.path, full_path[root:])}:{line_no + 1}:{end}:{line}\n"
+                for _, full_path, line_no, end, line in matches))
+            # streamed, not buffered until the end
+            sys.stdout.flush()
+            found += len(matches)
+    except BrokenPipeError:
+        # the reader is gone, as with `| head`
+        run.cancel()
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        run.cancel()
+        return 130
+    if args.stats:
+        print(f"{found} matches, {run.files_scanned} files scanned in "
+              f"{time.perf_counter() - began:.2f} s", file=sys.stderr)
+    return 0 if found else 1
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dragon")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("search", help="search the files of a folder")
+    command.add_argument("pattern", help="regular expression, matched ignoring case")
+    command.add_argument("path", help="folder to search")
+    command.add_argument("-a", "--all", action="store_true",
+                         help="search the venv and the files ignore files leave out too")
+    command.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                         help="processes scanning files, default one per core")
+    command.add_argument("--index", action="store_true",
+                         help="scan only the candidates of the folder's trigram index, once built")
+    command.add_argument("--stats", action="store_true", help="print counts and time to stderr")
+    command.set_defaults(run=search)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,203 @@
+# STD
+import re
+import time
+from collections import deque
 # Installed
-from PyQt6.QtCore import QThread
-from PyQt6.Qsci import QsciAPIs
-from jedi import Script
-from jedi.api import Completion
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+# Custom
+from editor.completion_server import CompletionServer
+from editor.prefix_trie import PrefixTrie
 
+# identifiers worth completing, single letters aren't
+IDENTIFIER = re.compile(r"\b[^\W\d]\w+")
+# the word being typed before the cursor, with the character ahead of it
+WORD_BEFORE = re.compile(r"(\.?)([^\W\d]\w*)?$")
 
-class AutoComplete(QThread):
-    def __init__(self, file_path, api):
+
+class AutoComplete(QObject):
+    """
+        Client of the completion server for one file. Requests for the same
+        file that are still waiting for a worker are replaced by newer ones.
+    """
+    # generation, time the request was submitted, completions
+    completed = pyqtSignal(int, float, list)
+
+    def __init__(self, file_path, server: CompletionServer = None):
         super(AutoComplete, self).__init__(None)
         self.file_path = file_path
-        self.script: Script = None
-        self.api: QsciAPIs = api
-        self.completions: list[Completion] = None
-
-        self.line = 0
-        self.index = 0
-        self.text = ""
-
-    def run(self):
-        try:
-            self.script = Script(self.text, path=self.file_path)
-            self.completions = self.script.complete(self.line, self.index)
-            self.load_autocomplete(self.completions)
-        except Exception as err:
-            print(err)
-
-        self.finished.emit()
-
-    def load_autocomplete(self, completions):
-        self.api.clear()
-        [self.api.add(i.name) for i in completions]
-        self.api.prepare()
-
-    def get_completions(self, line: int, index: int, text: str):
-        self.line = line
-        self.index = index
-        self.text = text
-        self.start()
+        self.server = server or CompletionServer.shared()
+        self.completions: list[dict] = None
+
+    def submit(self, generation: int, line: int, index: int, text: str) -> bool:
+        """ Queue a request, returns True if it replaced one that never started """
+        submitted = time.perf_counter()
+
+        def done(result, error):
+            if error is not None:
+                print(error)
+            self.completions = result or []
+            self.completed.emit(generation, submitted, self.completions)
+
+        return self.server.request(
+            "complete",
+            {"text": text, "path": str(self.file_path), "line": line, "column": index},
+            done,
+            key=id(self),
+        )
+
+
+class CompletionService(QObject):
+    """
+        Completions for an editor in two tiers. The instant tier answers on
+        every typed character from a prefix trie of the buffer's identifiers,
+        keywords and builtins. Jedi is asked once typing pauses and its
+        results are merged in when they arrive. Every jedi request gets a
+        generation number and only results for the latest one are delivered.
+    """
+    # length in bytes of the word being completed, sorted names
+    completions_ready = pyqtSignal(int, list)
+
+    # ms of quiet after an edit before jedi is asked
+    DEBOUNCE = 150
+    # number of recent latencies kept for the percentiles
+    LATENCY_SAMPLES = 500
+    # most names the instant tier puts in the popup
+    INSTANT_LIMIT = 200
+
+    def __init__(self, editor, file_path, names=(), server: CompletionServer = None):
+        super(CompletionService, self).__init__(editor)
+        self.editor = editor
+        self.generation = 0
+
+        # Keywords and builtins stay, buffer words follow the text
+        self.names = frozenset(names)
+        self.trie = PrefixTrie(self.names)
+        self.buffer_words: set[str] = set()
+        self.indexed = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE)
+        self.timer.timeout.connect(self._submit)
+
+        self.worker = AutoComplete(file_path, server)
+        self.worker.completed.connect(self._on_completed)
+
+        # Counters
+        self.requested = 0
+        self.instant = 0
+        self.debounced = 0
+        self.submitted = 0
+        self.superseded = 0
+        self.discarded = 0
+        self.delivered = 0
+        self.latencies: deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def request(self, immediate=False):
+        """
+            Show the instant tier for the word at the cursor now and ask jedi
+            once typing pauses, or straight away when `immediate`
+        """
+        self.requested += 1
+        attribute, word = self.word_before_cursor()
+        if not attribute and not word:
+            # nothing typed to complete
+            self.cancel()
+            self.completions_ready.emit(0, [])
+            return
+
+        if not attribute:
+            if not self.indexed:
+                self.index_buffer(self.editor.text())
+            self.instant += 1
+            self.completions_ready.emit(
+                len(word.encode()), self.merge(word, []))
+
+        if immediate:
+            self.timer.stop()
+            self._submit()
+            return
+        if self.timer.isActive():
+            self.debounced += 1
+        self.timer.start()
+
+    def cancel(self):
+        """ Drop the waiting request and anything still running """
+        self.timer.stop()
+        self.generation += 1
+
+    def word_before_cursor(self) -> tuple[bool, str]:
+        """ Whether the cursor is after a dot, and the part of a word typed before it """
+        line, index = self.editor.getCursorPosition()
+        match = WORD_BEFORE.search(self.editor.text(line)[:index])
+        return bool(match.group(1)), match.group(2) or ""
+
+    def index_buffer(self, text: str):
+        """ Bring the trie's buffer words up to date with `text` """
+        words = set(IDENTIFIER.findall(text))
+        for word in self.buffer_words - words:
+            if word not in self.names:
+                self.trie.discard(word)
+        for word in words - self.buffer_words:
+            self.trie.add(word)
+        self.buffer_words = words
+        self.indexed = True
+
+    def merge(self, word: str, completions: list[dict]) -> list[str]:
+        """
+            Names from both tiers that complete `word`, sorted upper-cased as
+            Scintilla's case insensitive list search expects, `_` after letters
+        """
+        names = set(self.trie.complete(word, self.INSTANT_LIMIT))
+        lowered = word.lower()
+        names.update(c["name"] for c in completions
+                     if c["name"].lower().startswith(lowered))
+        # the word being typed is in the buffer too, it isn't a completion
+        names.discard(word)
+        return sorted(names, key=str.upper)
+
+    def _submit(self):
+        self.generation += 1
+        self.submitted += 1
+        line, index = self.editor.getCursorPosition()
+        text = self.editor.text()
+        self.index_buffer(text)
+        if self.worker.submit(self.generation, line + 1, index, text):
+            self.superseded += 1
+
+    def _on_completed(self, generation: int, submitted: float, completions: list):
+        if generation != self.generation:
+            # A newer request exists, these results are stale
+            self.discarded += 1
+            return
+        self.latencies.append(time.perf_counter() - submitted)
+        self.delivered += 1
+        # Typing may have gone on since, complete what is there now
+        attribute, word = self.word_before_cursor()
+        if attribute:
+            lowered = word.lower()
+            names = sorted({c["name"] for c in completions
+                            if c["name"].lower().startswith(lowered)}, key=str.upper)
+        else:
+            names = self.merge(word, completions)
+        self.completions_ready.emit(len(word.encode()), names)
+
+    def percentile(self, fraction: float) -> float:
+        """ Completion latency in ms at `fraction` (0.5 is the median) """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[round(fraction * (len(ordered) - 1))] * 1000
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "requested": self.requested,
+            "instant": self.instant,
+            "debounced": self.debounced,
+            "submitted": self.submitted,
+            "superseded": self.superseded,
+            "discarded": self.discarded,
+            "delivered": self.delivered,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+        }
@@ -2,16 +2,162 @@
 import re
 import json
 # Installed
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import *
-from PyQt6.Qsci import QsciLexerCustom
+from PyQt6.Qsci import QsciLexerCustom, QsciScintilla
+# Custom
+from editor.highlighter import HighlightWorker
 
 # config type
 DefaultConfig = dict[str, str, tuple[str, int]]
+# (opening delimiter, closing delimiter, style name, backslash escapes, multiline)
+SpanRule = tuple[bytes, bytes, str, bool, bool]
+# (style name, regex), the style name "word" looks the match up in the word tables
+TokenRule = tuple[str, bytes]
+
+IDENTIFIER = rb"[A-Za-z_\x80-\xff][\w\x80-\xff]*"
+
+
+class TokenEngine:
+    """
+        Single pass tokenizer built from a lexer's tables.
+
+        All rules are compiled into one regex with a named group per rule and
+        matched at a moving cursor over the UTF-8 bytes of a line, so match
+        offsets are already the byte lengths Scintilla wants. `tokenize`
+        doesn't touch Qt and can run on any thread.
+    """
+
+    def __init__(self, span_rules: tuple[SpanRule, ...], span_prefix: bytes,
+                 token_rules: tuple[TokenRule, ...], definer_rules: dict[str, tuple[str, str]],
+                 styles: dict[str, int]):
+        self.default_style = styles["default"]
+        self.words: dict[bytes, int] = {}
+        self.definers = {word.encode(): (styles[word_style], styles[name_style])
+                         for word, (word_style, name_style) in definer_rules.items()}
+        self.definer_name = re.compile(rb"(\s+)(" + IDENTIFIER + rb")")
+
+        # line state -> (closing regex, style, multiline), state 0 is no span
+        self.spans: list[tuple[re.Pattern, int, bool]] = [None]
+        # (opening delimiter, line state) in the order they are tried
+        self.span_openings: list[tuple[bytes, int]] = []
+        for state, (opening, closing, style, escapes, multiline) in enumerate(span_rules, 1):
+            first = re.escape(closing[:1])
+            if escapes:
+                body = rb"(?:[^\\%s]+|\\.|(?!%s)%s)*" % (first, re.escape(closing), first)
+            else:
+                body = rb"(?:[^%s]+|(?!%s)%s)*" % (first, re.escape(closing), first)
+            closing_regex = re.compile(body + b"(?P<close>" + re.escape(closing) + b")?", re.DOTALL)
+            self.spans.append((closing_regex, styles[style], multiline))
+            self.span_openings.append((opening, state))
+
+        # Whitespace is the most common token so it is tried first, all span
+        # openings share one group and any other byte falls through to default
+        groups = [rb"(?P<space>\s+)"]
+        if span_rules:
+            openings = b"|".join(re.escape(opening) for opening, _ in self.span_openings)
+            groups.append(rb"(?P<span>(?:%s)(?:%s))" % (span_prefix, openings))
+        # group name -> style for plain rules, "word" for table lookups
+        self.group_styles: dict[str, int | str] = {"space": self.default_style}
+        for i, (style, pattern) in enumerate(token_rules + (("default", rb"."),)):
+            name = f"rule{i}"
+            groups.append(b"(?P<%s>%s)" % (name.encode(), pattern))
+            self.group_styles[name] = "word" if style == "word" else styles[style]
+
+        self.pattern = re.compile(b"|".join(groups), re.DOTALL)
+
+    def span_state(self, token: bytes) -> int:
+        """ Line state of the span a matched opening starts """
+        for opening, state in self.span_openings:
+            if token.endswith(opening):
+                return state
+        return 0
+
+    def set_words(self, words, style: int):
+        for word in words:
+            self.words[word.encode()] = style
+
+    def tokenize(self, line: bytes, state: int = 0) -> tuple[list[tuple[int, int]], int]:
+        """ Return the (length, style) runs of a line and the state it ends in """
+        # position and style of each change of style, lengths are worked out at the end
+        starts = []
+        styles = []
+        last_style = -1
+        pos = 0
+        end = len(line)
+        default = self.default_style
+        words = self.words
+        definers = self.definers
+        group_styles = self.group_styles
+        match = self.pattern.match
+
+        while pos < end:
+            if state:
+                closing, style, _ = self.spans[state]
+                if style != last_style:
+                    starts.append(pos)
+                    styles.append(style)
+                    last_style = style
+                m = closing.match(line, pos)
+                if m.group("close") is None:
+                    break
+                pos = m.end()
+                state = 0
+                continue
+
+            m = match(line, pos)
+            name = m.lastgroup
+            style = group_styles.get(name)
+            if style is None:
+                state = self.span_state(m.group())
+                style = self.spans[state][1]
+            elif style == "word":
+                token = m.group()
+                if token in definers:
+                    word_style, name_style = definers[token]
+                    n = self.definer_name.match(line, m.end())
+                    if n is not None:
+                        starts += (pos, n.start(1), n.start(2))
+                        styles += (word_style, default, name_style)
+                        last_style = name_style
+                        pos = n.end()
+                        continue
+                    style = word_style
+                else:
+                    style = words.get(token, default)
+            if style != last_style:
+                starts.append(pos)
+                styles.append(style)
+                last_style = style
+            pos = m.end()
+
+        if state and not self.spans[state][2] and not line.rstrip(b"\r\n").endswith(b"\\"):
+            # unterminated single line span ends with the line
+            state = 0
+        starts.append(end)
+        return [(starts[i + 1] - starts[i], style) for i, style in enumerate(styles)], state
 
 
 class BaseLexer(QsciLexerCustom):
     """ Base Lexer Class to Support Syntax Highlighting for all Languages """
 
+    # Subclasses describe a language by overriding these tables
+    span_rules: tuple[SpanRule, ...] = ()
+    # regex for anything allowed in front of a span opening, like string prefixes
+    span_prefix: bytes = b""
+    token_rules: tuple[TokenRule, ...] = (
+        ("word", IDENTIFIER),
+    )
+    # word -> (style of the word, style of the name that follows it)
+    definer_rules: dict[str, tuple[str, str]] = {}
+
+    # Documents of this many bytes are styled a screen at a time
+    BACKGROUND_THRESHOLD = 1024 * 1024
+    # Ranges up to this many lines are still styled in one go
+    SYNC_LINES = 300
+    # ms to wait after an edit before scanning again
+    SCAN_DELAY = 200
+
     def __init__(self, language_name, editor, theme=None, default_config: DefaultConfig = None):
         super(BaseLexer, self).__init__(editor)
 
@@ -19,12 +165,11 @@ class BaseLexer(QsciLexerCustom):
         self.language_name = language_name
         self.theme_json = None
         if theme is None:
-            self.theme = "./resources/static/data/theme.json"
+            self.theme = "./src/resources/data/theme.json"
         else:
             self.theme = theme
-        self.token_list: list[str, str] = []
-        self.keywords_list = []
-        self.builtin_names = []
+        self.keywords_list = frozenset()
+        self.builtin_names = frozenset()
         if default_config is None:
             default_config: DefaultConfig = {}
             default_config["color"] = "#aab2bf"
@@ -38,14 +183,49 @@ class BaseLexer(QsciLexerCustom):
 
         self._init_theme_variables()
         self._init_theme()
+        self.engine = TokenEngine(
+            self.span_rules,
+            self.span_prefix,
+            self.token_rules,
+            self.definer_rules,
+            {name: getattr(self, name.upper()) for name in self.default_names}
+        )
+
+        # Nothing has been styled yet, so the whole document is dirty
+        self._dirty_end = self.editor.length()
+        self.editor.SCN_MODIFIED.connect(self._on_modified)
+
+        # Background scan of line states for large documents. Lines before
+        # `_scan_line` have valid states, lines before `_scan_end` were
+        # scanned at some point.
+        self._generation = 0
+        self._scan_line = 0
+        self._scan_end = 0
+        self._scan_previous = self.LINE_DEFAULT
+        self._scan_timer = QTimer(self)
+        self._scan_timer.setSingleShot(True)
+        self._scan_timer.setInterval(self.SCAN_DELAY)
+        self._scan_timer.timeout.connect(self._start_scan)
+        self.highlighter = HighlightWorker(self.engine)
+        self.highlighter.chunk_ready.connect(self._apply_scan_chunk)
+        self.highlighter.finished.connect(self._on_scan_finished)
+        self.editor.SCN_UPDATEUI.connect(self._on_update_ui)
+
+    def stop(self):
+        """ Stop the background scan, before the lexer is deleted """
+        self._scan_timer.stop()
+        self.highlighter.cancel()
+        self.highlighter.wait()
 
     def set_keywords(self, keywords: list[str]):
         """ Set list of strings that are considered keywords for a language"""
-        self.keywords_list = keywords
+        self.keywords_list = frozenset(keywords)
+        self.engine.set_words(self.keywords_list, self.KEYWORD)
 
     def set_builtin_names(self, builtin_names: list[str]):
         """ Set list of strings that are builtin keywords in a language"""
-        self.builtin_names = builtin_names
+        self.builtin_names = frozenset(builtin_names)
+        self.engine.set_words(self.builtin_names, self.TYPES)
 
     def _init_theme_variables(self):
         # Color per style
@@ -61,6 +241,15 @@ class BaseLexer(QsciLexerCustom):
         self.CLASSES = 9
         self.FUNCTION_DEF = 10
 
+        # State a line ends in, stored per line with SCI_SETLINESTATE.
+        # Any other value is the 1-based index of the open span rule.
+        self.LINE_DEFAULT = 0
+        self.LINE_STATE_MASK = 0xffff
+        # the state is the real one, not a guess
+        self.LINE_KNOWN = 1 << 16
+        # the line has been styled from the state of the line above
+        self.LINE_STYLED = 1 << 17
+
         self.default_names = (
             "default",
             "keyword",
@@ -142,35 +331,201 @@ class BaseLexer(QsciLexerCustom):
             return "FUNCTION_DEF"
         return ""
 
-    def generate_token(self, text):
-        p = re.compile(r"[*]\/|\/[*]|\s+|\w+|\W")
+    def _on_modified(self, position, modification_type, text, length, lines_added, *args):
+        """ Track the end of the region edited since it was last styled """
+        if modification_type & QsciScintilla.SC_MOD_INSERTTEXT:
+            if self._dirty_end > position:
+                self._dirty_end += length
+            self._dirty_end = max(self._dirty_end, position + length)
+        elif modification_type & QsciScintilla.SC_MOD_DELETETEXT:
+            if self._dirty_end > position:
+                self._dirty_end = max(position, self._dirty_end - length)
+            self._dirty_end = max(self._dirty_end, position)
+        else:
+            return
+        # The rest of the line the edit ends in moved, was split off or was
+        # joined to it, and the state kept for that line may be the one of the
+        # line it was joined to. Only the state of the line after it can tell
+        # whether styling may stop.
+        end_line = self.editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, self._dirty_end)
+        after_next = self.editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, end_line + 2)
+        self._dirty_end = max(self._dirty_end, after_next if after_next >= 0 else self.editor.length())
+
+        if self.is_background():
+            # Results of a scan of the old text are no longer valid
+            self._generation += 1
+            line = self.editor.SendScintilla(
+                QsciScintilla.SCI_LINEFROMPOSITION, position)
+            if line < self._scan_end:
+                self._scan_end = max(line, self._scan_end + lines_added)
+            self._scan_line = min(self._scan_line, line)
+            self._scan_timer.start()
 
-        # 'token_list' is a list of tuples: (token_name, token_len), ex: '(class, 5)'
-        self.token_list = [(token, len(bytearray(token, "utf-8")))
-                           for token in p.findall(text)]
+    def mark_dirty(self, position: int):
+        """ Text from `position` to the end came in without modification events, as a file loads """
+        editor = self.editor
+        self._dirty_end = max(self._dirty_end, editor.length())
+        line = editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, position)
+        # the line was cut short when it was styled, the state it ended in is no longer its own
+        editor.SendScintilla(QsciScintilla.SCI_SETLINESTATE, line, self.LINE_DEFAULT)
+        if self.is_background():
+            self._generation += 1
+            self._scan_end = min(self._scan_end, line)
+            self._scan_line = min(self._scan_line, line)
+            self._scan_timer.start()
 
-    def next_token(self, skip: int = None):
-        if len(self.token_list) > 0:
-            if skip is not None and skip != 0:
-                for _ in range(skip-1):
-                    if len(self.token_list) > 0:
-                        self.token_list.pop(0)
-            return self.token_list.pop(0)
+    def line_state(self, line: int) -> int:
+        return self.editor.SendScintilla(QsciScintilla.SCI_GETLINESTATE, line)
+
+    def is_background(self) -> bool:
+        """ Large documents are scanned in the background and styled per screen """
+        return self.editor.length() >= self.BACKGROUND_THRESHOLD
+
+    def visible_lines(self) -> tuple[int, int]:
+        editor = self.editor
+        first = editor.SendScintilla(QsciScintilla.SCI_GETFIRSTVISIBLELINE)
+        last = first + editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+        return (
+            editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, first),
+            editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, last),
+        )
+
+    def styleText(self, start: int, end: int) -> None:
+        """
+            Style line by line from the first line needing it, carrying the
+            state each line ends in. Once a line past the edited region ends
+            in the same state as before, the rest of the document is unchanged
+            and styling stops there.
+
+            In large documents long ranges are cut down to the visible lines,
+            the rest is styled as it scrolls into view.
+        """
+        editor = self.editor
+        line = editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, start)
+
+        if not self.is_background():
+            self.style_lines(line, end)
         else:
-            return None
-
-    def peek_token(self, n=0):
-        try:
-            return self.token_list[n]
-        except IndexError:
-            return ['']
-
-    def skip_space_peek(self, skip=None):
-        i = 0
-        token = " "
-        if skip is not None:
-            i = skip
-        while token[0].isspace():
-            token = self.token_list[i]
-            i += 1
-        return token, i
+            last_line = editor.SendScintilla(
+                QsciScintilla.SCI_LINEFROMPOSITION, end)
+            if last_line - line <= self.SYNC_LINES:
+                self.style_lines(line, end)
+            else:
+                first_visible, last_visible = self.visible_lines()
+                visible_end = min(end, editor.SendScintilla(
+                    QsciScintilla.SCI_POSITIONFROMLINE, last_visible + 1))
+                self.style_lines(max(line, first_visible), visible_end, False)
+            if self._scan_line < editor.lines() and not self._scan_timer.isActive():
+                self._scan_timer.start()
+
+        self.startStyling(end)
+
+    def style_lines(self, line: int, end: int, incremental: bool = True):
+        """ Style from `line` up to the position `end` """
+        editor = self.editor
+        previous_line = self.line_state(line - 1) if line > 0 else self.LINE_KNOWN
+        state = previous_line & self.LINE_STATE_MASK
+        # Without a known starting state the styling is a best guess until
+        # the background scan gets here
+        flags = self.LINE_STYLED | (previous_line & self.LINE_KNOWN)
+        last_line = editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, end)
+
+        while line <= last_line:
+            line_start = editor.SendScintilla(
+                QsciScintilla.SCI_POSITIONFROMLINE, line)
+            if line_start >= end:
+                break
+            line_end = editor.SendScintilla(
+                QsciScintilla.SCI_POSITIONFROMLINE, line + 1)
+
+            self.startStyling(line_start)
+            text = bytes(editor.bytes(line_start, line_end))[:line_end - line_start]
+            state = self.style_line(text, state)
+            previous_state = self.line_state(line)
+            editor.SendScintilla(
+                QsciScintilla.SCI_SETLINESTATE, line, state | flags)
+
+            if incremental and line_end >= self._dirty_end:
+                self._dirty_end = -1
+                if previous_state == state | flags:
+                    # Nothing below changed, keep its styling
+                    break
+            line += 1
+
+    def style_line(self, text: bytes, state: int) -> int:
+        """ Style one line starting in `state` and return the state it ends in """
+        runs, state = self.engine.tokenize(text, state)
+        for length, style in runs:
+            self.setStyling(length, style)
+        return state
+
+    def style_visible(self):
+        """ Style the lines on screen that were skipped or went stale """
+        if not self.is_background():
+            return
+        editor = self.editor
+        end_styled = editor.SendScintilla(QsciScintilla.SCI_GETENDSTYLED)
+        first_visible, last_visible = self.visible_lines()
+        restyled = False
+        for line in range(first_visible, last_visible + 1):
+            if not self.line_state(line) & self.LINE_STYLED:
+                self.style_lines(line, editor.SendScintilla(
+                    QsciScintilla.SCI_POSITIONFROMLINE, line + 1), False)
+                restyled = True
+        if restyled:
+            self.startStyling(end_styled)
+
+    def _on_update_ui(self, updated: int):
+        if updated & QsciScintilla.SC_UPDATE_V_SCROLL:
+            self.style_visible()
+
+    def _start_scan(self):
+        if self.highlighter.isRunning():
+            # picked up again once the running scan has stopped
+            self.highlighter.cancel()
+            return
+        editor = self.editor
+        line = self._scan_line
+        if line >= editor.lines():
+            return
+        start = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, line)
+        length = editor.length()
+        state = self.line_state(line - 1) & self.LINE_STATE_MASK if line > 0 else self.LINE_DEFAULT
+        self._scan_previous = state
+        self.highlighter.scan(
+            self._generation, line, state,
+            bytes(editor.bytes(start, length))[:length - start])
+
+    def _on_scan_finished(self):
+        if self._scan_line < self.editor.lines() and not self._scan_timer.isActive():
+            self._scan_timer.start()
+
+    def _apply_scan_chunk(self, generation: int, first_line: int, start_state: int, states: list):
+        """ Store the states the background scan worked out """
+        if generation != self._generation or first_line != self._scan_line:
+            return
+        editor = self.editor
+        # the state the next line was last styled from
+        previous = self._scan_previous
+        expected = start_state
+        changed = False
+        for line, state in enumerate(states, first_line):
+            old = self.line_state(line)
+            flags = self.LINE_KNOWN
+            if previous == expected:
+                flags |= old & self.LINE_STYLED
+            new = state | flags
+            if new != old:
+                editor.SendScintilla(QsciScintilla.SCI_SETLINESTATE, line, new)
+                changed = True
+            previous = old & self.LINE_STATE_MASK
+            expected = state
+        self._scan_previous = previous
+
+        self._scan_line = first_line + len(states)
+        if not changed and self._scan_line < self._scan_end:
+            # Caught up with an earlier scan, everything below is still valid
+            self.highlighter.cancel()
+            self._scan_line = self._scan_end
+        self._scan_end = max(self._scan_end, self._scan_line)
+        self.style_visible()
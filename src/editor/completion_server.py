@@ -0,0 +1,257 @@
+# STD
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+# Installed
+from PyQt6.QtCore import QObject, QStandardPaths, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+WORKER_SCRIPT = Path(__file__).with_name("completion_worker.py")
+
+# callback(result, error), error is None on success
+Callback = Callable[[object, str], None]
+
+
+class Request:
+    __slots__ = ("id", "method", "params", "callback", "key", "timeout", "deadline")
+
+    def __init__(self, id_, method, params, callback, key, timeout):
+        self.id = id_
+        self.method = method
+        self.params = params
+        self.callback = callback
+        self.key = key
+        self.timeout = timeout
+        self.deadline = 0.0
+
+
+class WorkerProcess:
+    """ A worker process, the reader thread on its stdout and its running request """
+
+    def __init__(self, server: "CompletionServer"):
+        self.process = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT), str(server.MEMORY_LIMIT), server.index_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.request: Request = None
+        # since when the worker's warm-up holds jedi, 0 when it doesn't
+        self.warming_since = 0.0
+        self.reader = threading.Thread(
+            target=self.read, args=(server,), daemon=True)
+        self.reader.start()
+
+    def read(self, server: "CompletionServer"):
+        try:
+            for line in self.process.stdout:
+                server._received.emit(self, line)
+            if not server.stopped:
+                server._exited.emit(self)
+        except RuntimeError:
+            # the server was deleted while the application shut down
+            pass
+
+    def send(self, request: Request):
+        message = {"id": request.id, "method": request.method, "params": request.params}
+        self.process.stdin.write(json.dumps(message).encode() + b"\n")
+        self.process.stdin.flush()
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+
+
+class CompletionServer(QObject):
+    """
+        Pool of jedi worker processes shared by all editors. Requests are
+        queued and handed to idle workers, each with a timeout. A worker that
+        crashes, hangs past a timeout or goes over its memory cap is replaced.
+        One more worker, outside the pool, keeps the on-disk index of
+        installed packages up to date for the others.
+    """
+    # raised from reader threads, handled on the UI thread
+    _received = pyqtSignal(object, bytes)
+    _exited = pyqtSignal(object)
+
+    POOL_SIZE = 2
+    # seconds before a request fails and its worker is restarted
+    TIMEOUT = 5.0
+    # seconds one module of a worker's warm-up may hold jedi, a request
+    # waiting meanwhile isn't timed until then
+    WARM_UP_STEP_TIMEOUT = 60.0
+    # bytes of memory a worker may use before it is replaced
+    MEMORY_LIMIT = 1024 * 1024 * 1024
+    # times the indexer is restarted after dying before it is given up on
+    INDEX_RESTARTS = 3
+
+    _shared: "CompletionServer" = None
+
+    @classmethod
+    def shared(cls) -> "CompletionServer":
+        """ The server used by every editor in this process """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, pool_size: int = None):
+        super(CompletionServer, self).__init__(None)
+        self.pool_size = pool_size or self.POOL_SIZE
+        self.root: str = None
+        self.queue: list[Request] = []
+        self.next_id = 1
+        self.stopped = False
+        self.restarts = 0
+        self.timeouts = 0
+        self.index_path = str(Path(QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.CacheLocation)) / "packages.sqlite")
+        self.indexer: WorkerProcess = None
+        self.index_restarts = 0
+
+        self._received.connect(self._on_received)
+        self._exited.connect(self._on_exited)
+        self.workers = [WorkerProcess(self) for _ in range(self.pool_size)]
+
+        self.watchdog = QTimer(self)
+        self.watchdog.setInterval(250)
+        self.watchdog.timeout.connect(self._check_timeouts)
+        self.watchdog.start()
+        QApplication.instance().aboutToQuit.connect(self.stop)
+
+    def request(self, method: str, params: dict, callback: Callback,
+                key=None, timeout: float = None) -> bool:
+        """
+            Queue a request. A queued request with the same `key` that no
+            worker has started yet is dropped, returns True when that happens.
+        """
+        superseded = False
+        if key is not None:
+            for queued in self.queue:
+                if queued.key == key:
+                    self.queue.remove(queued)
+                    superseded = True
+                    break
+        self.queue.append(Request(
+            self.next_id, method, params, callback, key, timeout or self.TIMEOUT))
+        self.next_id += 1
+        self._dispatch()
+        return superseded
+
+    def set_root(self, root):
+        """ Point every worker, and any restarted later, at the workspace `root` """
+        self.root = str(Path(root).absolute())
+        for worker in self.workers:
+            self._send_root(worker)
+
+    def index_packages(self):
+        """ Index the packages that changed since last time in a worker of its own """
+        if self.indexer is not None or self.stopped:
+            return
+        self.indexer = WorkerProcess(self)
+        try:
+            self.indexer.send(Request(0, "index_packages", {}, None, None, 0))
+        except OSError:
+            pass
+
+    def stop(self):
+        self.stopped = True
+        self.watchdog.stop()
+        for worker in self.workers + [self.indexer]:
+            if worker is not None:
+                worker.process.stdin.close()
+                worker.kill()
+
+    def _send_root(self, worker: WorkerProcess):
+        if self.root is None:
+            return
+        # Goes straight down the pipe, the worker reads it before the next request
+        try:
+            worker.send(Request(0, "set_root", {"root": self.root}, None, None, 0))
+        except OSError:
+            pass
+
+    def _dispatch(self):
+        for worker in self.workers:
+            if not self.queue:
+                return
+            if worker.request is None:
+                request = self.queue.pop(0)
+                request.deadline = time.monotonic() + request.timeout
+                worker.request = request
+                try:
+                    worker.send(request)
+                except OSError:
+                    # died under us, _on_exited restarts it and fails the request
+                    pass
+
+    def _finish(self, worker: WorkerProcess, result, error: str = None):
+        request, worker.request = worker.request, None
+        if request is not None and request.callback is not None:
+            request.callback(result, error)
+
+    def _on_received(self, worker: WorkerProcess, line: bytes):
+        if worker is self.indexer:
+            # the index is up to date, the indexer isn't needed anymore
+            response = json.loads(line)
+            if "error" in response:
+                print(response["error"])
+            self.indexer = None
+            worker.process.stdin.close()
+            return
+        if worker not in self.workers:
+            return
+        response = json.loads(line)
+        if "warming" in response:
+            self._warming(worker, response["warming"])
+            return
+        if worker.request is None or response["id"] != worker.request.id:
+            # answer to set_root
+            return
+        self._finish(worker, response.get("result"), response.get("error"))
+        self._dispatch()
+
+    def _warming(self, worker: WorkerProcess, started: bool):
+        now = time.monotonic()
+        if started:
+            worker.warming_since = now
+            return
+        request = worker.request
+        if request is not None and worker.warming_since:
+            # the request waited on the warm-up, that time isn't its own
+            paused = now - max(worker.warming_since, request.deadline - request.timeout)
+            request.deadline += max(paused, 0.0)
+        worker.warming_since = 0.0
+
+    def _on_exited(self, worker: WorkerProcess):
+        if worker is self.indexer and not self.stopped:
+            # finished packages are kept, a new indexer carries on from there
+            self.indexer = None
+            if self.index_restarts < self.INDEX_RESTARTS:
+                self.index_restarts += 1
+                self.index_packages()
+            return
+        if worker not in self.workers or self.stopped:
+            return
+        self._finish(worker, None, "worker exited")
+        self._replace(worker)
+
+    def _replace(self, worker: WorkerProcess):
+        worker.kill()
+        self.restarts += 1
+        fresh = WorkerProcess(self)
+        self.workers[self.workers.index(worker)] = fresh
+        self._send_root(fresh)
+        self._dispatch()
+
+    def _check_timeouts(self):
+        now = time.monotonic()
+        for worker in list(self.workers):
+            if worker.warming_since and now - worker.warming_since < self.WARM_UP_STEP_TIMEOUT:
+                # the request can't start before the warm-up lets go of jedi
+                continue
+            if worker.request is not None and now > worker.request.deadline:
+                # jedi can't be interrupted, the only way out is a new worker
+                self.timeouts += 1
+                self._finish(worker, None, "timed out")
+                self._replace(worker)
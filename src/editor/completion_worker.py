@@ -0,0 +1,196 @@
+"""
+    Completion worker process started by CompletionServer.
+
+    Reads one JSON request per line on stdin, `{"id", "method", "params"}`,
+    and answers each with one JSON line on stdout, `{"id", "result"}` or
+    `{"id", "error"}`. `{"warming": true}` and `{"warming": false}` lines
+    tell when the warm-up holds jedi, time a request waits that doesn't
+    count towards its timeout. Nothing here imports Qt.
+"""
+# STD
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+# Installed
+from jedi import Project, Script
+# Custom
+# run as a script, this directory is first on sys.path
+from package_index import PackageIndex
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, the memory cap is skipped there
+    resource = None
+
+# jedi isn't thread safe, every call into it holds this lock
+JEDI_LOCK = threading.Lock()
+# set while no request is being answered, the warm-up only goes on then
+IDLE = threading.Event()
+IDLE.set()
+# the main loop and the warm-up thread both write to the protocol stream
+PROTOCOL_LOCK = threading.Lock()
+protocol = sys.stdout
+
+# Warmed up for every workspace on top of the workspace's own imports
+COMMON_MODULES = (
+    "os", "sys", "re", "json", "typing", "pathlib", "collections",
+    "itertools", "functools", "dataclasses", "subprocess", "datetime",
+)
+
+
+class Workspace:
+    """
+        One jedi Project for the opened folder, shared by every request.
+        Setting the root warms jedi's caches up on a thread by completing on
+        common stdlib modules and on the workspace's most used imports. The
+        warm-up holds jedi one module at a time and waits while requests are
+        answered, so a request waits for one module at most.
+    """
+    # most used top level imports of the workspace that get warmed up
+    MAX_IMPORTS = 20
+    # python files read to find those imports
+    MAX_FILES = 500
+    EXCLUDE_DIRS = {".git", ".svn", ".hg", ".idea", "__pycache__", "venv", ".venv", "node_modules"}
+
+    def __init__(self):
+        self.root: str = None
+        self.project: Project = None
+        self.warmed: set[tuple[str, str]] = set()
+
+    def set_root(self, root: str):
+        self.root = str(Path(root).absolute())
+        self.project = Project(self.root)
+        threading.Thread(target=self.warm_up, args=(
+            self.root, self.project), daemon=True).start()
+
+    def warm_up(self, root: str, project: Project):
+        for name in COMMON_MODULES + tuple(self.top_level_imports(root)):
+            if root != self.root:
+                # the root changed, a newer thread is warming that one up
+                return
+            if (root, name) in self.warmed:
+                continue
+            IDLE.wait()
+            try:
+                with JEDI_LOCK:
+                    send({"warming": True})
+                    try:
+                        Script(f"import {name}\n{name}.", project=project).complete(2, len(name) + 1)
+                    finally:
+                        send({"warming": False})
+            except Exception as err:
+                print(err, file=sys.stderr)
+            self.warmed.add((root, name))
+
+    def top_level_imports(self, root: str) -> list[str]:
+        """ Modules most imported by the workspace, without its own modules """
+        pattern = re.compile(r"^(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+        local = set()
+        counts = Counter()
+        files = 0
+        for dir_path, dirs, file_names in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in self.EXCLUDE_DIRS and not d.startswith(".")]
+            if dir_path == root:
+                local.update(dirs)
+            for file_name in file_names:
+                if not file_name.endswith(".py"):
+                    continue
+                if dir_path == root:
+                    local.add(file_name[:-3])
+                if files >= self.MAX_FILES:
+                    break
+                files += 1
+                try:
+                    with open(os.path.join(dir_path, file_name), "r", encoding="utf-8") as f:
+                        counts.update(set(pattern.findall(f.read())))
+                except (OSError, UnicodeDecodeError):
+                    continue
+        return [name for name, _ in counts.most_common()
+                if name not in local][:self.MAX_IMPORTS]
+
+
+workspace = Workspace()
+# set from the command line, None when there is no index
+package_index: PackageIndex = None
+
+
+def set_root(params: dict) -> None:
+    workspace.set_root(params["root"])
+
+
+def complete(params: dict) -> list[dict]:
+    if package_index is not None:
+        completions = package_index.complete(params["text"], params["line"], params["column"])
+        if completions is not None:
+            return completions
+    with JEDI_LOCK:
+        script = Script(params["text"], path=params["path"], project=workspace.project)
+        completions = script.complete(params["line"], params["column"])
+        return [{"name": c.name, "type": c.type} for c in completions]
+
+
+def index_packages(params: dict) -> None:
+    if hasattr(os, "nice"):
+        # this process only indexes, completions come first
+        os.nice(10)
+    package_index.update()
+
+
+METHODS = {
+    "set_root": set_root,
+    "complete": complete,
+    "index_packages": index_packages,
+}
+
+
+def send(message: dict):
+    with PROTOCOL_LOCK:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+
+def peak_memory() -> int:
+    """ Peak resident memory of this process in bytes, 0 if unknown """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main():
+    global package_index, protocol
+    memory_limit = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    if len(sys.argv) > 2:
+        package_index = PackageIndex(sys.argv[2])
+    if memory_limit and resource is not None:
+        # Hard ceiling so one runaway inference fails with MemoryError
+        # instead of taking the machine down, the soft limit is checked below
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit * 2, memory_limit * 2))
+
+    # Keep stray prints out of the protocol stream
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        IDLE.clear()
+        try:
+            response = {"id": request["id"], "result": METHODS[request["method"]](request["params"])}
+        except Exception as err:
+            response = {"id": request["id"], "error": f"{type(err).__name__}: {err}"}
+        send(response)
+        IDLE.set()
+
+        if memory_limit and peak_memory() > memory_limit:
+            # exit and let the server start a fresh worker
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import ctypes
 from pathlib import Path
 # Installed
 from PyQt6.QtCore import *
@@ -5,17 +6,49 @@ from PyQt6.QtGui import *
 from PyQt6.Qsci import *
 # Custom
 from editor.custom_lexer import CustomLexer
-from editor.autocomplete import AutoComplete
+from editor.autocomplete import CompletionService
+from editor.file_loader import FileLoader
+from editor.file_saver import FileSaver, recovery_path, remove_recovery
 
 
 class Editor(QsciScintilla):
+    # bytes read, size of the file
+    load_progress = pyqtSignal(int, int)
+    # error message, empty when the whole file is in
+    loaded = pyqtSignal(str)
+    # path written, error message empty once it is
+    saved = pyqtSignal(object, str)
+
+    # milliseconds from an edit to the autosave of the unsaved text
+    AUTOSAVE_DELAY = 30 * 1000
+
     def __init__(self, parent=None, path: Path = None, is_python_file=True):
         super(Editor, self).__init__(parent)
         self.path = path
-        self.full_path = self.path.absolute()
+        # None for an untitled tab
+        self.full_path = self.path.absolute() if self.path is not None else None
         self.is_python_file = is_python_file
+        self.loader: FileLoader = None
+        # edits made, a save only marks the text clean if none came after its snapshot
+        self.version = 0
+        self.saver: FileSaver = None
+        self.saving_version = 0
+        # asked for while a save was running
+        self.save_queued: Path = None
+        self.autosaver: FileSaver = None
+        self.autosaved_version = 0
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(self.AUTOSAVE_DELAY)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.textChanged.connect(self._edited)
+        # cursor position and first visible line asked for before they had loaded
+        self.pending_position: tuple[int, int] = None
+        self.pending_first_line: int = None
 
-        self.cursorPositionChanged.connect(self.cursor_position_changed)
+        # Only typed characters ask for completions, other edits and
+        # moving the cursor don't
+        self.SCN_CHARADDED.connect(self.char_added)
 
         # Encoding
         self.setUtf8(True)
@@ -57,11 +90,14 @@ class Editor(QsciScintilla):
             self.py_lexer = CustomLexer(self)
             self.py_lexer.setDefaultFont(self.window_font)
 
-            # API
-            # https://qscintilla.com/
-            self.api = QsciAPIs(self.py_lexer)
-            self.auto_complete = AutoComplete(self.full_path, self.api)
-            self.auto_complete.finished.connect(self.load_auto_complete)
+            # Completions feed the popup directly, not through QsciAPIs
+            self.setAutoCompletionSource(
+                QsciScintilla.AutoCompletionSource.AcsNone)
+            self.auto_complete = CompletionService(
+                self, self.full_path,
+                self.py_lexer.keywords_list | self.py_lexer.builtin_names)
+            self.auto_complete.completions_ready.connect(
+                self.show_completions)
             self.setLexer(self.py_lexer)
         else:
             self.setPaper(QColor("#282c34"))
@@ -77,15 +113,225 @@ class Editor(QsciScintilla):
         # Key Press Events
         # self.keyPressEvent = self.handle_key_press
 
+    def set_path(self, path: Path):
+        """ The file was renamed, moved or saved under another name """
+        # the autosaved copy goes by the file's path
+        remove_recovery(self.recovery_path())
+        self.autosaved_version = None
+        self.path = path
+        self.full_path = path.absolute()
+        if self.is_python_file:
+            self.auto_complete.worker.file_path = self.full_path
+        if self.isModified():
+            self.autosave_timer.start()
+
+    def load(self):
+        """ Read the file in chunks, the editor can be used once the first one is in """
+        # room for the whole text up front, growing the buffer copies it
+        self.SendScintilla(QsciScintilla.SCI_ALLOCATE, self.path.stat().st_size + 1)
+        self.loader = FileLoader(self.path, self)
+        self.loader.chunk_ready.connect(self._append_chunk)
+        self.loader.progress.connect(self.load_progress)
+        self.loader.done.connect(self._loaded)
+        self.loader.start()
+
+    def is_loading(self) -> bool:
+        return self.loader is not None
+
+    def stop_loading(self):
+        if self.loader is not None:
+            self.loader.stop()
+            self.loader = None
+
+    def _append_chunk(self, text: str):
+        if self.loader is None:
+            return
+        # Loaded text isn't an edit to undo, edits made meanwhile are all
+        # before it so their undo positions hold. QScintilla's handling of
+        # modification events costs the size of the whole text per append.
+        mask = self.SendScintilla(QsciScintilla.SCI_GETMODEVENTMASK)
+        modified = self.isModified()
+        self.SendScintilla(QsciScintilla.SCI_SETMODEVENTMASK, 0)
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 0)
+        # nor does it make the tab unsaved
+        self.blockSignals(True)
+        start = self.length()
+        self.append(text)
+        if not modified:
+            self.setModified(False)
+        self.blockSignals(False)
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 1)
+        self.SendScintilla(QsciScintilla.SCI_SETMODEVENTMASK, mask)
+        if self.is_python_file:
+            # the lexer heard nothing of the new text
+            self.py_lexer.mark_dirty(start)
+        self.loader.taken()
+        self._apply_pending()
+
+    def _loaded(self, error: str):
+        if self.loader is None:
+            return
+        self.loader.wait()
+        self.loader = None
+        self._apply_pending()
+        self.loaded.emit(error)
+
+    def _apply_pending(self):
+        # each is asked for again, and stays pending while it can't be done yet
+        if self.pending_position is not None:
+            self.go_to(*self.pending_position)
+        if self.pending_first_line is not None:
+            self.scroll_to(self.pending_first_line)
+
+    def _edited(self):
+        self.version += 1
+        # at most one autosave every AUTOSAVE_DELAY while typing
+        if not self.autosave_timer.isActive():
+            self.autosave_timer.start()
+
+    def snapshot(self) -> bytes:
+        """ The text as UTF-8, copied from the buffer, text() builds a str five times slower """
+        length = self.SendScintilla(QsciScintilla.SCI_GETLENGTH)
+        if not length:
+            return b""
+        return ctypes.string_at(self.SendScintilla(QsciScintilla.SCI_GETCHARACTERPOINTER), length)
+
+    def is_saving(self) -> bool:
+        return self.saver is not None
+
+    def save(self, path: Path):
+        """ Write the text to `path` off the UI thread, `saved` tells how it went """
+        if self.saver is not None:
+            # the running save has an older text, this one follows it
+            self.save_queued = path
+            return
+        self.saving_version = self.version
+        saver = self.saver = FileSaver(path, self.snapshot(), parent=self)
+        saver.done.connect(lambda error: self._saved(saver, error))
+        saver.start()
+
+    def _saved(self, saver: FileSaver, error: str):
+        # already handled when the application waited for it
+        if saver is not self.saver:
+            return
+        self.saver = None
+        saver.wait()
+        saver.deleteLater()
+        if not error:
+            if self.version == self.saving_version:
+                self.setModified(False)
+            remove_recovery(self.recovery_path())
+        self.saved.emit(saver.path, error)
+        if self.save_queued is not None:
+            path, self.save_queued = self.save_queued, None
+            self.save(path)
+
+    def recovery_path(self) -> Path:
+        if self.full_path is None:
+            return recovery_path(f"untitled-{id(self)}", "untitled")
+        return recovery_path(str(self.full_path), self.path.name)
+
+    def autosave(self):
+        """ Copy unsaved text to the recovery folder, the file itself is left alone """
+        if not self.isModified() or self.autosaver is not None or self.version == self.autosaved_version:
+            return
+        self.autosaved_version = self.version
+        autosaver = self.autosaver = FileSaver(self.recovery_path(), self.snapshot(), str(self.full_path or ""), self)
+        autosaver.done.connect(lambda error: self._autosaved(autosaver, error))
+        autosaver.start()
+
+    def _autosaved(self, autosaver: FileSaver, error: str):
+        if autosaver is not self.autosaver:
+            return
+        self.autosaver = None
+        autosaver.wait()
+        autosaver.deleteLater()
+        if error:
+            # tried again after the next edit
+            self.autosaved_version = None
+        elif not self.isModified():
+            # saved meanwhile
+            remove_recovery(self.recovery_path())
+
+    def discard_recovery(self):
+        """ The tab is closed, its unsaved text goes with it """
+        self.autosave_timer.stop()
+        if self.autosaver is not None:
+            self.autosaver.wait()
+            self._autosaved(self.autosaver, self.autosaver.error)
+        remove_recovery(self.recovery_path())
+
+    def close_down(self):
+        """ The tab is closed, nothing of it runs once it is deleted """
+        self.stop_loading()
+        self.discard_recovery()
+        self.finish_saving()
+        if self.is_python_file:
+            self.auto_complete.cancel()
+            self.py_lexer.stop()
+
+    def finish_saving(self):
+        """ Wait for the saves running and the one asked for meanwhile, before the application quits """
+        while self.saver is not None:
+            self.saver.wait()
+            self._saved(self.saver, self.saver.error)
+        if self.autosaver is not None:
+            self.autosaver.wait()
+            self._autosaved(self.autosaver, self.autosaver.error)
+
+    def go_to(self, line: int, index: int):
+        """ Move the cursor to `line`, `index`, once that line has loaded """
+        # the last line may still be cut short
+        if self.loader is not None and line >= self.lines() - 1:
+            self.pending_position = (line, index)
+            return
+        self.pending_position = None
+        self.setCursorPosition(line, index)
+
+    def scroll_to(self, line: int):
+        """ Make `line` the first one on screen, once the lines it shows have loaded """
+        if self.loader is not None and \
+                line + self.SendScintilla(QsciScintilla.SCI_LINESONSCREEN) >= self.lines() - 1:
+            self.pending_first_line = line
+            return
+        self.pending_first_line = None
+        self.setFirstVisibleLine(line)
+
+    def cursor_line(self) -> int:
+        """ Line of the file the cursor is on """
+        return self.getCursorPosition()[0]
+
+    def first_visible_line(self) -> int:
+        """ Line of the file at the top of the screen """
+        return self.firstVisibleLine()
+
+    def view_state(self) -> dict:
+        """ What a session keeps of the tab """
+        return {"path": str(self.full_path), "line": self.cursor_line(),
+                "index": self.getCursorPosition()[1], "first_visible": self.first_visible_line()}
+
+    def find_text(self, text: str) -> bool:
+        """ Select the next `text` after the cursor, ignoring case and wrapping around """
+        return self.findFirst(text, False, False, False, True)
+
     def keyPressEvent(self, e: QKeyEvent) -> None:
         if e.modifiers() == Qt.KeyboardModifier.ControlModifier and e.key() == Qt.Key.Key_Space:
-            self.autoCompleteFromAll()
+            if self.is_python_file:
+                self.auto_complete.request(immediate=True)
+            else:
+                self.autoCompleteFromAll()
         else:
             return super().keyPressEvent(e)
 
-    def cursor_position_changed(self, line: int, index: int) -> None:
+    def char_added(self, char: int) -> None:
         if self.is_python_file:
-            self.auto_complete.get_completions(line+1, index, self.text())
+            self.auto_complete.request()
 
-    def load_auto_complete(self):
-        pass
+    def show_completions(self, word_length: int, names: list[str]):
+        """ Open the popup on `names`, or replace the list it shows """
+        if not names:
+            if self.isListActive():
+                self.cancelList()
+            return
+        self.SendScintilla(QsciScintilla.SCI_AUTOCSHOW,
+                           word_length, " ".join(names).encode())
@@ -0,0 +1,67 @@
+# STD
+import codecs
+import os
+# Installed
+from PyQt6.QtCore import QSemaphore, QThread, pyqtSignal
+
+
+class FileLoader(QThread):
+    """
+        Reads a file off the UI thread in chunks decoded as UTF-8. The first
+        chunk is small so the first screen shows at once, the next ones are
+        read at most AHEAD chunks ahead of what the editor has taken.
+    """
+    # decoded text of the next chunk
+    chunk_ready = pyqtSignal(str)
+    # bytes read, size of the file
+    progress = pyqtSignal(int, int)
+    # error message, empty when the whole file was read
+    done = pyqtSignal(str)
+
+    FIRST_CHUNK = 64 * 1024
+    CHUNK_SIZE = 1024 * 1024
+    # chunks read and not taken yet
+    AHEAD = 2
+
+    def __init__(self, path, parent=None):
+        super(FileLoader, self).__init__(parent)
+        self.path = path
+        self.free = QSemaphore(self.AHEAD)
+
+    def taken(self):
+        """ The editor took a chunk, another one can be read """
+        self.free.release()
+
+    def stop(self):
+        self.requestInterruption()
+        # wakes the thread if it waits for the editor
+        self.free.release(self.AHEAD)
+        self.wait()
+
+    def run(self):
+        # invalid bytes become U+FFFD instead of failing the whole file
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        replaced = False
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                read = 0
+                chunk_size = self.FIRST_CHUNK
+                while not self.isInterruptionRequested():
+                    data = f.read(chunk_size)
+                    chunk_size = self.CHUNK_SIZE
+                    read += len(data)
+                    text = decoder.decode(data, final=not data)
+                    replaced = replaced or text.count("\ufffd") > data.count(b"\xef\xbf\xbd")
+                    if text:
+                        self.free.acquire()
+                        if self.isInterruptionRequested():
+                            return
+                        self.chunk_ready.emit(text)
+                        self.progress.emit(read, size)
+                    if not data:
+                        break
+        except OSError as e:
+            self.done.emit(str(e))
+            return
+        self.done.emit("Not UTF-8, invalid bytes are shown as \ufffd" if replaced else "")
@@ -0,0 +1,134 @@
+# STD
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QStandardPaths, QThread, pyqtSignal
+
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once, setting it to read it isn't safe while other threads create files
+UMASK = _umask()
+
+
+def atomic_write(path: Path, data: bytes):
+    """
+        Write `data` to a temporary file next to `path`, flush it to disk
+        then rename it over `path`. A crash leaves the old file or the new
+        one, never half of it.
+    """
+    # a link stays a link, the file it points to is replaced
+    path = Path(os.path.realpath(path))
+    folder = path.parent
+    fd, temporary = tempfile.mkstemp(dir=folder, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # the new file keeps the permissions of the one it replaces
+            os.chmod(temporary, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(temporary, 0o666 & ~UMASK)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # the rename itself reaches the disk
+        fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def recovery_dir() -> Path:
+    """ Folder of the autosaved copies of unsaved tabs """
+    return Path(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)) / "recovery"
+
+
+def recovery_path(key: str, name: str) -> Path:
+    """ Autosaved copy of the tab `key` stands for, the file's path or an untitled tab's id """
+    return recovery_dir() / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}-{name}"
+
+
+def write_recovery(path: Path, data: bytes, source: str):
+    """ Autosave `data` to `path`, with the file it is a copy of next to it """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, data)
+    atomic_write(path.with_name(path.name + ".json"), json.dumps({"source": source}).encode())
+
+
+def recovered() -> list[tuple[Path, str]]:
+    """
+        Autosaved copies an earlier run left, with the file each is a copy
+        of, empty for an untitled tab. What can't be restored is removed.
+    """
+    folder = recovery_dir()
+    try:
+        names = set(os.listdir(folder))
+    except OSError:
+        return []
+    entries = []
+    for name in sorted(names):
+        path = folder / name
+        if name.endswith(".json") or name.startswith("."):
+            # a sidecar without its copy, or a write cut short
+            if name.startswith(".") or name[:-len(".json")] not in names:
+                remove_recovery(path)
+            continue
+        try:
+            with open(folder / (name + ".json"), encoding="utf-8") as f:
+                source = json.load(f)["source"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # the run stopped between the copy and its sidecar, the text is kept
+            source = ""
+        entries.append((path, source))
+    return entries
+
+
+def remove_recovery(path: Path):
+    for stale in (path, path.with_name(path.name + ".json")):
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+class FileSaver(QThread):
+    """ Writes a snapshot of an editor's text off the UI thread """
+    # error message, empty once the file is written
+    done = pyqtSignal(str)
+
+    def __init__(self, path: Path, data: bytes, recovery_of: str = None, parent=None):
+        super(FileSaver, self).__init__(parent)
+        self.path = path
+        self.data = data
+        # an autosave, the path of the file it is a copy of
+        self.recovery_of = recovery_of
+        # what `done` tells, for a caller waiting on the thread
+        self.error = ""
+
+    def run(self):
+        try:
+            if self.recovery_of is None:
+                atomic_write(self.path, self.data)
+            else:
+                write_recovery(self.path, self.data, self.recovery_of)
+        except OSError as e:
+            self.error = str(e)
+        # the text isn't needed anymore, the thread object lives on until it is collected
+        self.data = None
+        self.done.emit(self.error)
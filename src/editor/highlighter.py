@@ -0,0 +1,52 @@
+# Installed
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class HighlightWorker(QThread):
+    """
+        Works out the state every line of a document snapshot ends in, off the
+        UI thread. States are sent back in chunks, the lexer applies them and
+        only styles the lines that are actually on screen.
+    """
+    # generation, first line, state the chunk starts in, end state per line
+    chunk_ready = pyqtSignal(int, int, int, list)
+
+    CHUNK_LINES = 2000
+
+    def __init__(self, engine):
+        super(HighlightWorker, self).__init__(None)
+        self.engine = engine
+        self.generation = 0
+        self.first_line = 0
+        self.state = 0
+        self.data = b""
+        self.cancelled = False
+
+    def run(self):
+        tokenize = self.engine.tokenize
+        lines = self.data.splitlines(keepends=True)
+        self.data = b""
+        state = self.state
+
+        for first in range(0, len(lines), self.CHUNK_LINES):
+            if self.cancelled:
+                return
+            start_state = state
+            states = []
+            for line in lines[first:first + self.CHUNK_LINES]:
+                _, state = tokenize(line, state)
+                states.append(state)
+            self.chunk_ready.emit(
+                self.generation, self.first_line + first, start_state, states)
+
+    def scan(self, generation: int, first_line: int, state: int, data: bytes):
+        """ Scan `data`, the document from `first_line` on, starting in `state` """
+        self.generation = generation
+        self.first_line = first_line
+        self.state = state
+        self.data = data
+        self.cancelled = False
+        self.start()
+
+    def cancel(self):
+        self.cancelled = True
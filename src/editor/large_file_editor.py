@@ -0,0 +1,145 @@
+# STD
+from pathlib import Path
+# Installed
+from PyQt6.QtGui import *
+from PyQt6.Qsci import *
+# Custom
+from editor.editor import Editor
+from editor.mapped_file import MappedFile
+
+
+class LargeFileEditor(Editor):
+    """
+        Read-only view of a file too large to load whole, without lexer or
+        completions. The file is memory-mapped and only the page around the
+        view is in the buffer, the next one is paged in as the view nears
+        either end. Line numbers are margin text, the buffer's first line
+        isn't the file's.
+    """
+    # files from this size open here instead of in an Editor
+    THRESHOLD = 64 * 1024 * 1024
+    # bytes in the buffer at a time
+    PAGE_SIZE = 1024 * 1024
+    # lines from either end of the page where the next one is paged in
+    EDGE_LINES = 200
+
+    def __init__(self, parent=None, path: Path = None):
+        super(LargeFileEditor, self).__init__(parent, path, is_python_file=False)
+        self.file = MappedFile(path)
+        # offsets of the page in the file, and the file's line at its start
+        self.start = 0
+        self.end = 0
+        self.first_line = 0
+        # scrolling done by paging doesn't page again
+        self.paging = False
+        # first and end of the lines with a number in the margin
+        self.numbered: tuple[int, int] = None
+
+        self.setReadOnly(True)
+        self.setMarginType(0, QsciScintilla.MarginType.TextMargin)
+        self.verticalScrollBar().valueChanged.connect(self._scrolled)
+        self.SCN_UPDATEUI.connect(self._number_lines)
+
+    @staticmethod
+    def is_large(path: Path) -> bool:
+        return path.stat().st_size >= LargeFileEditor.THRESHOLD
+
+    def load(self):
+        self.load_page(0)
+        self.loaded.emit(f"{self.path.name} is large, opened read-only")
+
+    def stop_loading(self):
+        """ Nothing loads in the background, the map is released """
+        self.file.close()
+
+    def load_page(self, offset: int):
+        """ Put the page around byte `offset` of the file in the buffer """
+        self.start, self.end = self.file.page(offset, self.PAGE_SIZE)
+        self.first_line = self.file.line_at(self.start)
+        self.paging = True
+        self.setReadOnly(False)
+        self.setText(self.file.read(self.start, self.end))
+        self.setReadOnly(True)
+        self.paging = False
+        self.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        # paging isn't an edit, the tab has nothing to save
+        self.setModified(False)
+        self.setMarginWidth(0, "0" * len(str(self.first_line + self.lines())) + "0")
+        self.numbered = None
+        self._number_lines()
+
+    def _number_lines(self):
+        """ Number the lines on screen, numbering the whole page takes a tenth of a second """
+        first = self.firstVisibleLine()
+        shown = (first, min(first + self.SendScintilla(QsciScintilla.SCI_LINESONSCREEN) + 1, self.lines()))
+        if shown == self.numbered:
+            return
+        self.numbered = shown
+        for line in range(*shown):
+            number = str(self.first_line + line + 1).encode()
+            self.SendScintilla(QsciScintilla.SCI_MARGINSETTEXT, line, number)
+            self.SendScintilla(QsciScintilla.SCI_MARGINSETSTYLE, line, QsciScintilla.STYLE_LINENUMBER)
+
+    def _scrolled(self):
+        if self.paging:
+            return
+        first = self.firstVisibleLine()
+        last = first + self.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+        if (first < self.EDGE_LINES and self.start > 0) or (
+                last > self.lines() - self.EDGE_LINES and self.end < self.file.size):
+            line, index = self.getCursorPosition()
+            self.repage(self.first_line + first, self.first_line + line, index)
+
+    def repage(self, top: int, line: int, index: int):
+        """ Page in around file line `top`, which stays the first visible one """
+        self.load_page(self.file.line_offset(top))
+        # the cursor stays on its line when the new page holds it
+        if not self.first_line <= line < self.first_line + self.page_lines():
+            line, index = top, 0
+        self.paging = True
+        self.setCursorPosition(line - self.first_line, index)
+        self.setFirstVisibleLine(top - self.first_line)
+        self.paging = False
+
+    def page_lines(self) -> int:
+        """ Lines of the file in the page, the empty last line of the buffer starts the next page """
+        return self.lines() - (self.end < self.file.size)
+
+    def go_to(self, line: int, index: int):
+        """ Move the cursor to file line `line`, paging it in """
+        if not self.first_line <= line < self.first_line + self.page_lines():
+            self.load_page(self.file.line_offset(line))
+        line = min(line - self.first_line, self.page_lines() - 1)
+        self.paging = True
+        self.setCursorPosition(line, index)
+        # in the middle of the screen, away from the edges that page again
+        self.setFirstVisibleLine(max(0, line - self.SendScintilla(QsciScintilla.SCI_LINESONSCREEN) // 2))
+        self.paging = False
+
+    def scroll_to(self, line: int):
+        if self.first_line <= line < self.first_line + self.page_lines():
+            self.paging = True
+            self.setFirstVisibleLine(line - self.first_line)
+            self.paging = False
+
+    def cursor_line(self) -> int:
+        return self.first_line + self.getCursorPosition()[0]
+
+    def first_visible_line(self) -> int:
+        return self.first_line + self.firstVisibleLine()
+
+    def find_text(self, text: str) -> bool:
+        """ Select the next `text` after the cursor, searched in the mapped file """
+        line, index = self.getCursorPosition()
+        offset = self.file.line_offset(self.first_line + line) + len(self.text(line)[:index].encode())
+        span = self.file.find(text, offset)
+        if span is None:
+            return False
+        start, end = span
+        line = self.file.line_at(start)
+        line_start = self.file.line_offset(line)
+        index = len(self.file.read(line_start, start))
+        self.go_to(line, index)
+        line -= self.first_line
+        self.setSelection(line, index, line, index + len(self.file.read(start, end)))
+        return True
@@ -0,0 +1,117 @@
+"""
+    Read-only access to a file too large to load whole, through a memory
+    map. Nothing here imports Qt.
+
+    Lines are found through an index of how many newlines come before each
+    BLOCK_SIZE bytes of the file. It is built as far as a lookup needs, so
+    going to a line near the start of a huge file doesn't count the rest.
+"""
+# STD
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+
+
+class MappedFile:
+    """
+        A file shrunk by another process while it is mapped makes reading
+        the lost part fail, large files are mostly logs and dumps that only
+        grow.
+    """
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # an empty file can't be mapped
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        # newlines before the start of each indexed block
+        self.block_lines = array("Q", [0])
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def indexed_to(self) -> int:
+        """ Offset up to which newlines are counted """
+        return min((len(self.block_lines) - 1) * self.BLOCK_SIZE, self.size)
+
+    def index_block(self) -> bool:
+        """ Count the newlines of the next block, False once the whole file is indexed """
+        start = self.indexed_to()
+        if start >= self.size:
+            return False
+        self.block_lines.append(
+            self.block_lines[-1] + self.data[start:start + self.BLOCK_SIZE].count(b"\n"))
+        return True
+
+    def line_count(self) -> int:
+        """ Lines of the file as the editor counts them, indexes the whole file """
+        while self.index_block():
+            pass
+        return self.block_lines[-1] + 1
+
+    def line_at(self, offset: int) -> int:
+        """ Line holding byte `offset` """
+        block = min(offset, self.size) // self.BLOCK_SIZE
+        while len(self.block_lines) <= block and self.index_block():
+            pass
+        start = block * self.BLOCK_SIZE
+        return self.block_lines[block] + self.data[start:offset].count(b"\n")
+
+    def line_offset(self, line: int) -> int:
+        """ Offset where `line` starts, the start of the last line past the end """
+        if line <= 0:
+            return 0
+        while self.block_lines[-1] < line and self.index_block():
+            pass
+        # the last block starting with fewer than `line` newlines before it
+        block = bisect_left(self.block_lines, line) - 1
+        offset = block * self.BLOCK_SIZE
+        for _ in range(line - self.block_lines[block]):
+            end = self.data.find(b"\n", offset)
+            if end == -1:
+                return self.data.rfind(b"\n") + 1
+            offset = end + 1
+        return offset
+
+    def page(self, offset: int, size: int) -> tuple[int, int]:
+        """ About `size` bytes of whole lines around `offset`, as start and end offsets """
+        start = max(0, min(offset - size // 2, self.size - size))
+        if start > 0:
+            start = self.data.rfind(b"\n", 0, start) + 1
+        end = start + size
+        if end >= self.size:
+            return start, self.size
+        end = self.data.find(b"\n", end)
+        return start, self.size if end == -1 else end + 1
+
+    def read(self, start: int, end: int) -> str:
+        return self.data[start:end].decode("utf-8", "replace")
+
+    def find(self, text: str, offset: int) -> tuple[int, int]:
+        """
+            Start and end offsets of the next `text` from `offset`, ignoring
+            ASCII case and wrapping around, None when it isn't in the file
+        """
+        needle = text.encode("utf-8").lower()
+        start = self.find_from(needle, offset, self.size)
+        if start == -1:
+            start = self.find_from(needle, 0, min(offset + len(needle) - 1, self.size))
+        return None if start == -1 else (start, start + len(needle))
+
+    def find_from(self, needle: bytes, start: int, end: int) -> int:
+        """ Offset of lowercase `needle` between `start` and `end`, -1 when it isn't there """
+        if needle == needle.upper():
+            # no letters, case doesn't matter
+            return self.data.find(needle, start, end)
+        # block by block lowercased, a regex ignoring case is three times slower
+        overlap = len(needle) - 1
+        while start < end:
+            stop = min(start + self.BLOCK_SIZE, end)
+            found = self.data[start:stop + overlap].lower().find(needle, 0, stop + overlap - start)
+            if found != -1 and start + found + len(needle) <= end:
+                return start + found
+            start = stop
+        return -1
@@ -0,0 +1,241 @@
+"""
+    On-disk index of the public names of installed packages, used by the
+    completion workers before asking jedi. Nothing here imports Qt.
+
+    Each top level module is recorded with the version of its distribution
+    and the mtime of its file, and is only indexed again when one changes.
+"""
+# STD
+import importlib.metadata
+import importlib.util
+import os
+import pkgutil
+import re
+import sqlite3
+import sys
+from pathlib import Path
+# Installed
+from jedi import Script
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    name TEXT PRIMARY KEY, version TEXT, mtime REAL, done INTEGER, attempts INTEGER);
+CREATE TABLE IF NOT EXISTS names (
+    module TEXT, name TEXT, type TEXT, signature TEXT, doc TEXT);
+CREATE INDEX IF NOT EXISTS names_module ON names (module);
+"""
+
+IMPORT = re.compile(
+    r"^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+)?import[ \t]+(\([^)]*\)|[^\n#;]+)", re.MULTILINE)
+# `name.name.prefix` right before the cursor
+ATTRIBUTE = re.compile(r"(?<![\w.])([A-Za-z_][\w.]*)\.(\w*)$")
+# `from module import a, b, prefix` right before the cursor
+FROM_IMPORT = re.compile(r"^\s*from\s+([\w.]+)\s+import\s+\(?[\w\s,]*?(\w*)$")
+
+
+def module_names(text: str) -> dict[str, str]:
+    """ Module imported under each name by the import statements of `text` """
+    names = {}
+    for module, imported in IMPORT.findall(text):
+        if module.startswith("."):
+            continue
+        for part in imported.strip("()").split(","):
+            words = part.split()
+            if not words:
+                continue
+            name = words[-1] if len(words) == 3 and words[1] == "as" else words[0]
+            if module:
+                names[name] = f"{module}.{words[0]}"
+            elif name == words[0]:
+                # `import a.b` binds `a`
+                name = name.split(".")[0]
+                names[name] = name
+            else:
+                names[name] = words[0]
+    return names
+
+
+class PackageIndex:
+    """ sqlite store of package names, readers and the indexer each open their own """
+    # most submodules of one package that get indexed
+    MAX_SUBMODULES = 50
+    # characters of docstring kept per name
+    DOC_LENGTH = 1000
+    # a module that took the indexer down this many times is left to jedi
+    MAX_ATTEMPTS = 2
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection: sqlite3.Connection = None
+        self.cache: dict[str, list[tuple]] = {}
+        # data_version of the database when the cache was filled
+        self.cached_version: int = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            # readers in other workers don't block the indexer and the other way round
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def complete(self, text: str, line: int, column: int) -> list[dict]:
+        """
+            Completions at `line`, `column` when they are members of an indexed
+            module, None when jedi has to work them out
+        """
+        lines = text.splitlines()
+        if not 0 < line <= len(lines):
+            return None
+        before = lines[line - 1][:column]
+
+        match = FROM_IMPORT.match(before)
+        if match is not None:
+            module, prefix = match.groups()
+        else:
+            match = ATTRIBUTE.search(before)
+            if match is None:
+                return None
+            dotted, prefix = match.groups()
+            head, _, rest = dotted.partition(".")
+            module = module_names(text).get(head)
+            if module is None:
+                return None
+            if rest:
+                module = f"{module}.{rest}"
+
+        rows = self.names(module)
+        if rows is None:
+            return None
+        prefix = prefix.lower()
+        return [{"name": name, "type": type_, "signature": signature}
+                for name, type_, signature in rows if name.lower().startswith(prefix)]
+
+    def names(self, module: str) -> list[tuple]:
+        """ Indexed names of `module`, None if it isn't indexed """
+        try:
+            connection = self.connect()
+            # bumped by every commit of another connection, the indexer's
+            # process adding and removing packages while this one runs
+            version = connection.execute("PRAGMA data_version").fetchone()[0]
+            if version != self.cached_version:
+                self.cache.clear()
+                self.cached_version = version
+            if module in self.cache:
+                return self.cache[module]
+            rows = connection.execute(
+                "SELECT name, type, signature FROM names WHERE module = ?", (module,)).fetchall()
+        except sqlite3.Error:
+            return None
+        if not rows:
+            return None
+        self.cache[module] = rows
+        return rows
+
+    def update(self):
+        """ Index every installed package that changed since the last run """
+        connection = self.connect()
+        known = {row[0]: row[1:] for row in connection.execute(
+            "SELECT name, version, mtime, done, attempts FROM packages")}
+        installed = set()
+
+        for name, version in self.installed_modules():
+            if name in installed:
+                continue
+            installed.add(name)
+            spec = self.find_spec(name)
+            if spec is None or spec.origin is None:
+                continue
+            try:
+                mtime = os.path.getmtime(spec.origin)
+            except OSError:
+                continue
+            if name in known:
+                old_version, old_mtime, done, attempts = known[name]
+                if (old_version, old_mtime) == (version, mtime) and (
+                        done or attempts >= self.MAX_ATTEMPTS):
+                    continue
+                attempts = attempts + 1 if (old_version, old_mtime) == (version, mtime) else 1
+            else:
+                attempts = 1
+
+            # Recorded first, so a module that crashes the indexer isn't retried forever
+            with connection:
+                connection.execute(
+                    "REPLACE INTO packages VALUES (?, ?, ?, 0, ?)", (name, version, mtime, attempts))
+            rows = []
+            for module in [name] + self.submodules(name, spec):
+                rows.extend(self.index_module(module))
+            with connection:
+                self.forget(connection, name)
+                connection.executemany("INSERT INTO names VALUES (?, ?, ?, ?, ?)", rows)
+                connection.execute("UPDATE packages SET done = 1 WHERE name = ?", (name,))
+
+        # Packages uninstalled since the last run
+        with connection:
+            for name in set(known) - installed:
+                connection.execute("DELETE FROM packages WHERE name = ?", (name,))
+                self.forget(connection, name)
+
+    @staticmethod
+    def forget(connection: sqlite3.Connection, name: str):
+        """ Delete the names of package `name` and of its submodules """
+        connection.execute(
+            "DELETE FROM names WHERE module = ? OR substr(module, 1, ?) = ?",
+            (name, len(name) + 1, name + "."))
+
+    def installed_modules(self):
+        """ Top level modules of every distribution in the environment, with its version """
+        for dist in importlib.metadata.distributions():
+            version = dist.version
+            top_level = dist.read_text("top_level.txt")
+            if top_level:
+                names = top_level.split()
+            else:
+                names = set()
+                for file in dist.files or ():
+                    first = file.parts[0]
+                    if first.endswith((".dist-info", ".egg-info", ".data")) or first == "..":
+                        continue
+                    if len(file.parts) > 1 or file.suffix in (".py", ".so", ".pyd"):
+                        names.add(first.split(".")[0])
+            for name in names:
+                if name.isidentifier() and not name.startswith("_"):
+                    yield name, version
+
+    @staticmethod
+    def find_spec(name: str):
+        try:
+            # a top level spec is found without importing anything
+            return importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            return None
+
+    def submodules(self, name: str, spec) -> list[str]:
+        if not spec.submodule_search_locations:
+            return []
+        return [f"{name}.{info.name}"
+                for info in pkgutil.iter_modules(spec.submodule_search_locations)
+                if not info.name.startswith("_")][:self.MAX_SUBMODULES]
+
+    def index_module(self, module: str) -> list[tuple]:
+        rows = []
+        try:
+            completions = Script(f"import {module}\n{module}.").complete(2, len(module) + 1)
+        except Exception as err:
+            print(err, file=sys.stderr)
+            return rows
+        for completion in completions:
+            if completion.name.startswith("_"):
+                continue
+            try:
+                # each of these infers, and jedi can fail on any of them
+                type_ = completion.type
+                signatures = completion.get_signatures()
+                signature = signatures[0].to_string() if signatures else ""
+                doc = completion.docstring(raw=True).split("\n\n")[0][:self.DOC_LENGTH]
+            except Exception:
+                type_, signature, doc = "", "", ""
+            rows.append((module, completion.name, type_, signature, doc))
+        return rows
@@ -0,0 +1,78 @@
+class PrefixTrie:
+    """
+        Words keyed by their lowercased characters, so every word starting
+        with a prefix is found without looking at the others. Lookups ignore
+        case, like the completion popup does.
+    """
+    # key of the set of words ending at a node, no character is empty
+    END = ""
+
+    def __init__(self, words=()):
+        self.root: dict = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word.lower())
+        return node is not None and word in node.get(self.END, ())
+
+    def add(self, word: str):
+        node = self.root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        words = node.setdefault(self.END, set())
+        if word not in words:
+            words.add(word)
+            self.size += 1
+
+    def discard(self, word: str):
+        """ Remove `word` if present, and any branch left empty by it """
+        path = [self.root]
+        for char in word.lower():
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        words = path[-1].get(self.END)
+        if not words or word not in words:
+            return
+        words.remove(word)
+        self.size -= 1
+        if not words:
+            del path[-1][self.END]
+        for char, parent in zip(reversed(word.lower()), reversed(path[:-1])):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def complete(self, prefix: str, limit: int = None) -> list[str]:
+        """ Words starting with `prefix`, shortest branches first, at most `limit` """
+        node = self._find(prefix.lower())
+        if node is None:
+            return []
+        found = []
+        level = [node]
+        while level:
+            deeper = []
+            for node in level:
+                for char, child in node.items():
+                    if char == self.END:
+                        found.extend(child)
+                        if limit is not None and len(found) >= limit:
+                            return found[:limit]
+                    else:
+                        deeper.append(child)
+            level = deeper
+        return found
+
+    def _find(self, key: str) -> dict:
+        node = self.root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
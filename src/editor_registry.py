@@ -0,0 +1,70 @@
+# STD
+from pathlib import Path
+# Installed
+from PyQt6.QtWidgets import QWidget
+
+
+class EditorRegistry:
+    """
+        Open tabs by the resolved absolute path of their file, each an Editor
+        or a TabPlaceholder. Two files of the same name in different folders
+        are different keys. Renames, moves and deletes of a folder carry or
+        drop every tab under it.
+    """
+
+    def __init__(self):
+        self.tabs: dict[Path, QWidget] = {}
+        # key of each tab, its file may be gone when it is removed
+        self.keys: dict[QWidget, Path] = {}
+
+    def __len__(self):
+        return len(self.tabs)
+
+    @staticmethod
+    def key(path) -> Path:
+        return Path(path).resolve()
+
+    def get(self, path) -> QWidget:
+        return self.tabs.get(self.key(path))
+
+    def add(self, widget: QWidget):
+        """ Register `widget` for its path, in place of any tab registered there """
+        self.remove(widget)
+        key = self.key(widget.path)
+        replaced = self.tabs.get(key)
+        if replaced is not None:
+            del self.keys[replaced]
+        self.tabs[key] = widget
+        self.keys[widget] = key
+
+    def remove(self, widget: QWidget):
+        key = self.keys.pop(widget, None)
+        if key is not None:
+            del self.tabs[key]
+
+    def within(self, path) -> list[tuple[Path, QWidget]]:
+        """ Keys and tabs of `path`, or of every file under it when it is a folder """
+        key = self.key(path)
+        widget = self.tabs.get(key)
+        if widget is not None:
+            return [(key, widget)]
+        # a folder, only its own tabs need a walk of every key
+        return [(tab_key, widget) for tab_key, widget in self.tabs.items() if key in tab_key.parents]
+
+    def move(self, old, new) -> list[QWidget]:
+        """ Carry the tabs of `old`, a file or a folder, over to `new`, returns them """
+        old_key, new_key = self.key(old), self.key(new)
+        moved = []
+        for key, widget in self.within(old_key):
+            self.remove(widget)
+            widget.set_path(new_key / key.relative_to(old_key))
+            self.add(widget)
+            moved.append(widget)
+        return moved
+
+    def discard(self, path) -> list[QWidget]:
+        """ Drop the tabs of `path`, a file or a folder, returns them """
+        dropped = [widget for _, widget in self.within(path)]
+        for widget in dropped:
+            self.remove(widget)
+        return dropped
@@ -0,0 +1,245 @@
+# STD
+import errno
+import os
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+
+class FileJob:
+    """
+        Files to delete, or to move or copy each to its destination, done
+        together by a FileJobWorker. `done` holds the sources finished, the
+        others were left as they were or, once cancelled, partly deleted.
+    """
+    DELETE = "Deleting"
+    MOVE = "Moving"
+    COPY = "Copying"
+    DONE = {DELETE: "Deleted", MOVE: "Moved", COPY: "Copied"}
+
+    def __init__(self, kind: str, sources: list[Path], destinations: list[Path] = None):
+        self.kind = kind
+        self.sources = sources
+        self.destinations = destinations or []
+        self.done: list[Path] = []
+        self.errors: list[str] = []
+        self.cancelled = False
+
+    def pairs(self) -> list[tuple[Path, Path]]:
+        return list(zip(self.sources, self.destinations))
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def count_entries(path: Path) -> int:
+    """ Files, folders and links in `path`, itself included """
+    if path.is_symlink() or not path.is_dir():
+        return 1
+    return 1 + sum(len(dirs) + len(files) for _, dirs, files in os.walk(path))
+
+
+def same_device(source: Path, destination: Path) -> bool:
+    """ A move from `source` to `destination` is a rename """
+    return os.lstat(source).st_dev == os.stat(destination.parent).st_dev
+
+
+class FileJobWorker(QThread):
+    """
+        Runs a FileJob entry by entry, so it can be cancelled between two
+        files and its progress is the count of entries done
+    """
+    # entries done, entries in the job
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(object)
+
+    # seconds between two progress signals, one per file floods the UI
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, job: FileJob, parent=None):
+        super(FileJobWorker, self).__init__(parent)
+        self.job = job
+        self.steps = 0
+        self.total = 0
+        self.reported = 0.0
+
+    def step(self, count=1):
+        if self.isInterruptionRequested():
+            raise JobCancelled
+        self.steps += count
+        now = time.monotonic()
+        if now - self.reported >= self.PROGRESS_INTERVAL:
+            self.reported = now
+            self.progress.emit(self.steps, self.total)
+
+    def run(self):
+        job = self.job
+        try:
+            if job.kind == FileJob.DELETE:
+                self.total = sum(count_entries(path) for path in job.sources)
+                for path in job.sources:
+                    self.run_step(self.delete, path)
+            else:
+                self.total = sum(self.weight(source, destination) for source, destination in job.pairs())
+                for source, destination in job.pairs():
+                    self.run_step(self.move if job.kind == FileJob.MOVE else self.copy_new, source, destination)
+        except JobCancelled:
+            job.cancelled = True
+        except OSError as e:
+            job.errors.append(str(e))
+        self.progress.emit(self.steps, self.total)
+        self.done.emit(job)
+
+    def weight(self, source: Path, destination: Path) -> int:
+        """ Steps to move or copy `source`, a rename is one, a move across devices copies then deletes """
+        try:
+            if self.job.kind == FileJob.MOVE:
+                return 1 if same_device(source, destination) else 2 * count_entries(source)
+            return count_entries(source)
+        except OSError:
+            # fails when it runs, it is one step then
+            return 1
+
+    def run_step(self, action, source: Path, *args):
+        """ One entry of the job, an error is kept and the job goes on """
+        try:
+            action(source, *args)
+        except OSError as e:
+            self.job.errors.append(str(e))
+            return
+        self.job.done.append(source)
+
+    def delete(self, path: Path):
+        if path.is_symlink() or not path.is_dir():
+            path.unlink()
+            self.step()
+            return
+        for root, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                os.unlink(os.path.join(root, name))
+                self.step()
+            for name in dirs:
+                # links to folders are listed as folders, not walked
+                child = os.path.join(root, name)
+                if os.path.islink(child):
+                    os.unlink(child)
+                else:
+                    os.rmdir(child)
+                self.step()
+        path.rmdir()
+        self.step()
+
+    def copy(self, source: Path, destination: Path):
+        if source.is_symlink() or not source.is_dir():
+            shutil.copy2(source, destination, follow_symlinks=False)
+            self.step()
+            return
+        for root, dirs, files in os.walk(source):
+            target = destination / os.path.relpath(root, source)
+            target.mkdir()
+            shutil.copystat(root, target)
+            self.step()
+            for name in dirs:
+                child = os.path.join(root, name)
+                if os.path.islink(child):
+                    os.symlink(os.readlink(child), target / name)
+                    self.step()
+            for name in files:
+                shutil.copy2(os.path.join(root, name), target / name, follow_symlinks=False)
+                self.step()
+
+    def copy_new(self, source: Path, destination: Path):
+        """ Copy to a destination that doesn't exist, a copy cut short is removed """
+        if destination.exists() or destination.is_symlink():
+            raise FileExistsError(errno.EEXIST, "Already exists", str(destination))
+        try:
+            self.copy(source, destination)
+        except (JobCancelled, OSError):
+            self.remove_partial(destination)
+            raise
+
+    def move(self, source: Path, destination: Path):
+        if destination.exists() or destination.is_symlink():
+            raise FileExistsError(errno.EEXIST, "Already exists", str(destination))
+        try:
+            os.rename(source, destination)
+            self.step()
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        self.copy_new(source, destination)
+        # the copy is whole, cancelling now leaves the rest of the source
+        try:
+            self.delete(source)
+        except JobCancelled:
+            self.job.done.append(source)
+            raise
+
+    @staticmethod
+    def remove_partial(path: Path):
+        if path.is_symlink() or path.is_file():
+            path.unlink(missing_ok=True)
+        elif path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class FileJobQueue(QObject):
+    """
+        File operations run one job at a time off the UI thread, in the
+        order they were asked for, a move then a delete of the same folder
+        can't cross
+    """
+    # label of the job, entries done, entries in the job
+    progress = pyqtSignal(str, int, int)
+    # the job, once done, cancelled or failed
+    finished = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super(FileJobQueue, self).__init__(parent)
+        self.pending: deque[FileJob] = deque()
+        self.worker: FileJobWorker = None
+
+    def submit(self, job: FileJob):
+        self.pending.append(job)
+        if self.worker is None:
+            self.start_next()
+
+    def is_busy(self) -> bool:
+        return self.worker is not None
+
+    def start_next(self):
+        if not self.pending:
+            return
+        job = self.pending.popleft()
+        self.worker = FileJobWorker(job, self)
+        self.worker.progress.connect(lambda done, total: self.progress.emit(job.kind, done, total))
+        self.worker.done.connect(self.job_done)
+        self.progress.emit(job.kind, 0, 0)
+        self.worker.start()
+
+    def job_done(self, job: FileJob):
+        self.worker.wait()
+        self.worker.deleteLater()
+        self.worker = None
+        # the next job is running when this one is reported
+        self.start_next()
+        self.finished.emit(job)
+
+    def cancel(self):
+        """ Cancel the running job and drop the pending ones """
+        self.pending.clear()
+        if self.worker is not None:
+            self.worker.requestInterruption()
+
+    def stop(self):
+        """ Cancel everything and wait for the running job to stop """
+        self.cancel()
+        if self.worker is not None:
+            self.worker.done.disconnect()
+            self.worker.wait()
+            self.worker = None
@@ -1,6 +1,5 @@
 # STD
 import os
-import shutil
 from pathlib import Path
 # Installed
 from PyQt6.QtWidgets import *
@@ -8,7 +7,8 @@ from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 from PyQt6.Qsci import *
 # Custom
-from editor.editor import Editor
+from file_jobs import FileJob, FileJobQueue
+from file_tree_model import FileTreeModel
 
 
 class FileManager(QTreeView):
@@ -24,19 +24,15 @@ class FileManager(QTreeView):
 
         self.manager_font = QFont("FiraCode", 13)
 
-        self.model: QFileSystemModel = QFileSystemModel()
-        self.model.setRootPath(os.getcwd())
-
-        # Filesystem filters
-        self.model.setFilter(
-            QDir.Filter.NoDotAndDotDot | QDir.Filter.AllDirs |
-            QDir.Filter.Files | QDir.Filter.Drives)
-        self.model.setReadOnly(False)
+        # Listed as folders are expanded, without ignored files
+        self.model = FileTreeModel(self)
+        self.model.set_root(os.getcwd())
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
 
         self.setFont(self.manager_font)
         self.setModel(self.model)
-        self.setRootIndex(self.model.index(os.getcwd()))
+        self.expanded.connect(self.model.watch)
+        self.collapsed.connect(self.model.unwatch)
         self.setSelectionMode(
             QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setSelectionBehavior(QTreeView.SelectionBehavior.SelectRows)
@@ -64,15 +60,23 @@ class FileManager(QTreeView):
         self.setDropIndicatorShown(True)
         self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
 
-        # Enable file renaming
-        self.prev_name = None
-        self.is_renaming = False
-        self.current_edit_index = None
-        self.itemDelegate().closeEditor.connect(self.on_close_editor)
+        # Enable file renaming, the model renames the file when the edit is done
+        self.model.renamed.connect(self.file_renamed)
+
+        # Deletes, moves and copies run off the UI thread
+        self.jobs = FileJobQueue(self)
+
+    def set_root(self, path: str):
+        self.model.set_root(path)
 
-    def on_close_editor(self, editor: QLineEdit):
-        if self.is_renaming:
-            self.rename_file_with_index()
+    def stop(self):
+        """ Cancel the file jobs and stop listing folders """
+        self.jobs.stop()
+        self.model.stop()
+
+    def file_renamed(self, old: str, new: str):
+        # Tabs of the file, or of the files in the folder, follow it
+        self.main_window.files_moved(Path(old), Path(new))
 
     def show_context_menu(self, pos):
         index = self.indexAt(pos)
@@ -100,22 +104,6 @@ class FileManager(QTreeView):
         else:
             pass
 
-    def rename_file_with_index(self):
-        new_name = self.model.fileName(self.current_edit_index)
-        if self.prev_name == new_name:
-            return
-
-        # From all open tabs find the one with old name
-        for editor in self.tab_view.findChildren(Editor):
-            if editor.path.name == self.prev_name:
-                editor.path = editor.path.parent / new_name
-                self.tab_view.setTabText(
-                    self.tab_view.indexOf(editor), new_name)
-                self.tab_view.repaint()
-                editor.full_path = editor.path.absolute()
-                self.main_window.current_file = editor.path
-                break
-
     def show_dialog(self, title, message) -> int:
         dialog = QMessageBox(self)
         dialog.setFont(self.manager_font)
@@ -142,7 +130,7 @@ class FileManager(QTreeView):
             f = Path(f.parent / f"file{count}")
             count += 1
         f.touch()
-        _index = self.model.index(str(f.absolute()))
+        _index = self.model.added(f.absolute())
         self.edit(_index)
 
     def action_new_folder(self, index):
@@ -158,20 +146,11 @@ class FileManager(QTreeView):
             f = Path(f.parent / f"New Folder{count}")
             count += 1
         f.mkdir()
-        _index = self.model.index(str(f.absolute()))
+        _index = self.model.added(f.absolute())
         self.edit(_index)
 
     def action_rename(self, index):
         self.edit(index)
-        self.prev_name = self.model.fileName(index)
-        self.is_renaming = True
-        self.current_edit_index = index
-
-    def delete_file(self, path: Path):
-        if path.is_dir():
-            shutil.rmtree(path)
-        else:
-            path.unlink()
 
     def action_delete(self, index):
         file_name = self.model.fileName(index)
@@ -179,14 +158,12 @@ class FileManager(QTreeView):
             "Delete", f"Are you sure you want to delete {file_name}"
         )
         if dialog == QMessageBox.StandardButton.Yes:
-            if self.selectionModel().selectedRows():
-                for i in self.selectionModel().selectedRows():
-                    path = Path(self.model.filePath(i))
-                    self.delete_file(path)
-                    for editor in self.tab_view.findChildren(Editor):
-                        if editor.path.name == path.name:
-                            self.tab_view.removeTab(
-                                self.tab_view.indexOf(editor))
+            paths = [Path(self.model.filePath(i)) for i in self.selectionModel().selectedRows()]
+            # the whole selection is one job, without what a selected folder holds
+            selected = set(paths)
+            paths = [path for path in paths if not selected.intersection(path.parents)]
+            if paths:
+                self.jobs.submit(FileJob(FileJob.DELETE, paths))
 
     def tree_view_clicked(self, index: QModelIndex):
         path = self.model.filePath(index)
@@ -203,12 +180,11 @@ class FileManager(QTreeView):
     def dropEvent(self, e: QDropEvent) -> None:
         root_path = Path(self.model.rootPath())
         if e.mimeData().hasUrls():
-            for url in e.mimeData().urls():
-                path = Path(url.toLocalFile())
-                if path.is_dir():
-                    shutil.move(path, root_path / path.name)
-                else:
-                    shutil.move(path, root_path / path.name)
+            sources = [Path(url.toLocalFile()) for url in e.mimeData().urls()]
+            sources = [path for path in sources if path.parent != root_path]
+            # moved, or copied with Ctrl held
+            kind = FileJob.COPY if e.modifiers() & Qt.KeyboardModifier.ControlModifier else FileJob.MOVE
+            if sources:
+                self.jobs.submit(FileJob(kind, sources, [root_path / path.name for path in sources]))
+        # the model would move the files itself as well
         e.accept()
-
-        return super().dropEvent(e)
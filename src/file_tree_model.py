@@ -0,0 +1,393 @@
+# STD
+import os
+import queue
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+# Installed
+from PyQt6 import sip
+from PyQt6.QtWidgets import QFileIconProvider
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+# Custom
+from walker import EXCLUDE_DIRS, IgnoreFile, list_dir, tree_sort_key
+
+
+class FolderItem(QStandardItem):
+    """ Folder of the tree, its rows are put in once it is listed """
+    # rows not asked for, listed in the background, being put in, all in
+    UNLISTED, LISTING, POPULATING, LISTED = range(4)
+
+    def __init__(self, icon: QIcon = None, name: str = ""):
+        if icon is None:
+            super(FolderItem, self).__init__(name)
+        else:
+            super(FolderItem, self).__init__(icon, name)
+        # ignore files in effect in the folder
+        self.rules: tuple = ()
+        self.state = self.UNLISTED
+        # changed while it was being listed, listed again after
+        self.stale = False
+
+
+class DirLister(QThread):
+    """ Lists the folders asked for one after the other, off the UI thread """
+    # generation of the tree, folder, its entries, its ignore files
+    listed = pyqtSignal(int, object, object, object)
+
+    def __init__(self, exclude_dirs, parent=None):
+        super(DirLister, self).__init__(parent)
+        self.exclude_dirs = exclude_dirs
+        self.requests = queue.Queue()
+
+    def request(self, generation: int, folder: FolderItem, path: str, relative: str, rules: tuple):
+        self.requests.put((generation, folder, path, relative, rules))
+
+    def stop(self):
+        self.requests.put(None)
+        self.wait()
+
+    def run(self):
+        while (request := self.requests.get()) is not None:
+            generation, folder, path, relative, rules = request
+            entries, rules = list_dir(path, relative, rules, self.exclude_dirs)
+            self.listed.emit(generation, folder, entries, rules)
+
+
+class FileTreeModel(QStandardItemModel):
+    """
+        Files of the opened folder for the file manager. Excluded folders
+        and what the ignore files ignore aren't listed at all. A folder is
+        listed in the background when it is first expanded and its rows go
+        in BATCH_SIZE at a time so the view paints in between. Only the
+        root and the expanded folders are watched for changes.
+
+        Rows are QStandardItems so the view lays out a folder without
+        calling Python for each row, a Python model costs 9 us a row every
+        time the view lays out.
+    """
+    # a file or folder was renamed, old and new path
+    renamed = pyqtSignal(str, str)
+
+    # rows put in at a time while a folder is filled
+    BATCH_SIZE = 1000
+    # milliseconds changes of a folder are gathered before it is listed again
+    REFRESH_DELAY = 100
+    EXCLUDE_DIRS = EXCLUDE_DIRS | {"venv"}
+    DIR_FLAGS = (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable |
+                 Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemIsDropEnabled)
+    # the view doesn't ask a file for children
+    FILE_FLAGS = (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable |
+                  Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemNeverHasChildren)
+
+    def __init__(self, parent=None):
+        super(FileTreeModel, self).__init__(parent)
+        # state of the root, its rows are the model's top level
+        self.root = FolderItem()
+        self.root_path: str = None
+        # ignore rules of the repository, before the ignore files of the root
+        self.root_rules: tuple = ()
+        # answers for the tree of a folder opened before are dropped
+        self.generation = 0
+        # folders being filled and their entries
+        self.pending: deque[tuple[FolderItem, list]] = deque()
+
+        self.lister = DirLister(self.EXCLUDE_DIRS, self)
+        self.lister.listed.connect(self.listed)
+        self.lister.start()
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.directory_changed)
+        self.changed: set[str] = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh_changed)
+
+        icons = QFileIconProvider()
+        self.folder_icon = icons.icon(QFileIconProvider.IconType.Folder)
+        self.file_icon = icons.icon(QFileIconProvider.IconType.File)
+
+    def stop(self):
+        self.lister.stop()
+
+    def set_root(self, path: str):
+        self.generation += 1
+        self.pending.clear()
+        self.changed.clear()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.clear()
+        self.root = FolderItem()
+        self.root_path = os.path.abspath(path)
+        exclude = IgnoreFile.load(os.path.join(self.root_path, ".git", "info", "exclude"), "")
+        self.root_rules = (exclude,) if exclude else ()
+        self.request(self.root)
+        self.watcher.addPath(self.root_path)
+
+    # QFileSystemModel's names for what the file manager asks
+
+    def rootPath(self) -> str:
+        return self.root_path
+
+    def filePath(self, index: QModelIndex) -> str:
+        return self.item_path(self.item(index))
+
+    def fileName(self, index: QModelIndex) -> str:
+        return self.itemFromIndex(index).text() if index.isValid() else os.path.basename(self.root_path)
+
+    def isDir(self, index: QModelIndex) -> bool:
+        return isinstance(self.item(index), FolderItem)
+
+    # Tree
+
+    def item(self, index: QModelIndex) -> QStandardItem:
+        return self.itemFromIndex(index) if index.isValid() else self.root
+
+    def rows_of(self, folder: FolderItem) -> QStandardItem:
+        """ Item holding the rows of `folder` """
+        return self.invisibleRootItem() if folder is self.root else folder
+
+    def parent_folder(self, item: QStandardItem) -> FolderItem:
+        return item.parent() or self.root
+
+    def names(self, item: QStandardItem) -> list[str]:
+        """ Names from the root down to `item` """
+        names = []
+        while item is not None and item is not self.root:
+            names.append(item.text())
+            item = item.parent()
+        return names[::-1]
+
+    def item_path(self, item: QStandardItem) -> str:
+        return os.path.join(self.root_path, *self.names(item))
+
+    @staticmethod
+    def sort_key(item: QStandardItem) -> tuple:
+        return tree_sort_key(item.text(), isinstance(item, FolderItem))
+
+    @staticmethod
+    def child_named(rows: QStandardItem, name: str) -> QStandardItem:
+        return next((rows.child(row) for row in range(rows.rowCount()) if rows.child(row).text() == name), None)
+
+    def item_at(self, path) -> QStandardItem:
+        """ Item of `path` if it is in the listed part of the tree """
+        relative = os.path.relpath(path, self.root_path)
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        item = self.root
+        for name in Path(relative).parts if relative != os.curdir else ():
+            if not isinstance(item, FolderItem):
+                return None
+            item = self.child_named(self.rows_of(item), name)
+            if item is None:
+                return None
+        return item
+
+    def make_item(self, name: str, is_dir: bool) -> QStandardItem:
+        if is_dir:
+            item = FolderItem(self.folder_icon, name)
+            item.setFlags(self.DIR_FLAGS)
+        else:
+            item = QStandardItem(self.file_icon, name)
+            item.setFlags(self.FILE_FLAGS)
+        return item
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        # only asked for folders, files never have children
+        folder = self.item(parent)
+        if not isinstance(folder, FolderItem):
+            return False
+        return folder.state != FolderItem.LISTED or self.rows_of(folder).rowCount() > 0
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        folder = self.item(parent)
+        return isinstance(folder, FolderItem) and folder.state == FolderItem.UNLISTED
+
+    def fetchMore(self, parent: QModelIndex):
+        self.request(self.item(parent))
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        """ Rename the file, its row moves to where the new name goes """
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return super(FileTreeModel, self).setData(index, value, role)
+        item = self.itemFromIndex(index)
+        if not value or value == item.text() or os.sep in value or (os.altsep and os.altsep in value):
+            return False
+        old = self.item_path(item)
+        new = os.path.join(os.path.dirname(old), value)
+        if os.path.lexists(new):
+            return False
+        try:
+            os.rename(old, new)
+        except OSError:
+            return False
+        # the folder and the expanded ones in it are watched by their new path
+        for path in self.watched_under(old):
+            self.watcher.removePath(path)
+            self.watcher.addPath(new + path[len(old):])
+        super(FileTreeModel, self).setData(index, value, role)
+        self.move_row(item)
+        self.renamed.emit(old, new)
+        return True
+
+    def mimeTypes(self) -> list[str]:
+        return ["text/uri-list"]
+
+    def mimeData(self, indexes) -> QMimeData:
+        data = QMimeData()
+        data.setUrls([QUrl.fromLocalFile(self.filePath(index)) for index in indexes if index.column() == 0])
+        return data
+
+    def supportedDragActions(self) -> Qt.DropAction:
+        return Qt.DropAction.MoveAction | Qt.DropAction.CopyAction
+
+    def supportedDropActions(self) -> Qt.DropAction:
+        return Qt.DropAction.MoveAction | Qt.DropAction.CopyAction
+
+    # Listing
+
+    def inherited_rules(self, folder: FolderItem) -> tuple:
+        """ Ignore files in effect in `folder` before its own """
+        return self.root_rules if folder is self.root else self.parent_folder(folder).rules
+
+    def request(self, folder: FolderItem):
+        if folder.state == FolderItem.UNLISTED:
+            folder.state = FolderItem.LISTING
+        self.lister.request(self.generation, folder, self.item_path(folder), "/".join(self.names(folder)),
+                            self.inherited_rules(folder))
+
+    def listed(self, generation: int, folder: FolderItem, entries: list, rules: tuple):
+        # a folder removed meanwhile was deleted with its row
+        if generation != self.generation or sip.isdeleted(folder):
+            return
+        folder.rules = rules
+        if folder.state == FolderItem.LISTING:
+            folder.state = FolderItem.POPULATING
+            self.pending.append((folder, entries))
+            if len(self.pending) == 1:
+                QTimer.singleShot(0, self.populate)
+        elif folder.state == FolderItem.POPULATING:
+            folder.stale = True
+        else:
+            self.update_rows(folder, entries)
+
+    def populate(self):
+        """ Put in the next batch of the folder being filled """
+        if not self.pending:
+            return
+        folder, entries = self.pending[0]
+        alive = not sip.isdeleted(folder)
+        start = self.rows_of(folder).rowCount() if alive else len(entries)
+        batch = entries[start:start + self.BATCH_SIZE]
+        if batch:
+            self.rows_of(folder).appendRows([self.make_item(name, is_dir) for name, is_dir in batch])
+        if start + len(batch) >= len(entries):
+            self.pending.popleft()
+            if alive:
+                self.populated(folder)
+        if self.pending:
+            QTimer.singleShot(0, self.populate)
+
+    def populated(self, folder: FolderItem):
+        folder.state = FolderItem.LISTED
+        if folder.stale:
+            folder.stale = False
+            self.request(folder)
+
+    def list_now(self, folder: FolderItem):
+        """ Fill `folder` at once, when a row of it is needed right away """
+        if folder.state == FolderItem.LISTED:
+            return
+        if folder.state == FolderItem.POPULATING:
+            entries = next(entries for pending, entries in self.pending if pending is folder)
+            self.pending = deque(item for item in self.pending if item[0] is not folder)
+        else:
+            entries, folder.rules = list_dir(self.item_path(folder), "/".join(self.names(folder)),
+                                             self.inherited_rules(folder), self.EXCLUDE_DIRS)
+        rows = self.rows_of(folder)
+        rows.appendRows([self.make_item(name, is_dir) for name, is_dir in entries[rows.rowCount():]])
+        # an answer still coming from the lister updates it
+        self.populated(folder)
+
+    def update_rows(self, folder: FolderItem, entries: list):
+        """ Rows of a folder listed again, only what changed is removed or put in """
+        rows = self.rows_of(folder)
+        shown = dict(entries)
+        for row in range(rows.rowCount() - 1, -1, -1):
+            child = rows.child(row)
+            if shown.get(child.text()) != isinstance(child, FolderItem):
+                self.remove_row(folder, row)
+        names = {rows.child(row).text() for row in range(rows.rowCount())}
+        for name, is_dir in entries:
+            if name not in names:
+                self.insert_row(folder, name, is_dir)
+
+    def insert_row(self, folder: FolderItem, name: str, is_dir: bool) -> QStandardItem:
+        rows = self.rows_of(folder)
+        row = bisect_left(range(rows.rowCount()), tree_sort_key(name, is_dir),
+                          key=lambda other: self.sort_key(rows.child(other)))
+        item = self.make_item(name, is_dir)
+        rows.insertRow(row, item)
+        return item
+
+    def move_row(self, item: QStandardItem):
+        """ Move renamed `item` to its place among the other rows """
+        rows = self.rows_of(self.parent_folder(item))
+        row = item.row()
+        target = bisect_left(range(rows.rowCount() - 1), self.sort_key(item),
+                             key=lambda other: self.sort_key(rows.child(other + (other >= row))))
+        if target != row:
+            rows.insertRow(target, rows.takeRow(row))
+
+    def remove_row(self, folder: FolderItem, row: int):
+        rows = self.rows_of(folder)
+        for path in self.watched_under(self.item_path(rows.child(row))):
+            self.watcher.removePath(path)
+        rows.removeRow(row)
+
+    def added(self, path) -> QModelIndex:
+        """ Index of `path` just created in a folder of the tree, put in before the watcher tells """
+        folder = self.item_at(os.path.dirname(os.path.abspath(path)))
+        if not isinstance(folder, FolderItem):
+            return QModelIndex()
+        self.list_now(folder)
+        name = os.path.basename(path)
+        item = self.child_named(self.rows_of(folder), name)
+        if item is None:
+            item = self.insert_row(folder, name, os.path.isdir(path))
+        return self.indexFromItem(item)
+
+    # Watching
+
+    def watched_under(self, path: str) -> list[str]:
+        prefix = os.path.join(path, "")
+        return [watched for watched in self.watcher.directories()
+                if watched == path or watched.startswith(prefix)]
+
+    def watch(self, index: QModelIndex):
+        """ The folder was expanded, it is watched and caught up with what changed while it wasn't """
+        folder = self.item(index)
+        self.watcher.addPath(self.item_path(folder))
+        if folder.state == FolderItem.LISTED:
+            self.request(folder)
+
+    def unwatch(self, index: QModelIndex):
+        if index.isValid():
+            self.watcher.removePath(self.filePath(index))
+
+    def directory_changed(self, path: str):
+        # a job touching many files changes a folder many times, it is listed once
+        self.changed.add(path)
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
+    def refresh_changed(self):
+        changed, self.changed = self.changed, set()
+        for path in changed:
+            folder = self.item_at(path)
+            if isinstance(folder, FolderItem) and folder.state != FolderItem.UNLISTED:
+                if folder.state == FolderItem.POPULATING:
+                    folder.stale = True
+                else:
+                    self.request(folder)
@@ -1,97 +1,353 @@
 # STD
+import multiprocessing
 import os
-from pathlib import Path
-import re
+import time
 # Installed
 from PyQt6.QtCore import *
-from PyQt6.QtWidgets import QListWidgetItem
+# Custom
+from search_core import Search, SearchCache, SearchItem, SearchResults, update_index
+from trigram_index import TrigramIndex
 
 
-class SearchItem(QListWidgetItem):
-    def __init__(self, name, full_path, line_no, end, line):
-        self.name = name
-        self.full_path = full_path
-        self.line_no = line_no
-        self.end = end
-        self.line = line
-        self.formatted = f"{self.name}:{self.line_no}:{self.end}-{self.line}..."
-        super().__init__(self.formatted)
+class SearchResultModel(QAbstractListModel):
+    """
+        Rows of a SearchResults, formatted when the view paints them. Rows
+        are shown as they are announced, the results may be ahead.
+    """
 
-    def __str__(self):
-        return self.formatted
+    def __init__(self, results: SearchResults, parent=None):
+        super(SearchResultModel, self).__init__(parent)
+        self.results = results
+        self.count = 0
 
-    def __repr__(self):
-        return self.formatted
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid() and index.row() < len(self.results):
+            return self.results.format(index.row())
+        return None
+
+    def item(self, row: int) -> SearchItem:
+        return self.results[row]
+
+    def set_count(self, count: int):
+        if count > self.count:
+            self.beginInsertRows(QModelIndex(), self.count, count - 1)
+            self.count = count
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.count = 0
+        self.endResetModel()
 
 
 class SearchWorker(QThread):
-    finished = pyqtSignal(list)
+    """
+        Runs a Search of search_core off the UI thread and streams its
+        results back in batches, in walk order. The search pauses after each
+        page of results until more are asked for.
+
+        Every search has a generation, a new one stops the scans of the
+        previous one before their next file. Signals carry the generation.
+    """
+    # generation, index of the first item of the batch, items in the batch,
+    # the items are read from `items`
+    results_ready = pyqtSignal(int, int, int)
+    # generation, files scanned, files scanned per second
+    progress = pyqtSignal(int, int, float)
+    # generation, whether the search is paused with results left to load
+    finished = pyqtSignal(int, bool)
 
-    def __init__(self):
+    PAGE_ITEMS = 5_000
+    # seconds between batches after the first one
+    BATCH_INTERVAL = 0.05
+
+    def __init__(self, workers: int = None):
         super(SearchWorker, self).__init__(None)
-        self.items = []
-        self.search_path: str = None
-        self.search_text: str = None
-        self.search_project: bool = None
-
-    def is_binary(self, path):
-        '''
-            check if file is binary
-        '''
-        with open(path, 'rb') as f:
-            return b'\0' in f.read(1024)
-
-    def walk_dir(self, path, exclude_dirs: list, exclude_files: list):
-        for root, dirs, files in os.walk(path, topdown=True):
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-            files[:] = [f for f in files if Path(
-                f).suffix not in exclude_files]
-            yield root, dirs, files
+        self.items = SearchResults()
+        self.workers = workers or os.cpu_count() or 1
+        # used in place of the walk when it covers the searched folder
+        self.index: TrigramIndex = None
+        self.cache = SearchCache()
+        self.current: Search = None
+        self.batches = None
+        self.limit = self.PAGE_ITEMS
+        self.generation = 0
+        self.elapsed = 0.0
+        # files scanned, and files left unscanned, by the searches before the current one
+        self.scanned_before = 0
+        self.saved_before = 0
+
+    @property
+    def files_scanned(self) -> int:
+        return self.scanned_before + (self.current.files_scanned if self.current else 0)
+
+    @property
+    def files_saved(self) -> int:
+        """ Files left unscanned by cancelled searches """
+        return self.saved_before + (self.current.files_saved if self.current else 0)
 
     def search(self):
-        debug = False
-        self.items = []
-        exclude_dirs = set([".git", ".svn", ".hg", ".bzr",
-                            ".idea", "__pycache__", "venv"])
-        if self.search_project:
-            exclude_dirs.remove("venv")
-        exclude_files = set([".svg", ".png", ".exe", ".pyc", ".qm"])
-
-        for root, _, files in self.walk_dir(self.search_path, exclude_dirs, exclude_files):
-            if len(self.items) > 5_000:
+        """ Scan until the walk ends or the current page of results is full """
+        began = time.perf_counter()
+        flushed = 0.0
+        batch_start = len(self.items)
+
+        while len(self.items) < self.limit and not self.isInterruptionRequested():
+            matches = next(self.batches, None)
+            if matches is None:
                 break
-            for file_ in files:
-                full_path = os.path.join(root, file_)
-                if self.is_binary(full_path):
-                    break
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        try:
-                            reg = re.compile(self.search_text, re.IGNORECASE)
-                            for i, line in enumerate(f):
-                                if m := reg.search(line):
-                                    fd = SearchItem(
-                                        file_,
-                                        full_path,
-                                        i,
-                                        m.end(),
-                                        line[m.start():].strip()[:50],
-                                    )
-                                    self.items.append(fd)
-                        except re.error as e:
-                            if debug:
-                                print(e)
-                except UnicodeDecodeError:
-                    if debug:
-                        print(e)
-                    continue
-        self.finished.emit(self.items)
+            self.items.extend(matches)
+            now = time.perf_counter()
+            # the first hits go out at once, later ones in batches
+            if len(self.items) > batch_start and (not flushed or now - flushed >= self.BATCH_INTERVAL):
+                self.results_ready.emit(self.generation, batch_start, len(self.items) - batch_start)
+                batch_start = len(self.items)
+                flushed = now
+                self.progress.emit(self.generation, self.current.files_scanned,
+                                   self.files_per_second(now - began))
+
+        if len(self.items) > batch_start:
+            self.results_ready.emit(self.generation, batch_start, len(self.items) - batch_start)
+        self.elapsed += time.perf_counter() - began
+        self.progress.emit(self.generation, self.current.files_scanned, self.files_per_second(0))
+        self.finished.emit(self.generation, not self.current.done)
+
+    def files_per_second(self, running: float) -> float:
+        elapsed = self.elapsed + running
+        return self.current.files_scanned / elapsed if elapsed else 0.0
 
     def run(self):
         self.search()
 
-    def update(self, pattern, path, search_project):
-        self.search_text = pattern
-        self.search_path = path
-        self.search_project = search_project
+    def cancel(self):
+        """ Stop the running or paused search, its scans stop before their next file """
+        search = self.current
+        if search is None:
+            return
+        search.stop()
+        if self.isRunning():
+            self.requestInterruption()
+            self.wait()
+        search.cancel()
+
+    def update(self, pattern, path, search_project) -> int:
+        """ Start a new search in place of the current one, returns its generation """
+        self.cancel()
+        if self.current is not None:
+            self.scanned_before += self.current.files_scanned
+            self.saved_before += self.current.files_saved
+        # cleared in place, views hold on to it
+        self.items.clear()
+        self.limit = self.PAGE_ITEMS
+        self.elapsed = 0.0
+        self.current = Search(pattern, path, search_project, self.workers,
+                              index=self.index, cache=self.cache)
+        self.batches = iter(self.current)
+        self.generation = self.current.generation
         self.start()
+        return self.generation
+
+    def load_more(self):
+        """ Carry on a paused search for one more page of results """
+        if self.isRunning() or self.current is None or self.current.cancelled:
+            return
+        self.limit = len(self.items) + self.PAGE_ITEMS
+        self.start()
+
+
+class SearchIndexer(QObject):
+    """
+        Keeps the trigram index of the opened folder up to date in a process
+        of its own. Searches refresh it, at most every REFRESH_INTERVAL.
+    """
+    # counts of files indexed, unchanged and removed
+    updated = pyqtSignal(dict)
+
+    # seconds between two refreshes
+    REFRESH_INTERVAL = 5.0
+
+    def __init__(self, parent=None):
+        super(SearchIndexer, self).__init__(parent)
+        self.index: TrigramIndex = None
+        self.enabled = False
+        self.ready = False
+        self.process = None
+        self.receiver = None
+        self.stale = False
+        self.refreshed = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(250)
+        self.timer.timeout.connect(self._poll)
+
+    def set_root(self, root: str):
+        self.index = TrigramIndex(root)
+        self.ready = self.index.is_ready() if self.enabled else False
+        self.refresh(force=True)
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        if self.index is not None:
+            self.set_root(self.index.root)
+
+    def ready_index(self) -> TrigramIndex:
+        """ The index if it is enabled and has been built, None otherwise """
+        return self.index if self.enabled and self.ready else None
+
+    def refresh(self, force=False):
+        if not self.enabled or self.index is None:
+            return
+        if self.process is not None:
+            # once the running update is done
+            self.stale = True
+            return
+        if not force and time.monotonic() - self.refreshed < self.REFRESH_INTERVAL:
+            return
+        self.refreshed = time.monotonic()
+        context = multiprocessing.get_context("spawn")
+        self.receiver, sender = context.Pipe(duplex=False)
+        # a daemon is killed when Dragon quits, even in the middle of an update
+        self.process = context.Process(
+            target=update_index, args=(self.index.root, sender), daemon=True)
+        self.process.start()
+        self.timer.start()
+
+    def _poll(self):
+        if self.receiver.poll():
+            stats = self.receiver.recv()
+            self.ready = True
+            self.updated.emit(stats)
+        elif self.process.is_alive():
+            return
+        self.timer.stop()
+        self.process.join()
+        self.process = None
+        if self.stale:
+            self.stale = False
+            self.refresh(force=True)
+
+
+class SearchSession(QObject):
+    """
+        Search as you type. Queries wait for typing to pause, a new search
+        cancels the one running and results of superseded searches are
+        dropped on arrival.
+    """
+    # emitted when a search starts, the shown results are out of date
+    started = pyqtSignal()
+    # index of the first item of the batch, items in the batch
+    results_ready = pyqtSignal(int, int)
+    # files scanned, files scanned per second
+    progress = pyqtSignal(int, float)
+    # whether the search is paused with results left to load
+    finished = pyqtSignal(bool)
+
+    # ms of quiet after a keystroke before searching
+    DEBOUNCE = 200
+
+    def __init__(self, parent=None, worker: SearchWorker = None, indexer: SearchIndexer = None):
+        super(SearchSession, self).__init__(parent)
+        self.worker = worker or SearchWorker()
+        self.indexer = indexer
+        if indexer is not None:
+            indexer.updated.connect(self._on_index_updated)
+        self.worker.results_ready.connect(self._on_results)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.generation = None
+        self.query: tuple = None
+        self.running = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE)
+        self.timer.timeout.connect(self._start)
+
+        # Counters
+        self.requested = 0
+        self.debounced = 0
+        self.searches = 0
+        self.cancelled = 0
+        self.discarded = 0
+
+    def request(self, pattern: str, path: str, search_project: bool):
+        """ Search for `pattern` in `path` once typing pauses """
+        self.requested += 1
+        if self.timer.isActive():
+            self.debounced += 1
+        self.query = (pattern, path, search_project)
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
+        if self.running:
+            self.cancelled += 1
+        self.running = False
+        self.generation = None
+        self.worker.cancel()
+
+    def load_more(self):
+        if self.generation is not None and not self.running:
+            self.running = True
+            self.worker.load_more()
+
+    @property
+    def results(self) -> SearchResults:
+        """ Results of the current search, the same object from one search to the next """
+        return self.worker.items
+
+    def _start(self):
+        self.cancel()
+        self.started.emit()
+        pattern, path, search_project = self.query
+        if not pattern:
+            self.finished.emit(False)
+            return
+        self.searches += 1
+        self.running = True
+        if self.indexer is not None:
+            self.worker.index = self.indexer.ready_index()
+            # files may have changed since the last search
+            self.indexer.refresh()
+        self.generation = self.worker.update(pattern, path, search_project)
+
+    def _on_index_updated(self, stats: dict):
+        if stats["indexed"] or stats["removed"]:
+            # cached results may miss the files added or changed
+            self.worker.cache.clear()
+        if (stats["indexed"] or stats["removed"]) and self.worker.index is not None \
+                and self.generation is not None:
+            # the shown results came from the index before it caught up
+            self._start()
+
+    def _on_results(self, generation: int, start: int, count: int):
+        if generation != self.generation:
+            self.discarded += 1
+            return
+        self.results_ready.emit(start, count)
+
+    def _on_progress(self, generation: int, scanned: int, files_per_second: float):
+        if generation == self.generation:
+            self.progress.emit(scanned, files_per_second)
+
+    def _on_finished(self, generation: int, more: bool):
+        if generation != self.generation:
+            return
+        self.running = False
+        self.finished.emit(more)
+
+    def stats(self) -> dict[str, int]:
+        """ Counters, `files_saved` is work that cancelling avoided """
+        return {
+            "requested": self.requested,
+            "debounced": self.debounced,
+            "searches": self.searches,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+            "files_scanned": self.worker.files_scanned,
+            "files_saved": self.worker.files_saved,
+            "cache_hits": self.worker.cache.hits,
+        }
@@ -1,6 +1,8 @@
 # STD
 import os
 import sys
+from bisect import bisect_left
+from collections import deque
 from pathlib import Path
 # Installed
 from PyQt6.QtWidgets import *
@@ -9,22 +11,48 @@ from PyQt6.QtGui import *
 from PyQt6.Qsci import *
 # Custom
 from editor.editor import Editor
+from editor.large_file_editor import LargeFileEditor
+from editor.completion_server import CompletionServer
+from editor.file_saver import recovered, remove_recovery
 from file_manager import FileManager
-from fuzzy_finder import SearchItem, SearchWorker
+from file_jobs import FileJob
+from fuzzy_finder import SearchIndexer, SearchResultModel, SearchSession
+from quick_open import QuickOpen
+from editor_registry import EditorRegistry
+from session import Session, TabPlaceholder
 
 
 class MainWindow(QMainWindow):
+    # restored tabs added per turn of the event loop
+    RESTORE_BATCH = 8
+
     def __init__(self):
         super(MainWindow, self).__init__()
 
         self.set_sidebar_color = "#282c34"
+        # tabs by the path of their file
+        self.editors = EditorRegistry()
+        # tabs and folder of the last run
+        self.session = Session().load()
+        # folder opened in the file manager, searched by the search view
+        self.root_path = self.session.root if self.session.root and os.path.isdir(
+            self.session.root) else os.getcwd()
+        # jedi runs in worker processes shared by every tab
+        self.completion_server = CompletionServer.shared()
+        self.completion_server.set_root(self.root_path)
+        self.completion_server.index_packages()
 
         self.init_ui()
 
+        self.quick_open = QuickOpen(self.set_new_tab, self)
+        self.quick_open.set_root(self.root_path)
+
         self.isMaximized = False
         self.current_file = None
         self.current_open_sidebar = None
 
+        self.restore_session()
+
     def init_ui(self):
         # Window
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint)
@@ -38,6 +66,20 @@ class MainWindow(QMainWindow):
         self.setFont(self.window_font)
 
         self.statusBar().setStyleSheet("color : white")
+        # files being read into their tab
+        self.load_bar = QProgressBar()
+        self.load_bar.setMaximumWidth(200)
+        self.load_bar.setRange(0, 100)
+        self.load_bar.hide()
+        self.statusBar().addPermanentWidget(self.load_bar)
+        # deletes, moves and copies of the file manager
+        self.job_bar = QProgressBar()
+        self.job_bar.setMaximumWidth(200)
+        self.job_bar.hide()
+        self.job_cancel = QPushButton("Cancel")
+        self.job_cancel.hide()
+        self.statusBar().addPermanentWidget(self.job_bar)
+        self.statusBar().addPermanentWidget(self.job_cancel)
 
         self.setup_header()
         self.setup_body()
@@ -99,9 +141,14 @@ class MainWindow(QMainWindow):
         open_file.triggered.connect(self.open_file)
 
         open_folder = file_menu.addAction("Open Folder")
-        open_folder.setShortcut("Ctrl+F")
+        # Ctrl+F is Find
+        open_folder.setShortcut("Ctrl+K, Ctrl+O")
         open_folder.triggered.connect(self.open_folder)
 
+        go_to_file = file_menu.addAction("Go to File")
+        go_to_file.setShortcut("Ctrl+P")
+        go_to_file.triggered.connect(lambda: self.quick_open.popup())
+
         file_menu.addSeparator()
 
         save_file = file_menu.addAction("Save")
@@ -143,6 +190,10 @@ class MainWindow(QMainWindow):
         find_action.setShortcut("Ctrl+F")
         find_action.triggered.connect(self.find)
 
+        go_to_line = edit_menu.addAction("Go to Line")
+        go_to_line.setShortcut("Ctrl+G")
+        go_to_line.triggered.connect(self.go_to_line)
+
         left_layout.addWidget(menu_bar)
 
         left_widget.setLayout(left_layout)
@@ -209,6 +260,8 @@ class MainWindow(QMainWindow):
         self.setMenuWidget(header_widget)
 
     def get_editor(self, path: Path = None, is_python_file=True) -> QsciScintilla:
+        if path is not None and path.is_file() and LargeFileEditor.is_large(path):
+            return LargeFileEditor(path=path)
         editor = Editor(path=path, is_python_file=is_python_file)
         return editor
 
@@ -220,9 +273,10 @@ class MainWindow(QMainWindow):
             return b'\0' in f.read(1024)
 
     def set_new_tab(self, path: Path, is_new_file=False):
-        editor = self.get_editor(path, path.suffix in {".py", ".pyw"})
-
         if is_new_file:
+            # without a file, it gets one when saved
+            editor = self.get_editor(None, is_python_file=False)
+            self.connect_saving(editor)
             self.tab_view.addTab(editor, "untitled")
             # self.setWindowTitle("untitled")
             self.statusBar().showMessage("Opened untitled")
@@ -232,24 +286,237 @@ class MainWindow(QMainWindow):
 
         if not path.is_file():
             return
-        if self.is_binary(path):
-            self.statusBar().showMessage("Cannot Open Binary File", 2000)
+
+        # Check if the file is already open, before building an editor
+        opened = self.editors.get(path)
+        if opened is not None:
+            self.tab_view.setCurrentWidget(opened)
+            self.current_file = opened.path
             return
 
-        # Check if the file is already open
-        for i in range(self.tab_view.count()):
-            if self.tab_view.tabText(i) == path.name:
-                self.tab_view.setCurrentIndex(i)
-                self.current_file = path
-                return
+        # the read-only view of a large file shows any bytes, a data file may hold a NUL
+        if not LargeFileEditor.is_large(path) and self.is_binary(path):
+            self.statusBar().showMessage("Cannot Open Binary File", 2000)
+            return
 
-        # Create a new tab
+        # Create a new tab, the text follows in chunks
+        editor = self.get_file_editor(path)
         self.tab_view.addTab(editor, path.name)
-        editor.setText(path.read_text())
+        self.editors.add(editor)
         # self.setWindowTitle(path.name)
         self.current_file = path
         self.tab_view.setCurrentIndex(self.tab_view.count() - 1)
-        self.statusBar().showMessage(f"Opened {path.name}", 2000)
+        self.statusBar().showMessage(f"Opening {path.name}")
+        editor.load()
+
+    def get_file_editor(self, path: Path) -> Editor:
+        """ Editor for `path` reporting how its loading goes, call its `load` once in a tab """
+        editor = self.get_editor(path, path.suffix in {".py", ".pyw"})
+        editor.load_progress.connect(self.file_load_progress)
+        editor.loaded.connect(lambda error: self.file_loaded(path, error))
+        self.connect_saving(editor)
+        return editor
+
+    def connect_saving(self, editor: Editor):
+        editor.saved.connect(lambda path, error: self.file_saved(editor, path, error))
+        editor.modificationChanged.connect(lambda modified: self.update_tab_title(editor))
+
+    def update_tab_title(self, widget: QWidget):
+        """ Name of the tab's file, marked while it has unsaved changes """
+        index = self.tab_view.indexOf(widget)
+        if index == -1:
+            return
+        name = widget.path.name if widget.path is not None else "untitled"
+        if isinstance(widget, Editor) and widget.isModified():
+            name += " *"
+        self.tab_view.setTabText(index, name)
+
+    def restore_session(self):
+        """
+            Tabs of the last run as placeholders, only the current one gets its
+            editor. It goes in first so the window paints at once, the others
+            are added around it in batches from the event loop.
+        """
+        tabs = self.session.tabs
+        # session positions of the restored tabs, and the tabs left to add
+        self.restored_positions: list[int] = []
+        self.restore_queue: deque[tuple[int, dict]] = deque()
+        if not tabs:
+            QTimer.singleShot(0, self.restore_next)
+            return
+        current = min(self.session.current, len(tabs) - 1)
+        self.restore_queue.extend((position, tab) for position, tab in enumerate(tabs) if position != current)
+        self.add_placeholder(current, tabs[current])
+        QTimer.singleShot(0, self.restore_next)
+
+    def restore_next(self):
+        for _ in range(self.RESTORE_BATCH):
+            if not self.restore_queue:
+                # once every tab is in, a recovered one replaces the tab of its file
+                self.offer_recovery()
+                return
+            self.add_placeholder(*self.restore_queue.popleft())
+        QTimer.singleShot(0, self.restore_next)
+
+    def add_placeholder(self, position: int, tab: dict):
+        """ Tab of a session, `position` in the session's tabs """
+        path = Path(tab["path"])
+        if not path.is_file():
+            return
+        index = bisect_left(self.restored_positions, position)
+        self.restored_positions.insert(index, position)
+        placeholder = TabPlaceholder(path, tab.get("line", 0), tab.get("index", 0), tab.get("first_visible", 0))
+        self.tab_view.blockSignals(True)
+        self.tab_view.insertTab(index, placeholder, path.name)
+        self.tab_view.blockSignals(False)
+        self.editors.add(placeholder)
+        if self.tab_view.count() == 1:
+            # the first tab is the current one, it gets built
+            self.tab_changed(0)
+
+    def offer_recovery(self):
+        """ Unsaved text autosaved by an earlier run, each restored in a tab or discarded """
+        for copy, source in recovered():
+            dialog = QMessageBox(self)
+            dialog.setWindowTitle("Recover unsaved changes")
+            dialog.setText(f"Unsaved changes to {source or 'an untitled tab'} were kept from the last run. "
+                           "Restore them in a tab?")
+            restore = dialog.addButton("Restore", QMessageBox.ButtonRole.AcceptRole)
+            dialog.addButton("Discard", QMessageBox.ButtonRole.DestructiveRole)
+            dialog.setDefaultButton(restore)
+            dialog.exec()
+            if dialog.clickedButton() is restore:
+                try:
+                    text = copy.read_bytes().decode("utf-8", "replace")
+                except OSError as e:
+                    self.statusBar().showMessage(f"Can't recover {source or 'untitled'}: {e}", 5000)
+                    continue
+                self.restore_recovered(Path(source) if source else None, text)
+            remove_recovery(copy)
+
+    def restore_recovered(self, path: Path, text: str):
+        """ Tab of recovered `text`, unsaved, in place of the tab of `path` when it is open """
+        opened = self.editors.get(path) if path is not None else None
+        index = self.tab_view.count()
+        if opened is not None:
+            index = self.tab_view.indexOf(opened)
+            self.close_tab(index)
+        # editable whatever the size of the file, it is the text to save
+        editor = Editor(path=path, is_python_file=path is not None and path.suffix in {".py", ".pyw"})
+        self.connect_saving(editor)
+        # the save point is the empty text, the tab shows unsaved
+        editor.setText(text)
+        self.tab_view.insertTab(index, editor, "")
+        self.update_tab_title(editor)
+        if path is not None:
+            self.editors.add(editor)
+        self.tab_view.setCurrentIndex(index)
+        self.current_file = path
+
+    def save_session(self):
+        # tabs of the last session not added yet
+        while self.restore_queue:
+            self.restore_next()
+        tabs = []
+        for i in range(self.tab_view.count()):
+            widget = self.tab_view.widget(i)
+            # untitled tabs have no file to reopen
+            if widget.path is not None:
+                tabs.append(widget.view_state())
+        self.session.root = self.root_path
+        self.session.tabs = tabs
+        self.session.current = max(self.tab_view.currentIndex(), 0)
+        try:
+            self.session.save()
+        except OSError as e:
+            print(f"Session not saved: {e}")
+
+    def tab_changed(self, index: int):
+        if index == -1:
+            return
+        widget = self.tab_view.widget(index)
+        if isinstance(widget, TabPlaceholder):
+            self.hydrate_tab(index)
+        else:
+            self.current_file = widget.path
+
+    def hydrate_tab(self, index: int):
+        """ Build the editor of a restored tab, the first time it is shown """
+        placeholder: TabPlaceholder = self.tab_view.widget(index)
+        path = placeholder.path
+        exists = path.is_file()
+        self.tab_view.blockSignals(True)
+        self.tab_view.removeTab(index)
+        self.editors.remove(placeholder)
+        if exists:
+            editor = self.get_file_editor(path)
+            self.tab_view.insertTab(index, editor, path.name)
+            self.tab_view.setCurrentIndex(index)
+            self.editors.add(editor)
+        self.tab_view.blockSignals(False)
+        placeholder.deleteLater()
+        if not exists:
+            # gone since the session was saved
+            self.statusBar().showMessage(f"{path.name} no longer exists", 2000)
+            self.tab_changed(self.tab_view.currentIndex())
+            return
+        self.current_file = path
+        editor.load()
+        editor.go_to(placeholder.line, placeholder.index)
+        editor.scroll_to(placeholder.first_visible)
+
+    def closeEvent(self, event):
+        self.save_session()
+        for i in range(self.tab_view.count()):
+            widget = self.tab_view.widget(i)
+            widget.stop_loading()
+            if isinstance(widget, Editor):
+                # unsaved text is kept in the recovery folder
+                widget.autosave()
+                widget.finish_saving()
+        # a copy cut short is removed, a delete stops where it is
+        self.file_manager.stop()
+        self.quick_open.stop()
+        super(MainWindow, self).closeEvent(event)
+
+    def file_load_progress(self, read: int, size: int):
+        self.load_bar.setValue(read * 100 // size if size else 100)
+        self.load_bar.show()
+
+    def file_loaded(self, path: Path, error: str):
+        if not any(self.tab_view.widget(i).is_loading() for i in range(self.tab_view.count())):
+            self.load_bar.hide()
+        self.statusBar().showMessage(error or f"Opened {path.name}", 5000 if error else 2000)
+
+    def file_job_progress(self, kind: str, done: int, total: int):
+        # busy until the job has counted its files
+        self.job_bar.setRange(0, total)
+        self.job_bar.setValue(done)
+        self.job_bar.setFormat(f"{kind} %v/%m")
+        self.job_bar.show()
+        self.job_cancel.show()
+
+    def file_job_finished(self, job: FileJob):
+        """ Tabs follow the files of the job, once for the whole job """
+        done = set(job.done)
+        if job.kind == FileJob.MOVE:
+            for source, destination in job.pairs():
+                if source in done:
+                    self.files_moved(source, destination)
+        elif job.kind == FileJob.DELETE:
+            for path in job.done:
+                self.files_deleted(path)
+        if not self.file_manager.jobs.is_busy():
+            self.job_bar.hide()
+            self.job_cancel.hide()
+        if job.errors:
+            more = f" and {len(job.errors) - 1} more" if len(job.errors) > 1 else ""
+            self.statusBar().showMessage(f"{job.kind} failed: {job.errors[0]}{more}", 5000)
+        elif job.cancelled:
+            self.statusBar().showMessage(
+                f"{job.kind} cancelled, {len(job.done)} of {len(job.sources)} done", 5000)
+        else:
+            self.statusBar().showMessage(f"{FileJob.DONE[job.kind]} {len(job.done)} item(s)", 2000)
 
     def set_cursor_pointer(self, e):
         self.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -301,6 +568,7 @@ class MainWindow(QMainWindow):
         self.tab_view.setMovable(True)
         self.tab_view.setDocumentMode(True)
         self.tab_view.tabCloseRequested.connect(self.close_tab)
+        self.tab_view.currentChanged.connect(self.tab_changed)
 
         ##########################################
         ############## Sidebar View ##############
@@ -344,6 +612,11 @@ class MainWindow(QMainWindow):
 
         self.file_manager = FileManager(
             tab_view=self.tab_view, set_new_tab=self.set_new_tab, main_window=self)
+        if self.root_path != os.getcwd():
+            self.file_manager.set_root(self.root_path)
+        self.file_manager.jobs.progress.connect(self.file_job_progress)
+        self.file_manager.jobs.finished.connect(self.file_job_finished)
+        self.job_cancel.clicked.connect(self.file_manager.jobs.cancel)
 
         # Setup Layout
         self.file_manager_layout.addWidget(self.file_manager)
@@ -371,28 +644,61 @@ class MainWindow(QMainWindow):
         self.search_checkbox.setStyleSheet(
             """color: white; margin-bottom: 10px""")
 
-        self.search_worker = SearchWorker()
-        self.search_worker.finished.connect(self.search_finished)
+        self.index_checkbox = QCheckBox("Index folder")
+        self.index_checkbox.setFont(self.window_font)
+        self.index_checkbox.setStyleSheet(
+            """color: white; margin-bottom: 10px""")
+
+        # Optional trigram index, kept in .dragon of the opened folder
+        self.search_indexer = SearchIndexer(self)
+        self.search_indexer.set_root(self.root_path)
+        self.search_indexer.updated.connect(
+            lambda stats: self.statusBar().showMessage(
+                f"Search index: {stats['indexed']} files indexed, {stats['removed']} removed", 2000))
+        self.index_checkbox.toggled.connect(self.search_indexer.set_enabled)
+
+        self.search_session = SearchSession(self, indexer=self.search_indexer)
+        self.search_session.started.connect(self.search_started)
+        self.search_session.results_ready.connect(self.search_results)
+        self.search_session.progress.connect(self.search_progress)
+        self.search_session.finished.connect(self.search_finished)
         search_input.textChanged.connect(
-            lambda text: self.search_worker.update(
+            lambda text: self.search_session.request(
                 text,
-                self.model.rootDirectory().absolutePath(),
+                self.root_path,
                 self.search_checkbox.isChecked()
             )
         )
 
         ################################################
         ############## Search Result View ##############
-        self.search_list_view = QListWidget()
+        # rows are formatted as they are painted, not when results arrive
+        self.search_model = SearchResultModel(self.search_session.results, self)
+        self.search_list_view = QListView()
         self.search_list_view.setFont(QFont("FiraCode", 13))
-        self.search_list_view.itemClicked.connect(
+        self.search_list_view.setUniformItemSizes(True)
+        self.search_list_view.setModel(self.search_model)
+        self.search_list_view.clicked.connect(
             self.search_list_view_clicked)
 
+        self.search_status = QLabel()
+        self.search_status.setFont(self.window_font)
+        self.search_status.setStyleSheet("color: #abb2bf; margin: 4px 0px")
+
+        self.search_more_button = QPushButton("Load more")
+        self.search_more_button.setFont(self.window_font)
+        self.search_more_button.setStyleSheet("color: white")
+        self.search_more_button.clicked.connect(self.search_session.load_more)
+        self.search_more_button.hide()
+
         search_layout.addWidget(self.search_checkbox)
+        search_layout.addWidget(self.index_checkbox)
         search_layout.addWidget(search_input)
         search_layout.addSpacerItem(QSpacerItem(
             5, 5, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Minimum))
+        search_layout.addWidget(self.search_status)
         search_layout.addWidget(self.search_list_view)
+        search_layout.addWidget(self.search_more_button)
         self.search_frame.setLayout(search_layout)
 
         # Add Tree View and Tab View
@@ -405,19 +711,56 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(body_frame)
 
-    def search_finished(self, items):
-        self.search_list_view.clear()
-        for i in items:
-            self.search_list_view.addItem(i)
+    def search_started(self):
+        self.search_model.clear()
+        self.search_status.clear()
+        self.search_more_button.hide()
+
+    def search_results(self, start, count):
+        # Appended as a block, what is already listed doesn't move
+        self.search_model.set_count(start + count)
+
+    def search_progress(self, scanned, files_per_second):
+        self.search_status.setText(
+            f"{self.search_model.rowCount()} results, {scanned} files "
+            f"({files_per_second:,.0f} files/s)")
 
-    def search_list_view_clicked(self, item: SearchItem):
+    def search_finished(self, more):
+        self.search_more_button.setVisible(more)
+
+    def search_list_view_clicked(self, index: QModelIndex):
+        item = self.search_model.item(index.row())
         self.set_new_tab(Path(item.full_path))
         editor: Editor = self.tab_view.currentWidget()
-        editor.setCursorPosition(item.line_no, item.end)
+        editor.go_to(item.line_no, item.end)
         editor.setFocus()
 
     def close_tab(self, index):
+        widget = self.tab_view.widget(index)
+        self.editors.remove(widget)
         self.tab_view.removeTab(index)
+        self.discard_tab(widget)
+
+    def discard_tab(self, widget: QWidget):
+        """ Delete the widget of a tab that was removed, once nothing of it runs """
+        if isinstance(widget, Editor):
+            widget.close_down()
+        else:
+            widget.stop_loading()
+        widget.deleteLater()
+
+    def files_moved(self, old: Path, new: Path):
+        """ `old`, a file or a folder, was renamed or moved to `new`, its tabs follow """
+        for widget in self.editors.move(old, new):
+            self.update_tab_title(widget)
+            if widget is self.tab_view.currentWidget():
+                self.current_file = widget.path
+
+    def files_deleted(self, path: Path):
+        """ `path`, a file or a folder, was deleted, its tabs close """
+        for widget in self.editors.discard(path):
+            self.tab_view.removeTab(self.tab_view.indexOf(widget))
+            self.discard_tab(widget)
 
     def toggle_tab(self, e, type_):
         if type_ == "file-manager":
@@ -453,22 +796,32 @@ class MainWindow(QMainWindow):
         new_folder = QFileDialog.getExistingDirectory(
             self, "Pick a Folder", "", options=ops)
         if new_folder:
-            self.model = self.file_manager.model
-            self.file_manager.setRootIndex(self.model.index(new_folder))
+            self.file_manager.set_root(new_folder)
+            self.root_path = new_folder
+            self.search_indexer.set_root(new_folder)
+            self.quick_open.set_root(new_folder)
+            self.completion_server.set_root(new_folder)
             self.statusBar().showMessage(
                 f"Opened {new_folder}", 2000)
 
     def save_file(self):
-        if self.current_file is None and self.tab_view.count() > 0:
-            self.save_as()
-
         editor = self.tab_view.currentWidget()
-        self.current_file.write_text(editor.text())
-        self.statusBar().showMessage(f"Saved {self.current_file.name}", 2000)
+        if editor is None or self.is_loading():
+            return
+        if editor.path is None:
+            # untitled, its file is picked first
+            self.save_as()
+            return
+        if not editor.isModified() and editor.path.exists():
+            self.statusBar().showMessage(f"{editor.path.name} has no changes to save", 2000)
+            return
+        # written in the background, typing goes on meanwhile
+        editor.save(editor.path)
+        self.statusBar().showMessage(f"Saving {editor.path.name}")
 
     def save_as(self):
         editor = self.tab_view.currentWidget()
-        if editor is None:
+        if editor is None or self.is_loading():
             return
 
         file_path = QFileDialog.getSaveFileName(
@@ -477,10 +830,36 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Cancelled", 2000)
             return
         path = Path(file_path)
-        path.write_text(editor.text())
-        self.tab_view.setTabText(self.tab_view.currentIndex(), path.name)
+        editor.save(path)
+        self.statusBar().showMessage(f"Saving {path.name}")
+
+    def file_saved(self, editor: Editor, path: Path, error: str):
+        if error:
+            self.statusBar().showMessage(f"{path.name} not saved: {error}", 5000)
+            return
+        if self.tab_view.indexOf(editor) == -1:
+            # closed while it was saved
+            self.statusBar().showMessage(f"Saved {path.name}", 2000)
+            return
+        if editor.full_path != path.absolute():
+            # saved as another file, the tab is that file's now
+            editor.set_path(path)
+            self.editors.add(editor)
+            if editor is self.tab_view.currentWidget():
+                self.current_file = path
+        self.update_tab_title(editor)
         self.statusBar().showMessage(f"Saved {path.name}", 2000)
-        self.current_file = path
+
+    def is_loading(self) -> bool:
+        """ Whether the current tab is still reading its file, or only holds a page of it """
+        editor = self.tab_view.currentWidget()
+        if editor is not None and editor.is_loading():
+            self.statusBar().showMessage(f"{editor.path.name} is still loading", 2000)
+            return True
+        if isinstance(editor, LargeFileEditor):
+            self.statusBar().showMessage(f"{editor.path.name} is opened read-only", 2000)
+            return True
+        return False
 
     def _undo(self):
         editor = self.tab_view.currentWidget()
@@ -508,10 +887,26 @@ class MainWindow(QMainWindow):
             editor.paste()
 
     def find(self):
-        ...
+        editor = self.tab_view.currentWidget()
+        if editor is None:
+            return
+        text, ok = QInputDialog.getText(self, "Find", "Find:", text=editor.selectedText())
+        if ok and text and not editor.find_text(text):
+            self.statusBar().showMessage(f"{text} not found", 2000)
+
+    def go_to_line(self):
+        editor = self.tab_view.currentWidget()
+        if editor is None:
+            return
+        line, ok = QInputDialog.getInt(
+            self, "Go to Line", "Line:", editor.cursor_line() + 1, 1, 2 ** 31 - 1)
+        if ok:
+            editor.go_to(line - 1, 0)
+            editor.setFocus()
 
 
 if __name__ == '__main__':
     app = QApplication([])
+    app.setApplicationName("Dragon")
     window = MainWindow()
     sys.exit(app.exec())
@@ -0,0 +1,313 @@
+"""
+    Index of the file paths of a folder for quick open. Nothing here
+    imports Qt.
+
+    Paths are kept in one string, each followed by a newline, with an array
+    of where each one starts. For every character of the alphabet, three
+    bitsets held in ints say which paths contain it, which have it in their
+    file name and which have it at the start of a word. A query scores every
+    path at once with bitwise operations on those ints, then only the best
+    scored are matched character by character.
+"""
+# STD
+import re
+from array import array
+
+# characters with bitsets, the others of a query are only matched at the end
+ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789._-"
+# characters that don't start a word, newlines stay to split paths
+NOT_WORD_START = re.compile(r"(?<=[^\n/\\_\-. ])(?:[^A-Z\d\n]|(?<![a-z])[A-Z]|(?<=\d)\d)")
+# everything of a path up to its file name
+DIRECTORY = re.compile(r"[^\n]*/")
+SEPARATORS = "/\\_-. "
+
+# every byte but the newline and the mark of a match
+NOT_MARKS = bytes(set(range(256)) - {1, 10})
+NEWLINE_TO_ZERO = bytes.maketrans(b"\n", b"0")
+# bytes of lines scanned at a time for a bitset
+BITSET_CHUNK = 256 * 1024
+
+
+def bitset(lines: bytes, needle: bytes) -> int:
+    """ Int with bit i set when line i of `lines` holds `needle` """
+    bits = 0
+    line = 0
+    start = 0
+    # a chunk at a time, a thread holds the GIL through each bytes method
+    while start < len(lines):
+        end = lines.find(b"\n", start + BITSET_CHUNK) + 1 or len(lines)
+        chunk = lines[start:end]
+        # every match becomes \x01, then each line ends with one if it had any
+        marks = chunk.replace(needle, b"\x01").translate(None, NOT_MARKS)
+        digits = marks.replace(b"\x01\n", b"1").translate(NEWLINE_TO_ZERO, b"\x01")
+        if digits:
+            bits |= int(digits[::-1], 2) << line
+        line += len(digits)
+        start = end
+    return bits
+
+
+def match_lines(text: str) -> bytes:
+    return text.lower().encode("utf-8").replace(b"\x01", b"")
+
+
+def word_starts(text: str) -> str:
+    """ `text` reduced to the characters starting a word """
+    return NOT_WORD_START.sub("", text)
+
+
+def bit_positions(bits: int, limit: int) -> list[int]:
+    """ Up to `limit` set bits of `bits`, lowest first """
+    digits = bin(bits)
+    last = len(digits) - 1
+    positions = []
+    end = len(digits)
+    while len(positions) < limit:
+        end = digits.rfind("1", 2, end)
+        if end == -1:
+            break
+        positions.append(last - end)
+    return positions
+
+
+def match_score(path: str, query: str) -> float:
+    """
+        Score of lowercase `query` as a subsequence of `path`, None when it
+        isn't one. Matched from the end, so the file name gets the characters
+    """
+    lower = path.lower()
+    positions = []
+    end = len(lower)
+    for char in reversed(query):
+        end = lower.rfind(char, 0, end)
+        if end == -1:
+            return None
+        positions.append(end)
+
+    name_start = path.rfind("/") + 1
+    score = 0.0
+    previous = None
+    for position in positions:
+        score += 1
+        if position == 0 or path[position - 1] in SEPARATORS or (
+                path[position].isupper() and path[position - 1].islower()):
+            score += PathIndex.WORD_START_WEIGHT
+        if position >= name_start:
+            score += PathIndex.NAME_WEIGHT
+        if previous == position + 1:
+            score += PathIndex.CONSECUTIVE_WEIGHT
+        previous = position
+    # shorter paths first
+    return score - len(path) / 100
+
+
+class PathIndex:
+    """
+        Paths are relative to `root` and use `/`. An index isn't changed once
+        built, `update` returns a new one, so a thread can build it while
+        another queries the old one.
+    """
+    NAME_WEIGHT = 2
+    WORD_START_WEIGHT = 3
+    CONSECUTIVE_WEIGHT = 2
+    # pairs of query characters next to each other in a file name
+    PAIR_WEIGHT = 4
+    PAIRS_CACHED = 64
+    # best scored paths matched character by character per query
+    MAX_MATCHED = 2000
+    # candidates matched between two steps of a ranking
+    MATCH_BATCH = 500
+
+    def __init__(self, root: str):
+        self.root = root
+        self.buffer = ""
+        self.offsets = array("Q", [0])
+        # lowercased file names, a line each, for the bitsets of pairs
+        self.names = b""
+        # paths still in the folder, the others are dead until a rebuild
+        self.alive = 0
+        self.dead = 0
+        self.has: dict[str, int] = dict.fromkeys(ALPHABET, 0)
+        self.name: dict[str, int] = dict.fromkeys(ALPHABET, 0)
+        self.word_start: dict[str, int] = dict.fromkeys(ALPHABET, 0)
+        self.pairs: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1 - self.dead
+
+    def path(self, id_: int) -> str:
+        return self.buffer[self.offsets[id_]:self.offsets[id_ + 1] - 1]
+
+    def paths(self) -> list[str]:
+        return self.buffer.split("\n")[:-1]
+
+    def update(self, paths: list[str]) -> "PathIndex":
+        """ Index of `paths`, this one with the changes when few of its paths are gone """
+        paths = list(dict.fromkeys(paths))
+        if not len(self):
+            return self.build(paths)
+        old = self.paths()
+        current = set(paths)
+        removed = [id_ for id_, path in enumerate(old)
+                   if path not in current and self.alive >> id_ & 1]
+        if self.dead + len(removed) > len(paths):
+            # mostly dead paths, start over
+            return self.build(paths)
+        # a path deleted then created again is added anew, its old id stays dead
+        known = {path for id_, path in enumerate(old) if self.alive >> id_ & 1}
+        added = [path for path in paths if path not in known]
+        if not added and not removed:
+            return self
+
+        index = PathIndex(self.root)
+        text = "".join(path + "\n" for path in added)
+        index.buffer = self.buffer + text
+        index.names = self.names + DIRECTORY.sub("", match_lines(text).decode("utf-8")).encode("utf-8")
+        index.offsets = array("Q", self.offsets)
+        index.alive = self.alive
+        for id_ in removed:
+            index.alive &= ~(1 << id_)
+        index.dead = self.dead + len(removed)
+        index.has, index.name, index.word_start = dict(self.has), dict(self.name), dict(self.word_start)
+        for path in added:
+            id_ = len(index.offsets) - 1
+            index.offsets.append(index.offsets[-1] + len(path) + 1)
+            bit = 1 << id_
+            index.alive |= bit
+            lower = path.lower()
+            for char in set(lower).intersection(ALPHABET):
+                index.has[char] |= bit
+            for char in set(lower[lower.rfind("/") + 1:]).intersection(ALPHABET):
+                index.name[char] |= bit
+            for char in set(word_starts(path).lower()).intersection(ALPHABET):
+                index.word_start[char] |= bit
+        return index
+
+    def build(self, paths: list[str]) -> "PathIndex":
+        """ New index of `paths`, each bitset built over all of them at once """
+        index = PathIndex(self.root)
+        index.buffer = "".join(path + "\n" for path in paths)
+        offset = 0
+        for path in paths:
+            offset += len(path) + 1
+            index.offsets.append(offset)
+        index.alive = (1 << len(paths)) - 1
+
+        lower = match_lines(index.buffer)
+        index.names = DIRECTORY.sub("", lower.decode("utf-8")).encode("utf-8")
+        starts = match_lines(word_starts(index.buffer))
+        for char in ALPHABET:
+            needle = char.encode()
+            index.has[char] = bitset(lower, needle)
+            index.name[char] = bitset(index.names, needle)
+            index.word_start[char] = bitset(starts, needle)
+        return index
+
+    def search(self, query: str, limit: int) -> list[str]:
+        """ The `limit` paths best matching `query`, best first """
+        results = []
+        for ranked in self.ranking(query, limit):
+            if ranked is not None:
+                results = ranked
+        return results
+
+    def ranking(self, query: str, limit: int):
+        """
+            Steps of `search`, a thread stops between two when a newer query
+            comes. Yields None while bitsets are worked out, then the best
+            paths matched so far after each MATCH_BATCH, the last is the
+            ranking of every candidate picked.
+        """
+        query = query.lower().replace("\\", "/").replace(" ", "")
+        if not query:
+            yield []
+            return
+        chars = [char for char in dict.fromkeys(query) if char in ALPHABET]
+
+        # paths holding every character, in any order
+        candidates = self.alive
+        for char in chars:
+            candidates &= self.has[char]
+            if not candidates:
+                yield []
+                return
+
+        # bit-sliced counters, planes[k] holds bit k of the score of every path
+        planes = []
+        for char in chars:
+            self.add(planes, self.name[char] & candidates, self.NAME_WEIGHT)
+            self.add(planes, self.word_start[char] & candidates, self.WORD_START_WEIGHT)
+        for i in range(len(query) - 1):
+            pair = query[i:i + 2]
+            if pair[0] in ALPHABET and pair[1] in ALPHABET:
+                # a pair not cached yet scans every file name
+                yield None
+                self.add(planes, self.pair(pair) & candidates, self.PAIR_WEIGHT)
+
+        picked = []
+        for bits in self.by_score(planes, candidates):
+            picked += bit_positions(bits, self.MAX_MATCHED - len(picked))
+            if len(picked) >= self.MAX_MATCHED:
+                break
+        yield None
+
+        scored = []
+        for start in range(0, len(picked), self.MATCH_BATCH):
+            for id_ in picked[start:start + self.MATCH_BATCH]:
+                path = self.path(id_)
+                score = match_score(path, query)
+                if score is not None:
+                    scored.append((score, path))
+            # the best scored by bitsets come first, the ranking so far is close to the last one
+            scored.sort(key=lambda item: item[0], reverse=True)
+            del scored[limit:]
+            yield [path for _, path in scored]
+        if not picked:
+            yield []
+
+    def pair(self, pair: str) -> int:
+        """ Bitset of the file names holding `pair`, built on first use """
+        bits = self.pairs.get(pair)
+        if bits is None:
+            if len(self.pairs) >= self.PAIRS_CACHED:
+                del self.pairs[next(iter(self.pairs))]
+            bits = self.pairs[pair] = bitset(self.names, pair.encode())
+        return bits
+
+    @staticmethod
+    def add(planes: list[int], bits: int, weight: int):
+        """ Add `weight` to the counters of the paths set in `bits` """
+        plane = 0
+        while weight:
+            if weight & 1:
+                carry = bits
+                level = plane
+                while carry:
+                    while level >= len(planes):
+                        planes.append(0)
+                    value = planes[level]
+                    planes[level] = value ^ carry
+                    carry &= value
+                    level += 1
+            weight >>= 1
+            plane += 1
+
+    @staticmethod
+    def by_score(planes: list[int], candidates: int):
+        """ Bitsets of the candidates with each score, highest first """
+        # the best score, found plane by plane from the top
+        best = 0
+        top = candidates
+        for level in range(len(planes) - 1, -1, -1):
+            bits = top & planes[level]
+            if bits:
+                top = bits
+                best |= 1 << level
+        for score in range(best, -1, -1):
+            bits = candidates
+            for level, plane in enumerate(planes):
+                bits &= plane if score >> level & 1 else ~plane
+                if not bits:
+                    break
+            if bits:
+                yield bits
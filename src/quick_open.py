@@ -0,0 +1,224 @@
+# STD
+import os
+import queue
+import time
+from pathlib import Path
+# Installed
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+# Custom
+from path_index import PathIndex
+from walker import EXCLUDE_DIRS, walk_files
+
+
+class PathIndexer(QThread):
+    """ Walks the folder of an index and builds the updated index """
+    ready = pyqtSignal(object)
+
+    def __init__(self, index: PathIndex, parent=None):
+        super(PathIndexer, self).__init__(parent)
+        self.index = index
+
+    def run(self):
+        root = self.index.root
+        prefix = len(os.path.join(root, ""))
+        paths = [path[prefix:].replace(os.sep, "/")
+                 for path in walk_files(root, EXCLUDE_DIRS | {"venv"})]
+        self.ready.emit(self.index.update(paths))
+
+
+class PathSearcher(QThread):
+    """
+        Ranks the paths of an index for the latest query off the UI thread.
+        A query typed meanwhile stops the ranking running at its next step,
+        the queries in between are skipped.
+    """
+    # generation of the query, best paths found so far, whether the ranking is done
+    ranked = pyqtSignal(int, object, bool)
+
+    # seconds before the ranking so far is shown, and between two updates of it
+    PARTIAL_INTERVAL = 0.03
+
+    def __init__(self, limit: int, parent=None):
+        super(PathSearcher, self).__init__(parent)
+        self.limit = limit
+        self.requests = queue.Queue()
+
+    def request(self, generation: int, index: PathIndex, query: str):
+        self.requests.put((generation, index, query))
+
+    def stop(self):
+        self.requests.put(None)
+        self.wait()
+
+    def latest(self):
+        """ The last query asked for, None once stopped """
+        request = self.requests.get()
+        while request is not None and not self.requests.empty():
+            request = self.requests.get()
+        return request
+
+    def run(self):
+        while (request := self.latest()) is not None:
+            generation, index, query = request
+            shown = time.monotonic()
+            paths = []
+            for ranked in index.ranking(query, self.limit):
+                if not self.requests.empty():
+                    # superseded, or stopped
+                    break
+                if ranked is None:
+                    continue
+                paths = ranked
+                if time.monotonic() - shown >= self.PARTIAL_INTERVAL:
+                    shown = time.monotonic()
+                    self.ranked.emit(generation, paths, False)
+            else:
+                self.ranked.emit(generation, paths, True)
+
+
+class QuickOpen(QDialog):
+    """
+        Ctrl+P palette, opens a file of the opened folder from a fuzzy
+        fragment of its path. The index is built when the folder is opened
+        and refreshed when the palette shows, at most every REFRESH_INTERVAL.
+        Paths are ranked in the background as the query is typed.
+    """
+    # seconds between two refreshes of the index
+    REFRESH_INTERVAL = 10.0
+    # results listed
+    RESULTS = 50
+
+    def __init__(self, set_new_tab, parent=None):
+        super(QuickOpen, self).__init__(parent)
+        self.set_new_tab = set_new_tab
+        self.index: PathIndex = None
+        self.indexer: PathIndexer = None
+        self.stale = False
+        self.refreshed = 0.0
+        self.searcher = PathSearcher(self.RESULTS, self)
+        self.searcher.ranked.connect(self._on_ranked)
+        self.searcher.start()
+        # query typed last, and the last one fully ranked
+        self.generation = 0
+        self.ranked_generation = 0
+        self.searched = 0.0
+        # Enter was pressed before the results of the query were in
+        self.open_when_ranked = False
+
+        self.setWindowFlags(Qt.WindowType.Popup)
+        self.resize(600, 400)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Go to file")
+        self.input.textChanged.connect(self.update_results)
+        self.input.returnPressed.connect(self.open_current)
+        self.input.installEventFilter(self)
+
+        self.status = QLabel()
+        self.status.setStyleSheet("color: #abb2bf")
+
+        self.list_view = QListWidget()
+        self.list_view.setFont(QFont("FiraCode", 13))
+        self.list_view.itemActivated.connect(self.open_item)
+        self.list_view.itemClicked.connect(self.open_item)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(self.input)
+        layout.addWidget(self.status)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+
+    def set_root(self, root: str):
+        self.index = PathIndex(root)
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        if self.index is None:
+            return
+        if self.indexer is not None:
+            # once the running update is done
+            self.stale = True
+            return
+        if not force and time.monotonic() - self.refreshed < self.REFRESH_INTERVAL:
+            return
+        self.refreshed = time.monotonic()
+        self.indexer = PathIndexer(self.index, self)
+        self.indexer.ready.connect(self._on_ready)
+        self.indexer.start()
+
+    def _on_ready(self, index: PathIndex):
+        self.indexer.wait()
+        self.indexer = None
+        # a folder opened since then has an index of its own
+        if index.root == self.index.root:
+            self.index = index
+            if self.isVisible():
+                self.update_results(self.input.text())
+        if self.stale:
+            self.stale = False
+            self.refresh(force=True)
+
+    def popup(self):
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.mapToGlobal(QPoint((parent.width() - self.width()) // 2, 40)))
+        self.refresh()
+        self.show()
+        self.input.setFocus()
+        self.input.selectAll()
+        self.update_results(self.input.text())
+
+    def stop(self):
+        self.searcher.stop()
+
+    def update_results(self, text: str):
+        self.generation += 1
+        if self.index is None or not len(self.index):
+            self.ranked_generation = self.generation
+            self.list_view.clear()
+            self.status.setText("Indexing..." if self.indexer is not None else "")
+            return
+        self.searched = time.perf_counter()
+        self.searcher.request(self.generation, self.index, text)
+
+    def _on_ranked(self, generation: int, paths: list[str], done: bool):
+        if generation != self.generation:
+            return
+        self.list_view.clear()
+        self.list_view.addItems(paths)
+        self.list_view.setCurrentRow(0)
+        if not self.input.text():
+            self.status.setText("")
+        elif done:
+            self.status.setText(f"{len(self.index)} files, {(time.perf_counter() - self.searched) * 1000:.0f} ms")
+        else:
+            self.status.setText(f"{len(self.index)} files, ranking...")
+        if done:
+            self.ranked_generation = generation
+            if self.open_when_ranked:
+                self.open_when_ranked = False
+                self.open_current()
+
+    def eventFilter(self, obj, event):
+        # arrows move through the results while typing goes on in the input
+        if obj is self.input and event.type() == QEvent.Type.KeyPress and event.key() in (
+                Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+            QApplication.sendEvent(self.list_view, event)
+            return True
+        return super(QuickOpen, self).eventFilter(obj, event)
+
+    def open_current(self):
+        if self.ranked_generation != self.generation:
+            # the results shown are of an older query
+            self.open_when_ranked = True
+            return
+        item = self.list_view.currentItem()
+        if item is not None:
+            self.open_item(item)
+
+    def open_item(self, item: QListWidgetItem):
+        self.hide()
+        self.set_new_tab(Path(self.index.root, item.text()))
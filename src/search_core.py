@@ -0,0 +1,506 @@
+"""
+    Project search without Qt: walks a folder, scans its files in a pool of
+    processes and yields the matches in walk order. SearchWorker runs it
+    for the UI, cli.py for the command line.
+"""
+# STD
+import asyncio
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+# Custom
+from trigram_index import TrigramIndex, required_literals
+from walker import EXCLUDE_DIRS, walk_files
+
+
+def iter_files(path, search_project: bool, dirs: dict = None):
+    """
+        Files of `path` searches look in, `search_project` includes the venv
+        and whatever the ignore files leave out
+    """
+    if search_project:
+        return walk_files(path, use_ignore_files=False, dirs=dirs)
+    return walk_files(path, EXCLUDE_DIRS | {"venv"}, dirs=dirs)
+
+
+def update_index(root: str, connection):
+    """ Update the search index of `root` and send back the counts, runs in its own process """
+    connection.send(TrigramIndex(root).update(iter_files(root, False)))
+
+
+# Generation of the search allowed to run, shared with the pool processes.
+# Scans of any other generation stop before their next file.
+current_generation = None
+
+
+def init_scan(generation):
+    global current_generation
+    current_generation = generation
+
+
+# characters that make a pattern more than a plain string
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def compile_pattern(pattern: str, flags: int):
+    """
+        What scan_buffer searches with: the lowercased bytes of a plain
+        ASCII pattern, or a compiled pattern, on bytes when it is ASCII
+    """
+    if pattern.isascii() and not REGEX_CHARS.intersection(pattern):
+        return pattern.lower().encode() if flags & re.IGNORECASE else pattern.encode()
+    if pattern.isascii():
+        # ASCII patterns run on the raw bytes, no decoding
+        return re.compile(pattern.encode(), flags | re.MULTILINE)
+    return re.compile(pattern, flags | re.MULTILINE)
+
+
+def scan_buffer(searcher, data, ignore_case: bool):
+    """
+        (line number, end, line from the match on) for the first match on
+        each line of `data`, a bytes-like buffer. Only those lines are decoded.
+    """
+    if isinstance(searcher, re.Pattern) and isinstance(searcher.pattern, str):
+        # non ASCII patterns, searched line by line in the decoded text
+        text = bytes(data).decode("utf-8", "replace")
+        for line_no, line in enumerate(text.splitlines()):
+            if m := searcher.search(line):
+                yield line_no, m.end(), line[m.start():]
+        return
+    if isinstance(searcher, re.Pattern) and b"$" in searcher.pattern and data.find(b"\r") != -1:
+        # `$` doesn't match before the \r of a \r\n, searched line by line
+        for line_no, line in enumerate(bytes(data).splitlines()):
+            if m := searcher.search(line):
+                yield (line_no, len(line[:m.end()].decode("utf-8", "replace")),
+                       line[m.start():].decode("utf-8", "replace"))
+        return
+
+    if isinstance(searcher, bytes):
+        # Plain string, a substring search. Lowercasing keeps every offset.
+        haystack = bytes(data).lower() if ignore_case else data
+
+        def find(pos):
+            start = haystack.find(searcher, pos)
+            return None if start == -1 else (start, start + len(searcher))
+    else:
+        def find(pos):
+            m = searcher.search(data, pos)
+            return None if m is None else m.span()
+
+    size = len(data)
+    line_no = counted = pos = 0
+    # a regex matches at the very end too, after a final newline that's no line of the file
+    ends_line = data[size - 1:size] == b"\n"
+    while pos < size and (span := find(pos)) is not None:
+        if span[0] == size and ends_line:
+            break
+        start = data.rfind(b"\n", 0, span[0]) + 1
+        end = data.find(b"\n", span[0])
+        if end == -1:
+            end = size
+        line = data[start:end].removesuffix(b"\r")
+        if span[1] <= start + len(line):
+            match = (span[0] - start, span[1] - start)
+        else:
+            # the match ran past its line, only a match in the line counts
+            m = searcher.search(line)
+            match = m and m.span()
+        if match:
+            line_no += data[counted:start].count(b"\n")
+            counted = start
+            yield (line_no, len(line[:match[1]].decode("utf-8", "replace")),
+                   line[match[0]:].decode("utf-8", "replace"))
+        pos = end + 1
+
+
+def scan_files(pattern: str, flags: int, paths: list[str], generation: int = None,
+               line_length: int = None) -> tuple[list[tuple], int, list]:
+    """
+        Matches of `pattern` in the text files of `paths`, in order, as
+        (file name, full path, line number, end, line), the number of files
+        scanned before `generation` was cancelled and (path, mtime, size) of
+        the files opened. Lines are cut to `line_length` characters. Module
+        level so pool processes can run it.
+    """
+    searcher = compile_pattern(pattern, flags)
+    ignore_case = bool(flags & re.IGNORECASE)
+    matches = []
+    stats = []
+    for scanned, full_path in enumerate(paths):
+        if generation is not None and current_generation.value != generation:
+            return matches, scanned, stats
+        try:
+            with open(full_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                stats.append((full_path, stat.st_mtime_ns, stat.st_size))
+                if stat.st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # binary files are told apart in the mapped bytes
+                    if data.find(b"\0", 0, 1024) != -1:
+                        continue
+                    name = os.path.basename(full_path)
+                    for line_no, end, line in scan_buffer(searcher, data, ignore_case):
+                        matches.append((name, full_path, line_no, end, line.strip()[:line_length]))
+        except (OSError, ValueError):
+            continue
+    return matches, len(paths), stats
+
+
+def is_refinement(pattern: str, base: str) -> bool:
+    """ Whether every line matching `pattern` holds a match of `base`, both ignoring case """
+    if pattern == base:
+        return True
+    if REGEX_CHARS.intersection(base):
+        return False
+    base = base.lower()
+    if not REGEX_CHARS.intersection(pattern):
+        return base in pattern.lower()
+    # every match of the pattern holds its required literals
+    return any(base in literal.lower() for literal in required_literals(pattern, re.IGNORECASE))
+
+
+class SearchCache:
+    """
+        Files matched by finished searches, with the mtime and size of every
+        file they scanned and of every directory they walked. A search for a
+        refinement of a cached pattern only scans the files that pattern
+        matched in, after checking that nothing changed on disk since.
+        Entries are dropped least recently used first.
+    """
+    MAX_ENTRIES = 16
+
+    def __init__(self):
+        # (root, search_project, pattern): (files matched, file stats, directory mtimes)
+        self.entries: OrderedDict[tuple, tuple[list, dict, dict]] = OrderedDict()
+        # searches refine and store from their thread, index updates clear from the UI thread
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.invalidated = 0
+
+    def store(self, root: str, search_project: bool, pattern: str,
+              matched: list[str], files: dict, dirs: dict):
+        key = (root, search_project, pattern)
+        with self.lock:
+            self.entries[key] = (matched, files, dirs)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.MAX_ENTRIES:
+                self.entries.popitem(last=False)
+
+    def refine(self, root: str, search_project: bool, pattern: str) -> tuple[list, dict, dict]:
+        """ The cached search `pattern` refines with the fewest matched files, None if there is none """
+        with self.lock:
+            bases = sorted((len(entry[0]), key, entry) for key, entry in self.entries.items()
+                           if key[:2] == (root, search_project) and is_refinement(pattern, key[2]))
+        for _, key, entry in bases:
+            # stats are taken without the lock, a clear doesn't wait for them
+            unchanged = self.unchanged(*entry[1:])
+            with self.lock:
+                # the entry may have been cleared or stored again meanwhile
+                current = self.entries.get(key) is entry
+                if not unchanged:
+                    # anything may match now
+                    self.invalidated += 1
+                    if current:
+                        del self.entries[key]
+                    continue
+                self.hits += 1
+                if current:
+                    self.entries.move_to_end(key)
+            return entry
+        return None
+
+    @staticmethod
+    def unchanged(files: dict, dirs: dict) -> bool:
+        """ Whether the files and directories still have their recorded mtime and size """
+        try:
+            for path, mtime in dirs.items():
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            for path, (mtime, size) in files.items():
+                stat = os.stat(path)
+                if (stat.st_mtime_ns, stat.st_size) != (mtime, size):
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SearchItem:
+    """ One hit, made from SearchResults when it is asked for """
+    __slots__ = ("name", "full_path", "line_no", "end", "line")
+
+    def __init__(self, name, full_path, line_no, end, line):
+        self.name = name
+        self.full_path = full_path
+        self.line_no = line_no
+        self.end = end
+        self.line = line
+
+    @property
+    def formatted(self):
+        return f"{self.name}:{self.line_no}:{self.end}-{self.line}..."
+
+    def __str__(self):
+        return self.formatted
+
+    def __repr__(self):
+        return self.formatted
+
+
+class SearchResults:
+    """
+        Hits of a search in parallel arrays. Each path is kept once and hits
+        refer to it by number, the lines are UTF-8 in one buffer.
+    """
+
+    def __init__(self):
+        self.paths: list[str] = []
+        self.path_ids: dict[str, int] = {}
+        self.path_of = array("I")
+        self.line_nos = array("I")
+        self.ends = array("I")
+        self.text = bytearray()
+        # end of the line of each hit in text
+        self.text_ends = array("Q")
+
+    def __len__(self):
+        return len(self.path_of)
+
+    def __getitem__(self, i: int) -> SearchItem:
+        path = self.paths[self.path_of[i]]
+        return SearchItem(os.path.basename(path), path, self.line_nos[i], self.ends[i], self.line(i))
+
+    def line(self, i: int) -> str:
+        start = self.text_ends[i - 1] if i else 0
+        return self.text[start:self.text_ends[i]].decode("utf-8")
+
+    def format(self, i: int) -> str:
+        path = self.paths[self.path_of[i]]
+        return f"{os.path.basename(path)}:{self.line_nos[i]}:{self.ends[i]}-{self.line(i)}..."
+
+    def extend(self, matches: list[tuple]):
+        """ Add hits as scan_files returns them """
+        for _, full_path, line_no, end, line in matches:
+            path_id = self.path_ids.get(full_path)
+            if path_id is None:
+                path_id = self.path_ids[full_path] = len(self.paths)
+                self.paths.append(full_path)
+            self.path_of.append(path_id)
+            self.line_nos.append(line_no)
+            self.ends.append(end)
+            self.text += line.encode("utf-8", "replace")
+            self.text_ends.append(len(self.text))
+
+    def clear(self):
+        self.paths.clear()
+        self.path_ids.clear()
+        del self.path_of[:], self.line_nos[:], self.ends[:], self.text_ends[:]
+        self.text.clear()
+
+
+class Search:
+    """
+        One search of `pattern` in the files of `path`, iterated for lists of
+        matches as scan_files makes them, one list per shard, in walk order.
+        Iterating again goes on where the last iteration stopped, so not
+        iterating pauses the search. `cancel` ends it.
+
+        Files are split in shards as the walk finds them. With more than one
+        worker a pool of processes scans the shards in parallel. Every
+        search has a generation shared with the pools, a newer search stops
+        the scans of the older ones before their next file.
+    """
+    # files per shard sent to the pool
+    SHARD_FILES = 64
+    # shards submitted ahead per worker process
+    SHARDS_AHEAD = 2
+    # characters of the line kept with each match
+    LINE_LENGTH = 50
+
+    # process pools by size, shared by every search
+    _pools: dict[int, ProcessPoolExecutor] = {}
+    # generation allowed to scan, shared with the pools
+    _generation = None
+
+    def __init__(self, pattern: str, path: str, search_project=False, workers: int = 1,
+                 index: TrigramIndex = None, cache: SearchCache = None, line_length=LINE_LENGTH):
+        self.pattern = pattern
+        self.path = path
+        self.root = str(Path(path).absolute())
+        self.search_project = search_project
+        self.workers = workers
+        # used in place of the walk when it covers the searched folder
+        self.index = index
+        self.cache = cache
+        # None keeps whole lines
+        self.line_length = line_length
+        self.generation = self.shared_generation().value
+
+        # shards submitted and not collected yet, with their file count
+        self.pending: deque[tuple[Future, int]] = deque()
+        # files scanned, and files left unscanned when cancelled
+        self.files_scanned = 0
+        self.files_saved = 0
+        self.done = False
+        self.cancelled = False
+        # what the cache needs: the files matched in, in order, the mtimes of
+        # the files scanned and of the directories walked
+        self.matched: dict[str, None] = {}
+        self.file_stats: dict = {}
+        self.dir_stats: dict = None
+        # made on the first iteration, from the thread that iterates
+        self.shards = None
+
+    @classmethod
+    def shared_generation(cls):
+        if cls._generation is None:
+            cls._generation = multiprocessing.get_context("spawn").Value("q", 0, lock=False)
+            init_scan(cls._generation)
+        return cls._generation
+
+    @classmethod
+    def pool(cls, workers: int) -> ProcessPoolExecutor:
+        """ Pool of `workers` processes, started on first use """
+        if workers not in cls._pools:
+            # spawn, forking a process running Qt threads isn't safe
+            cls._pools[workers] = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_scan, initargs=(cls.shared_generation(),))
+        return cls._pools[workers]
+
+    def make_shards(self):
+        """ Shards of the files to scan, checking the cache stats every file it holds """
+        try:
+            re.compile(self.pattern, re.IGNORECASE)
+        except re.error:
+            return iter(())
+        if self.cache is not None:
+            cached = self.cache.refine(self.root, self.search_project, self.pattern)
+            if cached is not None:
+                # only the files the cached pattern matched in can match
+                matched, files, dirs = cached
+                self.file_stats = dict(files)
+                self.dir_stats = dirs
+                return self.iter_shards(matched)
+        return self.iter_shards(self.iter_files())
+
+    def iter_files(self):
+        """
+            Files to scan, only the index's candidates when there is an index.
+            Nothing runs until the first file is asked for, so the index is
+            queried from the thread iterating the search.
+        """
+        # the index holds the files of the walk that follows the ignore files
+        self.dir_stats = {}
+        if self.index is not None and not self.search_project and self.index.root == self.root:
+            candidates = self.index.candidates(self.pattern, re.IGNORECASE)
+            if candidates is not None:
+                # files added since aren't seen, SearchSession drops the cache on index updates
+                yield from candidates
+                return
+        yield from iter_files(self.path, self.search_project, self.dir_stats)
+
+    def iter_shards(self, paths):
+        shard = []
+        for full_path in paths:
+            shard.append(full_path)
+            if len(shard) == self.SHARD_FILES:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
+
+    def __iter__(self):
+        pool = self.pool(self.workers) if self.workers > 1 else None
+        if self.shards is None:
+            self.shards = self.make_shards()
+        while not self.cancelled:
+            if pool is not None:
+                # keep every process busy without walking far ahead
+                while len(self.pending) < self.workers * self.SHARDS_AHEAD:
+                    shard = next(self.shards, None)
+                    if shard is None:
+                        break
+                    self.pending.append((pool.submit(
+                        scan_files, self.pattern, re.IGNORECASE, shard, self.generation,
+                        self.line_length), len(shard)))
+                if not self.pending:
+                    break
+                # Collected in submit order whatever order the shards finish in
+                future, count = self.pending.popleft()
+                matches, scanned, stats = future.result()
+            else:
+                shard = next(self.shards, None)
+                if shard is None:
+                    break
+                count = len(shard)
+                matches, scanned, stats = scan_files(
+                    self.pattern, re.IGNORECASE, shard, self.generation, self.line_length)
+
+            self.files_scanned += scanned
+            self.files_saved += count - scanned
+            self.file_stats.update((path, (mtime, size)) for path, mtime, size in stats)
+            self.matched.update(dict.fromkeys(match[1] for match in matches))
+            # empty lists too, the caller gets to stop between any two shards
+            yield matches
+
+        if self.cancelled or self.done:
+            return
+        self.done = True
+        if self.cache is not None:
+            self.cache.store(self.root, self.search_project, self.pattern,
+                             list(self.matched), self.file_stats, self.dir_stats)
+
+    def __aiter__(self):
+        return self.iter_async()
+
+    async def iter_async(self):
+        """ The lists of matches of __iter__, each made in the default executor """
+        loop = asyncio.get_running_loop()
+        batches = iter(self)
+        while (matches := await loop.run_in_executor(None, next, batches, None)) is not None:
+            yield matches
+
+    def stop(self):
+        """ Stop the scans of the search before their next file, from any thread """
+        self.cancelled = True
+        generation = self.shared_generation()
+        if generation.value == self.generation:
+            generation.value += 1
+
+    def cancel(self):
+        """ Stop the search and collect its pending shards, once it isn't iterated anymore """
+        self.stop()
+        for future, count in self.pending:
+            if future.cancel():
+                self.files_saved += count
+            else:
+                _, scanned, _ = future.result()
+                self.files_scanned += scanned
+                self.files_saved += count - scanned
+        self.pending.clear()
+        self.shards = iter(())
+
+
+def search(pattern: str, path: str, search_project=False, workers: int = 1, **options):
+    """ Matches of `pattern` in the files of `path`, one at a time """
+    for matches in Search(pattern, path, search_project, workers, **options):
+        yield from matches
+
+
+async def search_async(pattern: str, path: str, search_project=False, workers: int = 1, **options):
+    """ Matches of `pattern` in the files of `path`, one at a time, without blocking the event loop """
+    async for matches in Search(pattern, path, search_project, workers, **options):
+        for match in matches:
+            yield match
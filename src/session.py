@@ -0,0 +1,76 @@
+# STD
+import json
+import os
+from pathlib import Path
+# Installed
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+
+
+class TabPlaceholder(QWidget):
+    """
+        Restored tab that hasn't been shown yet. It only holds what the tab
+        needs to become an editor: the file and where the view was. The
+        editor is built, and the file read, when the tab is first activated.
+    """
+
+    def __init__(self, path: Path, line=0, index=0, first_visible=0, parent=None):
+        super(TabPlaceholder, self).__init__(parent)
+        self.path = path
+        self.full_path = path.absolute()
+        self.line = line
+        self.index = index
+        self.first_visible = first_visible
+
+    def set_path(self, path: Path):
+        self.path = path
+        self.full_path = path.absolute()
+
+    def is_loading(self) -> bool:
+        return False
+
+    def stop_loading(self):
+        pass
+
+    def view_state(self) -> dict:
+        return {"path": str(self.full_path), "line": self.line, "index": self.index,
+                "first_visible": self.first_visible}
+
+
+class Session:
+    """
+        Open folder and tabs, kept between runs in session.json of the
+        application's config folder
+    """
+    VERSION = 1
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation),
+            "session.json")
+        self.root: str = None
+        self.tabs: list[dict] = []
+        self.current = 0
+
+    def load(self) -> "Session":
+        """ The saved session, left empty when there is none or it can't be read """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") != self.VERSION:
+            return self
+        self.root = data.get("root")
+        self.tabs = data.get("tabs", [])
+        self.current = data.get("current", 0)
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"version": self.VERSION, "root": self.root, "tabs": self.tabs, "current": self.current}
+        # written whole then renamed, a crash mid-write leaves the last session
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(temporary, self.path)
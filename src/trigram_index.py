@@ -0,0 +1,241 @@
+"""
+    Trigram index of the text files of a folder, kept on disk under the
+    folder. A search asks it for the files that hold every trigram its
+    pattern requires, and only scans those. Nothing here imports Qt.
+
+    Searches ignore case, so trigrams are taken from lowercased bytes. Only
+    ASCII trigrams narrow a query, other bytes don't lowercase the same way
+    in bytes and in str.
+"""
+# STD
+import os
+import sqlite3
+from array import array
+from pathlib import Path
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT UNIQUE, mtime REAL, size INTEGER, kind INTEGER);
+CREATE TABLE IF NOT EXISTS postings (trigram INTEGER PRIMARY KEY, files BLOB);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+"""
+
+# kind of a file in the files table
+INDEXED = 0
+# too big to index, always a candidate
+UNINDEXED = 1
+# binary, searches skip these files anyway
+SKIPPED = 2
+
+
+def file_trigrams(data: bytes) -> set[bytes]:
+    data = data.lower()
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def required_literals(pattern: str, flags: int = 0) -> list[str]:
+    """ Literal strings every match of `pattern` contains """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return []
+    literals = []
+    _collect_literals(parsed, literals)
+    return [literal for literal in literals if literal]
+
+
+def _collect_literals(sequence, literals: list[str]):
+    run = []
+    for op, av in sequence:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        literals.append("".join(run))
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            _collect_literals(av[-1], literals)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            # matched at least once, what it requires is required
+            _collect_literals(av[2], literals)
+    literals.append("".join(run))
+
+
+class TrigramIndex:
+    """
+        Postings are arrays of file ids, one row per trigram. A changed file
+        gets a new id and the postings of its old one are left behind, they
+        are dropped when they outnumber the live ones by rebuilding.
+    """
+    DIRECTORY = ".dragon"
+    FILE_NAME = "search_index.sqlite"
+    # bigger files aren't indexed and are always scanned
+    MAX_FILE_SIZE = 4 * 1024 * 1024
+    # postings held in memory before they are written out
+    FLUSH_POSTINGS = 4_000_000
+    # an index of another version is built again
+    VERSION = 2
+
+    def __init__(self, root: str):
+        self.root = str(Path(root).absolute())
+        self.path = os.path.join(self.root, self.DIRECTORY, self.FILE_NAME)
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        # searches read while the indexer writes
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def is_ready(self) -> bool:
+        """ Whether the index has been built once """
+        if not os.path.exists(self.path):
+            return False
+        connection = self.connect()
+        try:
+            return connection.execute(
+                "SELECT value FROM meta WHERE key = 'built'").fetchone() is not None
+        finally:
+            connection.close()
+
+    def update(self, paths) -> dict[str, int]:
+        """ Bring the index up to date with the files of `paths`, by their mtime and size """
+        connection = self.connect()
+        known = {path: (id_, mtime, size) for id_, path, mtime, size in connection.execute(
+            "SELECT id, path, mtime, size FROM files")}
+        dead = self.meta(connection, "dead")
+        if dead > len(known) or self.meta(connection, "version") != self.VERSION:
+            # mostly stale postings or an old format, start over
+            with connection:
+                connection.execute("DELETE FROM files")
+                connection.execute("DELETE FROM postings")
+                connection.execute("DELETE FROM meta")
+            known, dead = {}, 0
+
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+        pending: dict[bytes, array] = {}
+        size_pending = 0
+        seen = set()
+        for path in paths:
+            seen.add(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            old = known.get(path)
+            if old is not None:
+                if old[1:] == (stat.st_mtime, stat.st_size):
+                    stats["unchanged"] += 1
+                    continue
+                connection.execute("DELETE FROM files WHERE id = ?", (old[0],))
+                dead += 1
+
+            kind, trigrams = self.read(path, stat.st_size)
+            id_ = connection.execute(
+                "INSERT INTO files (path, mtime, size, kind) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, kind)).lastrowid
+            for trigram in trigrams:
+                postings = pending.get(trigram)
+                if postings is None:
+                    pending[trigram] = array("I", (id_,))
+                else:
+                    postings.append(id_)
+            size_pending += len(trigrams)
+            stats["indexed"] += 1
+            if size_pending >= self.FLUSH_POSTINGS:
+                self.flush(connection, pending)
+                size_pending = 0
+
+        for path in known.keys() - seen:
+            connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            dead += 1
+            stats["removed"] += 1
+        self.flush(connection, pending)
+        with connection:
+            connection.execute("REPLACE INTO meta VALUES ('dead', ?)", (dead,))
+            connection.execute("REPLACE INTO meta VALUES ('version', ?)", (self.VERSION,))
+            connection.execute("REPLACE INTO meta VALUES ('built', 1)")
+        connection.close()
+        return stats
+
+    def read(self, path: str, size: int) -> tuple[int, set[bytes]]:
+        try:
+            with open(path, "rb") as f:
+                # the same binary files the search skips
+                head = f.read(1024)
+                if b"\0" in head:
+                    return SKIPPED, set()
+                if size > self.MAX_FILE_SIZE:
+                    return UNINDEXED, set()
+                data = head + f.read()
+        except OSError:
+            return SKIPPED, set()
+        return INDEXED, file_trigrams(data)
+
+    @staticmethod
+    def flush(connection: sqlite3.Connection, pending: dict[bytes, array]):
+        """ Append the postings held in memory to the ones on disk """
+        trigrams = list(pending)
+        with connection:
+            for i in range(0, len(trigrams), 500):
+                chunk = [int.from_bytes(t, "big") for t in trigrams[i:i + 500]]
+                existing = dict(connection.execute(
+                    f"SELECT trigram, files FROM postings WHERE trigram IN ({','.join('?' * len(chunk))})",
+                    chunk))
+                rows = []
+                for trigram, key in zip(trigrams[i:i + 500], chunk):
+                    rows.append((key, existing.get(key, b"") + pending[trigram].tobytes()))
+                connection.executemany("REPLACE INTO postings VALUES (?, ?)", rows)
+        pending.clear()
+
+    @staticmethod
+    def meta(connection: sqlite3.Connection, key: str) -> int:
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def candidates(self, pattern: str, flags: int = 0) -> list[str]:
+        """
+            Files that may match `pattern`, in walk order, None when the
+            pattern requires no trigram and every file has to be scanned
+        """
+        trigrams = set()
+        for literal in required_literals(pattern, flags):
+            trigrams.update(t for t in file_trigrams(literal.encode("utf-8")) if t.isascii())
+        if not trigrams:
+            return None
+
+        connection = self.connect()
+        try:
+            ids = None
+            postings = []
+            for trigram in trigrams:
+                row = connection.execute("SELECT files FROM postings WHERE trigram = ?",
+                                         (int.from_bytes(trigram, "big"),)).fetchone()
+                postings.append(array("I", row[0]) if row else array("I"))
+            # smallest first, the intersection only shrinks
+            for files in sorted(postings, key=len):
+                ids = set(files) if ids is None else ids.intersection(files)
+                if not ids:
+                    break
+            # ids of files changed since are gone from the files table
+            ids = sorted(ids)
+            paths = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                paths += [path for path, in connection.execute(
+                    f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk)]
+            paths += [path for path, in connection.execute(
+                "SELECT path FROM files WHERE kind = ?", (UNINDEXED,))]
+        finally:
+            connection.close()
+        return sorted(paths, key=self.walk_order)
+
+    @staticmethod
+    def walk_order(path: str) -> tuple:
+        """ Sort key putting paths in the order of a sorted top down walk """
+        directory, name = os.path.split(path)
+        return tuple(directory.split(os.sep)), name
@@ -0,0 +1,227 @@
+"""
+    Directory walker shared by the features that list the files of a
+    folder. It follows the .gitignore and .ignore files it meets on the way
+    down and never enters an ignored directory. Nothing here imports Qt.
+"""
+# STD
+import os
+import re
+
+# names of the ignore files read in every directory
+IGNORE_FILES = (".gitignore", ".ignore")
+# never walked, ignore files or not
+EXCLUDE_DIRS = frozenset([".git", ".svn", ".hg", ".bzr", ".idea", "__pycache__", ".dragon"])
+EXCLUDE_SUFFIXES = (".svg", ".png", ".exe", ".pyc", ".qm")
+
+
+def translate(pattern: str) -> str:
+    """ Regex source for a gitignore glob, `*` and `?` stay within one path part """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            break
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+class IgnoreFile:
+    """
+        The rules of one ignore file, compiled to a regex for files and one
+        for directories. Rules are alternatives from last to first, so the
+        one that matches is the rule that decides, like in git.
+    """
+
+    def __init__(self, base: str, lines):
+        # directory of the ignore file relative to the walked root, "" for the root
+        self.base = base
+        self.negated: dict[str, bool] = {}
+        file_rules = []
+        dir_rules = []
+        for number, line in enumerate(lines):
+            line = line.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            negated = line.startswith("!")
+            if negated or line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                # anchored to the directory of the ignore file
+                source = translate(line.lstrip("/"))
+            else:
+                source = "(?:.*/)?" + translate(line)
+            group = f"r{number}"
+            self.negated[group] = negated
+            rule = f"(?P<{group}>{source})"
+            dir_rules.append(rule)
+            if not dir_only:
+                file_rules.append(rule)
+        self.files = self.compile(file_rules)
+        self.dirs = self.compile(dir_rules)
+
+    @staticmethod
+    def compile(rules: list[str]):
+        if not rules:
+            return None
+        return re.compile("|".join(reversed(rules)), re.DOTALL)
+
+    @classmethod
+    def load(cls, path: str, base: str):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(base, f.readlines())
+        except OSError:
+            return None
+
+    def match(self, relative: str, is_dir: bool) -> bool:
+        """ True if ignored, False if a rule takes it back, None if no rule matches """
+        regex = self.dirs if is_dir else self.files
+        if regex is None:
+            return None
+        if self.base:
+            if not relative.startswith(self.base + "/"):
+                return None
+            relative = relative[len(self.base) + 1:]
+        m = regex.fullmatch(relative)
+        if m is None:
+            return None
+        return not self.negated[m.lastgroup]
+
+
+def is_ignored(rules: tuple, relative: str, is_dir: bool) -> bool:
+    # the deepest ignore file that has a say decides
+    for ignore_file in reversed(rules):
+        ignored = ignore_file.match(relative, is_dir)
+        if ignored is not None:
+            return ignored
+    return False
+
+
+def walk_files(root: str, exclude_dirs=EXCLUDE_DIRS, exclude_suffixes=EXCLUDE_SUFFIXES,
+               use_ignore_files=True, dirs: dict = None):
+    """
+        Full paths of the files under `root`, in the order of a sorted top
+        down walk: the files of a directory, then each of its directories.
+        The mtime of each directory walked goes in `dirs` when given.
+    """
+    root = os.path.abspath(root)
+    rules = ()
+    if use_ignore_files:
+        exclude = IgnoreFile.load(os.path.join(root, ".git", "info", "exclude"), "")
+        rules = (exclude,) if exclude else ()
+    # directory path, path relative to root, ignore files in effect there
+    stack = [(root, "", rules)]
+    while stack:
+        path, relative, rules = stack.pop()
+        try:
+            if dirs is not None:
+                # before listing it, a file added meanwhile changes it again
+                dirs[path] = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        if use_ignore_files:
+            for entry in entries:
+                if entry.name in IGNORE_FILES and entry.is_file():
+                    ignore_file = IgnoreFile.load(entry.path, relative)
+                    if ignore_file is not None:
+                        rules = rules + (ignore_file,)
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if is_dir and name in exclude_dirs:
+                continue
+            if not is_dir and name.endswith(exclude_suffixes):
+                continue
+            entry_relative = f"{relative}/{name}" if relative else name
+            if rules and is_ignored(rules, entry_relative, is_dir):
+                continue
+            if is_dir:
+                subdirs.append((entry.path, entry_relative, rules))
+            else:
+                yield entry.path
+        # popped in name order
+        stack.extend(reversed(subdirs))
+
+
+def tree_sort_key(name: str, is_dir: bool) -> tuple:
+    """ Folders first, then by name ignoring case """
+    return not is_dir, name.lower(), name
+
+
+def list_dir(path: str, relative: str, rules: tuple, exclude_dirs=EXCLUDE_DIRS):
+    """
+        Entries of one directory as the file tree shows them: (name, is_dir)
+        pairs in tree order, without the excluded and ignored ones, and the
+        ignore files in effect in it, `rules` and its own. `relative` is
+        its path from the root of the tree, "" for the root.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return [], rules
+    for entry in entries:
+        if entry.name in IGNORE_FILES and entry.is_file():
+            ignore_file = IgnoreFile.load(entry.path, relative)
+            if ignore_file is not None:
+                rules = rules + (ignore_file,)
+    shown = []
+    for entry in entries:
+        name = entry.name
+        try:
+            # links to folders are shown as folders
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir and name in exclude_dirs:
+            continue
+        if rules and is_ignored(rules, f"{relative}/{name}" if relative else name, is_dir):
+            continue
+        shown.append((name, is_dir))
+    shown.sort(key=lambda item: tree_sort_key(*item))
+    return shown, rules
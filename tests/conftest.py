@@ -0,0 +1,21 @@
+"""
+    Shared setup of the tests, run from the project root: `python -m pytest tests`
+"""
+# STD
+import os
+import sys
+# Installed
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# no window shows up while the tests run
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def app():
+    from PyQt6.QtCore import QStandardPaths
+    from PyQt6.QtWidgets import QApplication
+    # config and recovery folders of the tests, not the user's
+    QStandardPaths.setTestModeEnabled(True)
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,34 @@
+# STD
+from types import SimpleNamespace
+# Installed
+from PyQt6.Qsci import QsciScintilla
+# Custom
+from editor.autocomplete import CompletionService
+from editor.prefix_trie import PrefixTrie
+
+
+def merged(word: str, buffer_words: list[str], completions: list[str]) -> list[str]:
+    trie = PrefixTrie()
+    for name in buffer_words:
+        trie.add(name)
+    service = SimpleNamespace(trie=trie, INSTANT_LIMIT=CompletionService.INSTANT_LIMIT)
+    return CompletionService.merge(service, word, [{"name": name, "type": ""} for name in completions])
+
+
+def test_merged_names_sort_as_scintilla_searches_them():
+    names = merged("set", ["set_root", "setup"], ["setText", "set_path", "setCurrentIndex"])
+    assert names == ["setCurrentIndex", "setText", "setup", "set_path", "set_root"]
+
+
+def test_typed_prefix_selects_its_completion(app):
+    editor = QsciScintilla()
+    editor.setAutoCompletionCaseSensitivity(False)
+    # the list of "set", typing has gone on to "set_r"
+    names = merged("set", [], ["set_root"] + [f"set{letter}x" for letter in "ABCDEFG"])
+    editor.setText("set_r")
+    editor.setCursorPosition(0, 5)
+    editor.SendScintilla(QsciScintilla.SCI_AUTOCSHOW, 5, " ".join(names).encode())
+    assert editor.isListActive()
+    current = bytearray(64)
+    length = editor.SendScintilla(QsciScintilla.SCI_AUTOCGETCURRENTTEXT, 0, current)
+    assert bytes(current[:length]) == b"set_root"
@@ -0,0 +1,43 @@
+# STD
+from pathlib import Path
+# Installed
+from PyQt6.QtCore import QEventLoop
+from PyQt6.Qsci import QsciScintilla
+# Custom
+from editor.editor import Editor
+from editor.file_loader import FileLoader
+
+
+def load(editor: Editor, restyle_each_chunk: bool):
+    loop = QEventLoop()
+    editor.loaded.connect(lambda error: loop.quit())
+    if restyle_each_chunk:
+        # as the window repaints between two chunks
+        editor.load_progress.connect(lambda *_: editor.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1))
+    editor.load()
+    loop.exec()
+    editor.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1)
+
+
+def styles_of_line(editor: Editor, line: int) -> list[int]:
+    start = editor.positionFromLineIndex(line, 0)
+    length = len(editor.text(line).rstrip("\r\n").encode())
+    return [editor.SendScintilla(QsciScintilla.SCI_GETSTYLEAT, start + i) for i in range(length)]
+
+
+def test_chunks_loaded_after_the_first_are_styled(app, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(FileLoader, "FIRST_CHUNK", 1000)
+    monkeypatch.setattr(FileLoader, "CHUNK_SIZE", 1000)
+    path = tmp_path / "chunks.py"
+    path.write_text("x = 1\n" * 500 + "def f(self): return 'str'\n")
+
+    loaded_whole = Editor(path=path)
+    loaded_whole.setText(path.read_text())
+    loaded_whole.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1)
+    chunked = Editor(path=path)
+    load(chunked, restyle_each_chunk=True)
+
+    assert chunked.text() == loaded_whole.text()
+    expected = styles_of_line(loaded_whole, 500)
+    assert set(expected) != {0}
+    assert styles_of_line(chunked, 500) == expected
@@ -0,0 +1,32 @@
+# STD
+import os
+import shutil
+from pathlib import Path
+# Custom
+from editor.file_saver import atomic_write, recovered, recovery_dir, recovery_path, write_recovery
+
+
+def test_atomic_write_keeps_permissions(tmp_path: Path):
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    os.chmod(path, 0o600)
+    atomic_write(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+
+def test_recovered_lists_copies_and_drops_leftovers(app):
+    shutil.rmtree(recovery_dir(), ignore_errors=True)
+    saved = recovery_path("/project/a.py", "a.py")
+    write_recovery(saved, b"unsaved", "/project/a.py")
+    untitled = recovery_path("untitled-1", "untitled")
+    write_recovery(untitled, b"scratch", "")
+    # a sidecar without its copy, and a write cut short
+    (recovery_dir() / "gone.json").write_text("{}")
+    (recovery_dir() / ".gone.tmp").write_text("")
+
+    assert sorted(recovered()) == sorted([(saved, "/project/a.py"), (untitled, "")])
+    assert sorted(os.listdir(recovery_dir())) == sorted(
+        [saved.name, saved.name + ".json", untitled.name, untitled.name + ".json"])
+    shutil.rmtree(recovery_dir())
@@ -0,0 +1,63 @@
+# STD
+import random
+# Installed
+import pytest
+from PyQt6.Qsci import QsciScintilla
+# Custom
+from editor.custom_lexer import CustomLexer
+
+SOURCE = '''import os
+
+
+class Tabs(object):
+    """ Tabs of the window,
+        more than one line """
+
+    def select(self, index=0):
+        # comment with 'quotes'
+        self.widget.setCurrentIndex(index)
+        name = f"tab {index}" + 'x'
+        return [name, 1.5, None]
+'''
+FRAGMENTS = ["\\n", "(", ")", '"', "'''", '"""', "#", " x.setCurrentIndex(", "def ", "self", "\\\\", "12", " "]
+
+
+def styled_editor(text: str) -> QsciScintilla:
+    editor = QsciScintilla()
+    editor.setUtf8(True)
+    editor.lexer_ = CustomLexer(editor)
+    editor.setLexer(editor.lexer_)
+    editor.setText(text)
+    style(editor)
+    return editor
+
+
+def style(editor: QsciScintilla):
+    """ Style what isn't yet, as painting does """
+    editor.SendScintilla(QsciScintilla.SCI_COLOURISE, 0, -1)
+
+
+def styles(editor: QsciScintilla) -> list[int]:
+    return [editor.SendScintilla(QsciScintilla.SCI_GETSTYLEAT, i) for i in range(editor.length())]
+
+
+def test_enter_in_a_call_restyles_the_split_line(app):
+    editor = styled_editor("x.setCurrentIndex(1)\n")
+    editor.insertAt("\n", 0, len("x.setCurr"))
+    style(editor)
+    assert styles(editor) == styles(styled_editor(editor.text()))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_styling_matches_a_full_restyle(app, seed):
+    generator = random.Random(seed)
+    editor = styled_editor(SOURCE)
+    for _ in range(200):
+        position = generator.randrange(editor.length() + 1)
+        if generator.random() < 0.6:
+            editor.SendScintilla(QsciScintilla.SCI_INSERTTEXT, position, generator.choice(FRAGMENTS).encode())
+        else:
+            editor.SendScintilla(QsciScintilla.SCI_DELETERANGE, position,
+                                 min(generator.randrange(1, 8), editor.length() - position))
+        style(editor)
+        assert styles(editor) == styles(styled_editor(editor.text())), editor.text()
@@ -0,0 +1,24 @@
+# STD
+from pathlib import Path
+# Custom
+from editor.package_index import PackageIndex
+
+
+def test_cached_names_follow_the_indexer(tmp_path: Path):
+    path = str(tmp_path / "packages.sqlite")
+    indexer = PackageIndex(path).connect()
+    with indexer:
+        indexer.execute("INSERT INTO names VALUES ('pkg', 'old_name', 'function', '', '')")
+    reader = PackageIndex(path)
+    assert reader.names("pkg") == [("old_name", "function", "")]
+
+    # upgraded while the worker runs
+    with indexer:
+        indexer.execute("DELETE FROM names WHERE module = 'pkg'")
+        indexer.execute("INSERT INTO names VALUES ('pkg', 'new_name', 'function', '', '')")
+    assert reader.names("pkg") == [("new_name", "function", "")]
+
+    # uninstalled
+    with indexer:
+        indexer.execute("DELETE FROM names WHERE module = 'pkg'")
+    assert reader.names("pkg") is None
@@ -0,0 +1,19 @@
+# Custom
+from path_index import PathIndex
+
+
+def test_deleted_path_created_again_is_found():
+    paths = ["a/foo.py", "b/bar.py", "c/baz.py"]
+    index = PathIndex("/project").update(paths)
+    index = index.update(paths[1:])
+    assert index.search("foo", 10) == []
+
+    recreated = index.update(paths)
+    assert recreated is not index
+    assert recreated.search("foo", 10) == ["a/foo.py"]
+    assert len(recreated) == 3
+
+
+def test_update_without_changes_keeps_the_index():
+    index = PathIndex("/project").update(["a/foo.py", "b/bar.py"])
+    assert index.update(["b/bar.py", "a/foo.py"]) is index
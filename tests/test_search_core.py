@@ -0,0 +1,59 @@
+# STD
+import re
+from pathlib import Path
+# Custom
+from search_core import Search, SearchCache, scan_buffer, scan_files
+
+
+class RecordingIndex:
+    """ Stands for a TrigramIndex, remembers the queries it got """
+
+    def __init__(self, root: str, files: list[str]):
+        self.root = root
+        self.files = files
+        self.queries = []
+
+    def candidates(self, pattern: str, flags: int = 0) -> list[str]:
+        self.queries.append(pattern)
+        return self.files
+
+
+def test_index_is_queried_when_iterated_not_when_built(tmp_path: Path):
+    (tmp_path / "a.py").write_text("needle\n")
+    (tmp_path / "b.py").write_text("hay\n")
+    index = RecordingIndex(str(tmp_path.absolute()), [str(tmp_path / "a.py")])
+
+    search = Search("needle", str(tmp_path), index=index)
+    assert index.queries == []
+
+    matches = [match for batch in search for match in batch]
+    assert index.queries == ["needle"]
+    assert [match[1] for match in matches] == [str(tmp_path / "a.py")]
+
+
+def test_cache_is_checked_when_iterated_not_when_built(tmp_path: Path, monkeypatch):
+    (tmp_path / "a.py").write_text("needle in\n")
+    (tmp_path / "b.py").write_text("needle\n")
+    cache = SearchCache()
+    list(Search("needle", str(tmp_path), cache=cache))
+    checked = []
+    unchanged = SearchCache.unchanged
+    monkeypatch.setattr(SearchCache, "unchanged", staticmethod(lambda *stats: checked.append(1) or unchanged(*stats)))
+
+    search = Search("needle in", str(tmp_path), cache=cache)
+    assert checked == [] and cache.hits == 0
+
+    matches = [match for batch in search for match in batch]
+    assert checked and cache.hits == 1
+    assert [match[1] for match in matches] == [str(tmp_path / "a.py")]
+
+
+def test_empty_line_pattern_stops_at_the_last_line(tmp_path: Path):
+    path = tmp_path / "a.txt"
+    path.write_text("a\n\nb\n")
+    matches, _, _ = scan_files("^$", re.IGNORECASE, [str(path)])
+    assert [match[2] for match in matches] == [1]
+    in_memory = scan_buffer(re.compile(rb"^$", re.IGNORECASE | re.MULTILINE), b"a\n\nb\n", True)
+    assert [line_no for line_no, _, _ in in_memory] == [1]
+    # an empty last line is still found
+    assert [line_no for line_no, _, _ in scan_buffer(re.compile(rb"^$", re.MULTILINE), b"a\n\n", False)] == [1]
@@ -0,0 +1,64 @@
+# STD
+import os
+import re
+from pathlib import Path
+# Custom
+from trigram_index import TrigramIndex, required_literals
+
+
+def test_required_literals():
+    assert required_literals("def open_file") == ["def open_file"]
+    assert required_literals(r"class \w+Editor\(") == ["class ", "Editor("]
+    # once at least, what the group requires is required
+    assert required_literals("(load)+ing") == ["load", "ing"]
+    # maybe never matched, or one of several
+    assert required_literals("(load)?ing") == ["ing"]
+    assert required_literals("save|load") == []
+    assert required_literals("[") == []
+
+
+def make_index(root: Path, files: dict[str, bytes]) -> TrigramIndex:
+    for name, data in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    index = TrigramIndex(str(root))
+    index.update(sorted(str(root / name) for name in files))
+    return index
+
+
+def found(index: TrigramIndex, pattern: str, flags: int = re.IGNORECASE) -> list[str]:
+    paths = index.candidates(pattern, flags)
+    return None if paths is None else [Path(path).relative_to(index.root).as_posix() for path in paths]
+
+
+def test_candidates_hold_every_required_trigram(tmp_path):
+    index = make_index(tmp_path, {
+        "editor.py": b"class Editor(QsciScintilla):\n",
+        "sub/loader.py": b"def load_file(path):\n",
+        "sub/saver.py": b"def save_file(path):\n",
+        "image.bin": b"\0class Editor(",
+    })
+    assert index.is_ready()
+    assert found(index, r"CLASS \w+\(") == ["editor.py"]
+    assert found(index, "def [a-z]+_file") == ["sub/loader.py", "sub/saver.py"]
+    assert found(index, "load_file|save_file") is None
+    assert found(index, "no such text") == []
+
+
+def test_changed_and_removed_files_follow_the_disk(tmp_path):
+    index = make_index(tmp_path, {"a.py": b"old text\n", "b.py": b"other\n"})
+    path = tmp_path / "a.py"
+    path.write_bytes(b"new words\n")
+    os.utime(path, ns=(0, 0))
+    assert index.update([str(path)]) == {"indexed": 1, "unchanged": 0, "removed": 1}
+    assert found(index, "old text") == []
+    assert found(index, "new words") == ["a.py"]
+    assert found(index, "other") == []
+
+
+def test_files_too_big_to_index_are_always_candidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(TrigramIndex, "MAX_FILE_SIZE", 16)
+    index = make_index(tmp_path, {"big.txt": b"x" * 32, "small.txt": b"needle"})
+    assert found(index, "needle") == ["big.txt", "small.txt"]
+    assert found(index, "haystack") == ["big.txt"]
@@ -0,0 +1,75 @@
+# STD
+import os
+from pathlib import Path
+# Custom
+from walker import IgnoreFile, list_dir, walk_files
+
+
+def make_tree(root: Path, files: dict[str, str]):
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def walked(root: Path, **kwargs) -> list[str]:
+    return [Path(path).relative_to(root).as_posix() for path in walk_files(str(root), **kwargs)]
+
+
+def test_last_matching_rule_decides():
+    rules = IgnoreFile("", ["*.log", "!keep.log", "build/", "/top.txt", "docs/**/*.tmp"])
+    assert rules.match("a/debug.log", False) is True
+    assert rules.match("a/keep.log", False) is False
+    assert rules.match("main.py", False) is None
+    # a directory-only rule leaves files of that name alone
+    assert rules.match("a/build", True) is True
+    assert rules.match("a/build", False) is None
+    # anchored to the directory of the ignore file
+    assert rules.match("top.txt", False) is True
+    assert rules.match("a/top.txt", False) is None
+    assert rules.match("docs/x.tmp", False) is True
+    assert rules.match("docs/a/b/x.tmp", False) is True
+
+
+def test_rules_of_a_nested_ignore_file_apply_below_it():
+    rules = IgnoreFile("pkg", ["*.gen"])
+    assert rules.match("pkg/a.gen", False) is True
+    assert rules.match("pkg/sub/a.gen", False) is True
+    assert rules.match("other/a.gen", False) is None
+    assert rules.match("pkgs/a.gen", False) is None
+
+
+def test_walk_follows_the_ignore_files_on_the_way(tmp_path):
+    make_tree(tmp_path, {
+        ".gitignore": "*.log\nbuild/\n",
+        "main.py": "",
+        "run.log": "",
+        "build/out.py": "",
+        "pkg/.ignore": "!keep.log\nlocal.py\n",
+        "pkg/keep.log": "",
+        "pkg/local.py": "",
+        "pkg/mod.py": "",
+        "other/local.py": "",
+        "__pycache__/main.cpython.pyc": "",
+        ".git/info/exclude": "secret.py\n",
+        "secret.py": "",
+        "icon.png": "",
+    })
+    assert walked(tmp_path) == [
+        ".gitignore", "main.py", "other/local.py", "pkg/.ignore", "pkg/keep.log", "pkg/mod.py"]
+    assert "run.log" in walked(tmp_path, use_ignore_files=False)
+
+
+def test_walk_records_the_directories_it_lists(tmp_path):
+    make_tree(tmp_path, {".gitignore": "skip/\n", "a/x.py": "", "skip/y.py": ""})
+    dirs = {}
+    list(walk_files(str(tmp_path), dirs=dirs))
+    assert set(dirs) == {str(tmp_path), os.path.join(str(tmp_path), "a")}
+
+
+def test_list_dir_shows_folders_first_without_ignored_entries(tmp_path):
+    make_tree(tmp_path, {".gitignore": "*.log\n", "b.py": "", "A.py": "", "x.log": "",
+                         "lib/m.py": "", ".git/HEAD": ""})
+    shown, rules = list_dir(str(tmp_path), "", ())
+    assert shown == [("lib", True), (".gitignore", False), ("A.py", False), ("b.py", False)]
+    assert len(rules) == 1